@@ -1,7 +1,6 @@
 import datetime
 import logging
 import os
-import pickle
 
 from netCDF4 import Dataset
 from sqlalchemy.ext.declarative import declarative_base
@@ -15,6 +14,7 @@ import matplotlib.pyplot as plt
 from mpl_toolkits.basemap import Basemap
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 
+import grid
 import utils
 
 Base = declarative_base()
@@ -262,6 +262,8 @@ class CCMPManager(object):
     def get_ccmp_of_one_hour(self, dt, CCMP, subset, var_names):
         ccmp_pts = []
         lats_num, lons_num = subset['uwnd'].shape
+        windspd, winddir = utils.compose_wind(subset['uwnd'],
+                                              subset['vwnd'], 'o')
 
         for y in range(lats_num):
 
@@ -294,8 +296,8 @@ class CCMPManager(object):
                 row.u_wind = float(subset['uwnd'][y][x])
                 row.v_wind = float(subset['vwnd'][y][x])
                 # Wait to be updated when adding ERA5 data
-                row.windspd, row.winddir = utils.compose_wind(
-                    row.u_wind, row.v_wind, 'o')
+                row.windspd = float(windspd[y][x])
+                row.winddir = float(winddir[y][x])
 
                 ccmp_pts.append(row)
 
@@ -344,12 +346,9 @@ class CCMPManager(object):
         ccmp['lat'] = []
         ccmp['windspd'] = []
 
-        grid_lons_lats = dict()
-
-        for name in ['lons', 'lats']:
-            pickle_path = self.CONFIG['grid']['pickle'][name]
-            with open(pickle_path, 'rb') as f:
-                grid_lons_lats[name] = pickle.load(f)
+        shared_grid = grid.get_shared_grid(self.CONFIG)
+        grid_lons_lats = {'lons': shared_grid.lons_list,
+                          'lats': shared_grid.lats_list}
 
         query_for_count = self.session.query(CCMP).filter(
             extract('hour', CCMP.date_time) == dt.hour)
@@ -0,0 +1,202 @@
+"""Queue of Climate Data Store (CDS) retrievals.
+
+The CDS server queues every job for minutes before serving it, so
+several jobs must be in flight to get reasonable throughput.
+CDSRetrievalQueue submits retrievals through a bounded thread pool and
+de-duplicates identical requests by hashing the canonical JSON of the
+dataset name and request.  Every file is written to a temporary path
+first and renamed into place only after the retrieval succeeds.
+
+The client only needs a ``retrieve(name, request, target)`` method like
+``cdsapi.Client``, so tests can plug in FixtureClient, which serves
+local GRIB fixtures.
+
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import cdsapi
+
+logger = logging.getLogger(__name__)
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+def request_hash(name, request):
+    """Hash the canonical form of CDS request.
+
+    Key order of request and order of values in list do not matter,
+    e.g. ['00:00', '06:00'] and ['06:00', '00:00'] are the same.
+
+    """
+    def canonical(value):
+        if isinstance(value, dict):
+            return {str(k): canonical(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple, set)):
+            return sorted([canonical(v) for v in value], key=str)
+        return str(value)
+
+    text = json.dumps({'name': name, 'request': canonical(request)},
+                      sort_keys=True)
+
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class FixtureClient(object):
+    """Local stand-in of cdsapi.Client which serves GRIB fixtures.
+
+    A request is served by '{fixture_dir}/{request_hash}.grib' if it
+    exists, otherwise by '{fixture_dir}/{name}.grib'.
+
+    """
+    def __init__(self, fixture_dir):
+        self.fixture_dir = fixture_dir
+        self.requests = []
+
+    def retrieve(self, name, request, target):
+        self.requests.append((name, request, target))
+        candidates = [
+            os.path.join(self.fixture_dir,
+                         f'{request_hash(name, request)}.grib'),
+            os.path.join(self.fixture_dir, f'{name}.grib'),
+        ]
+        for path in candidates:
+            if os.path.exists(path):
+                shutil.copyfile(path, target)
+                return
+        raise FileNotFoundError(f'No GRIB fixture for {name}: {request}')
+
+
+class CDSRetrievalQueue(object):
+    """Submit CDS retrievals concurrently with de-duplication, atomic
+    writing and retries.
+
+    Parameters
+    ----------
+    client : object
+        Object with method retrieve(name, request, target), e.g.
+        cdsapi.Client.  It must be safe to call from several threads.
+    max_jobs : int
+        Max number of retrievals in flight.
+    retry_times : int
+        Times to retry a failed retrieval.
+    backoff : float
+        Seconds to wait before first retry.  It doubles every retry.
+
+    """
+    def __init__(self, client, max_jobs=4, retry_times=3, backoff=30):
+        self.client = client
+        self.max_jobs = max_jobs
+        self.retry_times = retry_times
+        self.backoff = backoff
+        self.executor = ThreadPoolExecutor(max_workers=max_jobs)
+        self.lock = threading.Lock()
+        # Key is request hash and value is Future of retrieval which
+        # is not done yet
+        self.in_flight = dict()
+
+    def submit(self, name, request, target):
+        """Submit retrieval and return Future whose result is target.
+
+        """
+        if os.path.exists(target):
+            future = Future()
+            future.set_result(target)
+            return future
+
+        key = request_hash(name, request)
+        with self.lock:
+            future = self.in_flight.get(key, None)
+            submitted = future is None
+            if submitted:
+                future = self.executor.submit(self._retrieve, name,
+                                              request, target, key)
+                self.in_flight[key] = future
+
+        if submitted:
+            # Done retrieval is forgotten, so that same request later,
+            # e.g. after file is deleted to save disk, is retrieved
+            # again.  Callback is added without holding lock because it
+            # runs at once if retrieval is already done.
+            def forget_when_done(done_future):
+                with self.lock:
+                    if self.in_flight.get(key, None) is done_future:
+                        del self.in_flight[key]
+
+            future.add_done_callback(forget_when_done)
+
+        # Same request may be submitted with another target
+        result = Future()
+
+        def copy_when_done(done_future):
+            try:
+                path = done_future.result()
+                if path != target and not os.path.exists(target):
+                    os.makedirs(os.path.dirname(target) or '.',
+                                exist_ok=True)
+                    shutil.copyfile(path, target)
+                result.set_result(target)
+            except Exception as msg:
+                result.set_exception(msg)
+
+        future.add_done_callback(copy_when_done)
+
+        return result
+
+    def retrieve(self, name, request, target):
+        """Retrieve and block until target is written.
+
+        """
+        return self.submit(name, request, target).result()
+
+    def _retrieve(self, name, request, target, key):
+        os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+        part_path = f'{target}.{key[:8]}.part'
+
+        for retry in range(self.retry_times + 1):
+            if os.path.exists(target):
+                return target
+            if retry:
+                time.sleep(self.backoff * 2 ** (retry - 1))
+            try:
+                self.client.retrieve(name, request, part_path)
+                os.replace(part_path, target)
+                return target
+            except Exception as msg:
+                logger.warning((f"""Fail retrieving {name} into """
+                                f"""{target} ({retry + 1}/"""
+                                f"""{self.retry_times + 1}): {msg}"""))
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                last_msg = msg
+
+        raise RuntimeError(f'Fail retrieving {name} into {target}: '
+                           f'{last_msg}')
+
+
+def get_queue(CONFIG, client=None):
+    """Get the queue shared by all ERA5Manager instances of process,
+    so that identical requests from different stages are merged.
+
+    """
+    global _default_queue
+
+    with _default_queue_lock:
+        if _default_queue is None:
+            if client is None:
+                client = cdsapi.Client()
+            cds_config = CONFIG['era5'].get('cds', dict())
+            _default_queue = CDSRetrievalQueue(
+                client, cds_config.get('max_jobs', 4),
+                cds_config.get('retry_times',
+                               CONFIG['network']['retry_times']),
+                cds_config.get('backoff', 30))
+
+    return _default_queue
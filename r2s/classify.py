@@ -8,13 +8,14 @@ from sqlalchemy.ext.declarative import declarative_base
 import lightgbm as lgb
 from scipy.misc import derivative
 
+import parallel_hyperopt
 import utils
 from metrics import (focal_loss_lgb, focal_loss_lgb_eval_error,
                      lgb_f1_score, lgb_focal_f1_score, sigmoid)
 from sklearn.metrics import (accuracy_score, f1_score, precision_score,
                              recall_score, confusion_matrix)
 from sklearn.utils import Bunch
-from hyperopt import hp, tpe, fmin, Trials
+from hyperopt import hp, STATUS_OK
 
 
 Base = declarative_base()
@@ -159,20 +160,23 @@ class Classifier(object):
         breakpoint()
 
     def optimize_classifier(self, maxevals=200):
-        self.early_stop_dict = {}
-
         param_space = self.hyperparameter_space()
         objective = self.get_objective(self.lgb_train)
-        objective.i = 0
-        trials = Trials()
-        best = fmin(fn=objective,
-                    space=param_space,
-                    algo=tpe.suggest,
-                    max_evals=maxevals,
-                    trials=trials)
-
-        best['num_boost_round'] = self.early_stop_dict[
-            trials.best_trial['tid']]
+        trials_name = f'{self.basin}_lgb_classifier_{self.classify_threshold}'
+        for attr in ['with_focal_loss', 'smogn', 'smogn_final',
+                     'smogn_hyperopt', 'is_unbalance', 'valid']:
+            if getattr(self, attr, False) is True:
+                trials_name += f'_{attr}'
+        # Changed search space or training set starts a new search
+        trials_name += '_' + parallel_hyperopt.search_fingerprint(
+            param_space, self.X_train, self.train_period)
+        # Trials are stored in file, so interrupted search resumes
+        best, trials = parallel_hyperopt.search(
+            objective, param_space, maxevals,
+            self.CONFIG['classify']['hyperopt'], trials_name)
+
+        best['num_boost_round'] = trials.best_trial['result'][
+            'num_boost_round']
         best['num_leaves'] = int(best['num_leaves'])
         best['verbose'] = -1
 
@@ -268,13 +272,12 @@ class Classifier(object):
                     stratified=False,
                     early_stopping_rounds=20)
 
-            self.early_stop_dict[objective.i] = len(
-                cv_result['f1-mean'])
             score = round(cv_result['f1-mean'][-1], 4)
 
-            objective.i += 1
-
-            return -score
+            # Rounds of early stopping are kept in result, because
+            # trials may run in other processes or be resumed
+            return {'loss': -score, 'status': STATUS_OK,
+                    'num_boost_round': len(cv_result['f1-mean'])}
 
         return objective
 
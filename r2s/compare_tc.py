@@ -9,7 +9,6 @@ import string
 import time
 
 import matplotlib.pyplot as plt
-from global_land_mask import globe
 from sqlalchemy.ext.declarative import declarative_base
 import pandas as pd
 import pygrib
@@ -23,7 +22,10 @@ import netCDF4
 
 import ccmp
 import era5
+import landmask
+import render
 import satel_scs
+import tc_track
 import utils
 import match_era5_smap
 
@@ -35,6 +37,7 @@ class TCComparer(object):
                  save_disk, compare_instructions, draw_sfmr,
                  max_windspd, force_align_smap, work=True):
         self.CONFIG = CONFIG
+        self.land_mask = landmask.get_land_mask(CONFIG)
         self.period = period
         self.region = region
         self.db_root_passwd = passwd
@@ -46,6 +49,8 @@ class TCComparer(object):
         self.draw_sfmr = draw_sfmr
         self.max_windspd = max_windspd
         self.force_align_smap = force_align_smap
+        # (path, dataset) of SMAP daily file read last time
+        self.smap_dataset = None
 
         self.logger = logging.getLogger(__name__)
         utils.setup_database(self, Base)
@@ -177,21 +182,16 @@ class TCComparer(object):
             IBTrACS.date_time >= self.period[0],
             IBTrACS.date_time <= self.period[1]
         )
-        total = tc_query.count()
 
         # Filter TCs during period
-        for idx, tc in enumerate(tc_query):
-            converted_lon = utils.longitude_converter(tc.lon,
-                                                      '360', '-180')
-            if bool(globe.is_land(tc.lat, converted_lon)):
+        for tc, next_tc in tc_track.iter_tc_pairs(tc_query):
+            if self.land_mask.is_land(tc.lat, tc.lon):
                 continue
             # Draw windspd from different sources
             success = False
             if 'sfmr' in self.sources:
-                if idx < total - 1:
-                    next_tc = tc_query[idx + 1]
-                    if tc.sid == next_tc.sid:
-                        success = self.compare_with_sfmr(tc, next_tc)
+                if next_tc is not None:
+                    success = self.compare_with_sfmr(tc, next_tc)
 
             elif 'ibtracs' in self.sources:
                 if (tc.wind is not None and tc.pres is not None
@@ -207,16 +207,15 @@ class TCComparer(object):
                            f"""{self.sources_str} with """
                            f"""IBTrACS record of TC {tc.name} """
                            f"""on {tc.date_time}"""))
-            else:
+            elif next_tc is not None:
                 if len(self.sources) > 1:
                     success, need_exit = \
                         self.compare_between_two_tc_records(tc, next_tc)
                 else:
-                    if idx < total - 1:
-                        next_tc = tc_query[idx + 1]
-                        if tc.sid == next_tc.sid:
-                            success = self.draw_one_source(tc, next_tc)
+                    success = self.draw_one_source(tc, next_tc)
 
+        # Wait for figures rendered in background
+        render.get_renderer(self.CONFIG).wait()
         print('Done')
 
     def draw_one_source(self, tc, next_tc):
@@ -236,8 +235,9 @@ class TCComparer(object):
         if not hours:
             return False
 
+        interped_tcs = tc_track.hourly_tcs(tc, next_tc)
         for h in range(hours):
-            interped_tc = utils.interp_tc(self, h, tc, next_tc)
+            interped_tc = interped_tcs[h]
             success = self.draw_windspd_around_interped_tc(interped_tc)
 
             if success:
@@ -259,10 +259,6 @@ class TCComparer(object):
         else:
             text_subplots_serial_number = False
 
-        fig, axs = plt.subplots(subplots_row, subplots_col,
-                                figsize=fig_size, sharey=True)
-        axs_list = [axs]
-
         success, smap_lons, smap_lats = \
             self.get_smap_lonlat(interped_tc)
         if not success:
@@ -341,51 +337,35 @@ class TCComparer(object):
 
         if self.max_windspd is not None:
             max_windspd = self.max_windspd
-        # Draw windspd
-        for src in self.sources:
-            try:
-                ax = axs_list[index]
-
-                fontsize = 20
-                utils.draw_windspd(self, fig, ax, interped_tc.date_time,
-                                   lons[src], lats[src], windspd[src],
-                                   max_windspd, mesh[src],
-                                   draw_contour=False,
-                                   custom=True, region=draw_region)
-                # #XXX: Temporary use
-                # index = 0
-                # ax.text(0.1, 0.95,
-                #         f'{string.ascii_lowercase[index]})',
-                #         transform=ax.transAxes, fontsize=20,
-                #         fontweight='bold', va='top', ha='right')
-                if text_subplots_serial_number:
-                    ax.text(0.1, 0.95,
-                            f'{string.ascii_lowercase[index]})',
-                            transform=ax.transAxes, fontsize=20,
-                            fontweight='bold', va='top', ha='right')
-                # ax.set_title((f"""{self.sources_titles[src]} """
-                #               f"""{subplot_title_suffix[src]} """
-                #               f"""{interped_tc.name} """),
-                #              size=20)
-                ax.set_title((f"""{interped_tc.name} """
-                              f"""{subplot_title_suffix[src]} """
-                              ),
-                             size=20)
-                index += 1
-            except Exception as msg:
-                breakpoint()
-                exit(msg)
-
-        fig.tight_layout(pad=0.1)
+        # Draw windspd in renderer from precomputed arrays
+        panels = []
+        for index, src in enumerate(self.sources):
+            panel = {
+                'lons': lons[src],
+                'lats': lats[src],
+                'windspd': windspd[src],
+                'mesh': mesh[src],
+                'region': draw_region,
+                # 'title': (f"""{self.sources_titles[src]} """
+                #           f"""{subplot_title_suffix[src]} """
+                #           f"""{interped_tc.name} """),
+                'title': (f"""{interped_tc.name} """
+                          f"""{subplot_title_suffix[src]} """),
+            }
+            if text_subplots_serial_number:
+                panel['label'] = f'{string.ascii_lowercase[index]})'
+            panels.append(panel)
 
         dt_str = interped_tc.date_time.strftime('%Y_%m%d_%H%M')
         fig_dir = self.CONFIG['result']['dirs']['fig']['root']
         fig_dir = f"""{fig_dir}draw_{src}/"""
 
-        os.makedirs(fig_dir, exist_ok=True)
         fig_name = f'{dt_str}_{interped_tc.name}.eps'
-        plt.savefig(f'{fig_dir}{fig_name}', dpi=600)
-        plt.clf()
+        render.get_renderer(self.CONFIG).submit(
+            render.draw_windspd_panels, f'{fig_dir}{fig_name}',
+            (render.PlotContext(self), panels, subplots_row,
+             subplots_col, max_windspd, False, 20, True),
+            figsize=fig_size)
 
         return True
 
@@ -521,8 +501,9 @@ class TCComparer(object):
                                               hour_info_pt_idx):
         Match = utils.create_match_table(self, self.sources)
 
+        interped_tcs = tc_track.hourly_tcs(tc, next_tc)
         for h in range(hours):
-            interped_tc = utils.interp_tc(self, h, tc, next_tc)
+            interped_tc = interped_tcs[h]
 
             if interped_tc.date_time not in hour_info_pt_idx.keys():
                 # update corrseponding match
@@ -556,8 +537,9 @@ class TCComparer(object):
         self, tc, next_tc, hours, match_dt, spatial_temporal_info,
         hour_info_pt_idx):
         #
+        interped_tcs = tc_track.hourly_tcs(tc, next_tc)
         for h in range(hours):
-            interped_tc = utils.interp_tc(self, h, tc, next_tc)
+            interped_tc = interped_tcs[h]
 
             if interped_tc.date_time not in match_dt:
                 print((f"""[Skip] {self.sources_str} """
@@ -792,104 +774,9 @@ class TCComparer(object):
         return True
 
     def sfmr_rounded_hours(self, tc, next_tc, spatial_temporal_info):
-        # Include start hour, but not end hour
-        # To let all intervals same
-        hours_between_two_tcs = []
-        datetime_area = dict()
-        hour_info_pt_idx = dict()
-
-        delta = next_tc.date_time - tc.date_time
-        hours = int(delta.seconds / 3600)
-
-        # if (next_tc.date_time == datetime.datetime(2018, 7, 10, 18, 0)
-        #     or tc.date_time == datetime.datetime(2018, 7, 10, 18, 0)):
-        #     breakpoint()
-
-        for h in range(hours):
-            interp_dt = tc.date_time + datetime.timedelta(
-                seconds = h * 3600)
-            hours_between_two_tcs.append(interp_dt)
-
-            datetime_area[interp_dt] = dict()
-
-            tc_pre = tc
-            interped_tc = utils.interp_tc(self, h, tc, next_tc)
-            tc_aft = tc
-            if tc.date_time == next_tc.date_time:
-            # if tc_pre.date_time != tc_aft.date_time:
-                breakpoint()
-
-            datetime_area[interp_dt]['lon1'] = \
-                    interped_tc.lon - self.half_reg_edge
-            datetime_area[interp_dt]['lon2'] = \
-                    interped_tc.lon + self.half_reg_edge
-            datetime_area[interp_dt]['lat1'] = \
-                    interped_tc.lat - self.half_reg_edge
-            datetime_area[interp_dt]['lat2'] = \
-                    interped_tc.lat + self.half_reg_edge
-
-        # traverse all brief info of SFMR file
-        for info_idx, info in enumerate(spatial_temporal_info):
-            year = info.start_datetime.year
-            file_path = (
-                f"""{self.CONFIG['sfmr']['dirs']['hurr']}"""
-                f"""{year}/{info.hurr_name}/{info.filename}"""
-            )
-            dataset = netCDF4.Dataset(file_path)
-
-            # VERY VERY IMPORTANT: netCDF4 auto mask may cause problems,
-            # so must disable auto mask
-            dataset.set_auto_mask(False)
-            vars = dataset.variables
-            length = len(vars['TIME'])
-
-            # Traverse all data points of selected SFMR file
-            for i in range(length):
-                # Round SFMR data point's datetime to hours
-                try:
-                    pt_date = vars['DATE'][i]
-                    pt_time = vars['TIME'][i]
-                    # It seems that near the end of SFMR data array,
-                    # DATE will be 0
-                    if pt_date == 0:
-                        continue
-
-                    pt_datetime = datetime.datetime.combine(
-                        utils.sfmr_nc_converter('DATE', pt_date),
-                        utils.sfmr_nc_converter('TIME', pt_time)
-                    )
-                    rounded_hour = utils.hour_rounder(pt_datetime)
-                except Exception as msg:
-                    breakpoint()
-                    exit(msg)
-
-                # Check whether rounded hours are in hours between
-                # two TCs
-                if rounded_hour not in hours_between_two_tcs:
-                    continue
-
-                lon = (vars['LON'][i] + 360) % 360
-                lat = vars['LAT'][i]
-
-                # Check whether SFMR data points are in area around
-                # TC at rounded hour
-                if (lon < datetime_area[rounded_hour]['lon1']
-                    or lon > datetime_area[rounded_hour]['lon2']
-                    or lat < datetime_area[rounded_hour]['lat1']
-                    or lat > datetime_area[rounded_hour]['lat2']):
-                    continue
-                rounded_hour_idx = hours_between_two_tcs.index(
-                    rounded_hour)
-
-                # Add SFMR data point index into `hour_info_pt_idx`
-                if rounded_hour not in hour_info_pt_idx:
-                    hour_info_pt_idx[rounded_hour] = dict()
-                if info_idx not in hour_info_pt_idx[rounded_hour]:
-                    hour_info_pt_idx[rounded_hour][info_idx] = []
-
-                hour_info_pt_idx[rounded_hour][info_idx].append(i)
-
-        return hour_info_pt_idx
+        return utils.sfmr_rounded_hours(self, tc, next_tc,
+                                        spatial_temporal_info,
+                                        self.half_reg_edge)
 
     def sfmr_exists(self, tc, next_tc):
         """Check the existence of SFMR data between two
@@ -913,144 +800,14 @@ class TCComparer(object):
                     between two IBTrACS records.
 
         """
-
-        # Rough temporally check
-        temporal_existence, temporal_sfmr_info = \
-                self.sfmr_temporally_exists(tc, next_tc)
-        if not temporal_existence:
-            return False, None
-
-        # Rough spaitally check
-        spatial_existence, spatial_temporal_sfmr_info = \
-                self.sfmr_spatially_exists(tc, next_tc,
-                                           temporal_sfmr_info)
-        if not spatial_existence:
-            return False, None
-
-        # Detailed check
-        # ???
-
-        return True, spatial_temporal_sfmr_info
-
-    def sfmr_temporally_exists(self, tc, next_tc):
-        existence = False
-        temporal_info = []
-
-        table_name = self.CONFIG['sfmr']['table_names']['brief_info']
-        BriefInfo = utils.get_class_by_tablename(self.engine,
-                                                 table_name)
-
-        direct_query = self.session.query(BriefInfo).filter(
-            BriefInfo.end_datetime > tc.date_time,
-            BriefInfo.start_datetime < next_tc.date_time)
-        count_sum = direct_query.count()
-
-        if count_sum:
-            existence = True
-            for row in direct_query:
-                temporal_info.append(row)
-
-        return existence, temporal_info
-
-    def sfmr_spatially_exists(self, tc, next_tc, temporal_info):
-        # It seems that need to compare rectangle of SFMR range with
-        # regression range of area around TC in a specified hour, not
-        # the period between two neighbouring TCs
-        existence = False
-        spatial_temporal_info = []
-
-        delta = next_tc.date_time - tc.date_time
-
-        # Calculate the circumscribed rectangle of all area of regression
-        # on every hour between two neighbouring TCs
-        hours = int(delta.seconds / 3600)
-        # Spatial shift
-        try:
-            lon_shift, lat_shift = utils.get_center_shift_of_two_tcs(
-                next_tc, tc)
-            hourly_lon_shift = lon_shift / hours
-            hourly_lat_shift = lat_shift / hours
-        except Exception as msg:
-            breakpoint()
-            exit(msg)
-        half_reg_edge = self.reg_edge / 2
-        corners = {'left': [], 'top': [], 'right': [], 'bottom': []}
-        # Extract from the interval between two TC records
-        for h in range(hours):
-            interped_tc_lon = (h * hourly_lon_shift + tc.lon)
-            interped_tc_lat = (h * hourly_lat_shift + tc.lat)
-            corners['left'].append(interped_tc_lon - half_reg_edge)
-            corners['top'].append(interped_tc_lat + half_reg_edge)
-            corners['right'].append(interped_tc_lon + half_reg_edge)
-            corners['bottom'].append(interped_tc_lat - half_reg_edge)
-        # Describe rectangle of regression area between two TCs
-        left_top_tc = utils.Point(min(corners['left']),
-                                  max(corners['top']))
-        right_bottom_tc = utils.Point(max(corners['right']),
-                                      min(corners['bottom']))
-
-        for info in temporal_info:
-            left_top_sfmr = utils.Point(info.min_lon, info.max_lat)
-            right_bottom_sfmr = utils.Point(info.max_lon, info.min_lat)
-            if utils.doOverlap(left_top_tc, right_bottom_tc,
-                               left_top_sfmr, right_bottom_sfmr):
-                existence = True
-                spatial_temporal_info.append(info)
-
-        return existence, spatial_temporal_info
+        return utils.sfmr_exists(self, tc, next_tc, self.half_reg_edge)
 
     def interp_tc(self, h, tc, next_tc):
         """Get sid, interpolated datetime, longitude and latitude of
         two neighbouring TC records.
 
         """
-        try:
-            # Temporal shift
-            delta = next_tc.date_time - tc.date_time
-            hours = int(delta.seconds / 3600)
-            # Spatial shift
-            lon_shift, lat_shift = utils.get_center_shift_of_two_tcs(
-                next_tc, tc)
-            hourly_lon_shift = lon_shift / hours
-            hourly_lat_shift = lat_shift / hours
-
-            # Get IBTrACS table
-            table_name = self.CONFIG['ibtracs']['table_name'][
-                self.basin]
-            IBTrACS = utils.get_class_by_tablename(self.engine,
-                                                   table_name)
-            # ATTENTIONL: DO NOT direct use `interped_tc = tc`
-            # Because it makes a link between two variables
-            # any modification will simultaneously change two variables
-            interped_tc = IBTrACS()
-            interped_tc.sid = tc.sid
-            interped_tc.name = tc.name
-            # interped_tc.basin = tc.basin
-            # interped_tc.pres = tc.pres
-            # interped_tc.wind = tc.wind
-            # interped_tc.r34_ne = tc.r34_ne
-            # interped_tc.r34_se = tc.r34_se
-            # interped_tc.r34_sw = tc.r34_sw
-            # interped_tc.r34_nw = tc.r34_nw
-            # interped_tc.r50_ne = tc.r50_ne
-            # interped_tc.r50_ne = tc.r50_ne
-            # interped_tc.r50_se = tc.r50_se
-            # interped_tc.r50_sw = tc.r50_sw
-            # interped_tc.r64_nw = tc.r64_nw
-            # interped_tc.r64_se = tc.r64_se
-            # interped_tc.r64_sw = tc.r64_sw
-            # interped_tc.r64_nw = tc.r64_nw
-            # Only interpolate `date_time`, `lon`, `lat` variables
-            # Other variables stays same with `tc`
-            interped_tc.date_time = tc.date_time + datetime.timedelta(
-                seconds = h * 3600)
-            interped_tc.lon = (h * hourly_lon_shift + tc.lon)
-            interped_tc.lat = (h * hourly_lat_shift + tc.lat)
-        except Exception as msg:
-            breakpoint()
-            exit(msg)
-
-        return interped_tc
+        return utils.interp_tc(self, h, tc, next_tc)
 
     def compare_between_two_tc_records(self, tc, next_tc):
         # Temporal shift
@@ -1500,8 +1257,8 @@ class TCComparer(object):
         if 'smap' in self.sources or self.force_align_smap:
             smap_lons, smap_lats, diff_mins = \
                     utils.get_xyz_matrix_of_smap_windspd_or_diff_mins(
-                        'diff_mins', file_path, tc.date_time,
-                        draw_region)
+                        'diff_mins', self._open_smap_dataset(file_path),
+                        tc.date_time, draw_region)
             if diff_mins is None:
                 return None, None
             # Not all points of area has this feature
@@ -1564,6 +1321,24 @@ class TCComparer(object):
 
         return True, smap_lons, smap_lats
 
+    def _open_smap_dataset(self, file_path):
+        """Keep SMAP daily file open, because hours of the same day read
+        the same file one after another.
+
+        """
+        if self.smap_dataset is not None:
+            if self.smap_dataset[0] == file_path:
+                return self.smap_dataset[1]
+            self.smap_dataset[1].close()
+
+        dataset = netCDF4.Dataset(file_path)
+        # VERY VERY IMPORTANT: netCDF4 auto mask all windspd which
+        # faster than 1 m/s, so must disable auto mask
+        dataset.set_auto_mask(False)
+        self.smap_dataset = (file_path, dataset)
+
+        return dataset
+
     def get_smap_xyz_matrix(self, tc, smap_lons, smap_lats):
         satel_manager = satel_scs.SCSSatelManager(
             self.CONFIG, self.period, self.region,
@@ -1575,14 +1350,9 @@ class TCComparer(object):
 
         draw_region = [min(smap_lats), max(smap_lats),
                        min(smap_lons), max(smap_lons)]
-        lons, lats, windspd = \
-            utils.get_xyz_matrix_of_smap_windspd_or_diff_mins(
-                'windspd', smap_file_path, tc.date_time,
-                draw_region)
-
-        lons, lats, diff_mins = \
-            utils.get_xyz_matrix_of_smap_windspd_or_diff_mins(
-                'diff_mins', smap_file_path, tc.date_time,
+        lons, lats, windspd, diff_mins = \
+            utils.read_smap_windspd_and_diff_mins(
+                self._open_smap_dataset(smap_file_path), tc.date_time,
                 draw_region)
 
         if (windspd is None
@@ -1602,7 +1372,7 @@ class TCComparer(object):
             tc.date_time)
 
         lons, lats, windspd = utils.get_xyz_matrix_of_ccmp_windspd(
-            ccmp_file_path, tc.date_time, self.region)
+            ccmp_file_path, tc.date_time, self.region, self.CONFIG)
 
         if windspd is not None:
             return True, lons, lats, windspd, utils.if_mesh(lons)
@@ -1650,6 +1420,6 @@ class TCComparer(object):
 
         lons, lats, windspd = utils.get_xyz_matrix_of_era5_windspd(
             era5_file_path, 'single_levels', tc.date_time,
-            draw_region)
+            draw_region, self.CONFIG)
 
         return True, lons, lats, windspd, utils.if_mesh(lons), None
@@ -1,6 +1,5 @@
 import datetime
 import logging
-import pickle
 
 import numpy as np
 import matplotlib.pyplot as plt
@@ -140,12 +139,9 @@ class CoverageManager(object):
             'sentinel_1': 'windspd'
         }
 
-        grid_lons_lats = dict()
-
-        for name in ['lons', 'lats']:
-            pickle_path = self.CONFIG['grid']['pickle'][name]
-            with open(pickle_path, 'rb') as f:
-                grid_lons_lats[name] = pickle.load(f)
+        shared_grid = grid.get_shared_grid(self.CONFIG)
+        grid_lons_lats = {'lons': shared_grid.lons_list,
+                          'lats': shared_grid.lats_list}
 
         query_for_count = self.session.query(SatelERA5).filter(
             SatelERA5.satel_datetime >= this_hour,
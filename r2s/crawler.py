@@ -0,0 +1,175 @@
+"""Crawl web pages concurrently with conditional requests.
+
+Pages are fetched by asyncio tasks which run requests through one shared
+requests.Session, so connections are reused.  A semaphore bounds the
+number of pages in flight.  ETag and Last-Modified validators of every
+page are kept in a pickle cache, so a refreshed page that has not changed
+comes back as '304 Not Modified' without a body.  Pages that do not
+need refreshing, e.g. pages of finished hurricane seasons, are served
+from the cache without any request.
+
+"""
+import asyncio
+import logging
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class PageCache(object):
+    """Persistent cache of page text and its validators.
+
+    """
+    def __init__(self, path):
+        self.path = path
+        self.pages = dict()
+        self.lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                self.pages = pickle.load(f)
+
+    def get(self, url):
+        with self.lock:
+            return self.pages.get(url, None)
+
+    def put(self, url, text, etag=None, last_modified=None):
+        with self.lock:
+            self.pages[url] = {
+                'text': text,
+                'etag': etag,
+                'last_modified': last_modified,
+            }
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with self.lock:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(self.pages, f)
+        os.replace(tmp_path, self.path)
+
+
+class AsyncPageCrawler(object):
+    """Fetch many pages concurrently with bounded concurrency.
+
+    Parameters
+    ----------
+    cache_path : str
+        Path of pickle file of PageCache.  Empty string disables
+        persistence.
+    concurrency : int
+        Max number of pages in flight.
+    retry_times : int
+        Times to retry a page after network error.
+    timeout : float
+        Timeout of each request in seconds.
+
+    """
+    def __init__(self, cache_path, concurrency=8, retry_times=3,
+                 timeout=60):
+        self.cache = PageCache(cache_path)
+        self.concurrency = concurrency
+        self.retry_times = retry_times
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch_all(self, urls, refresh=None):
+        """Fetch pages of urls.
+
+        Parameters
+        ----------
+        urls : list of str
+            Urls of pages.
+        refresh : callable, optional
+            Called with url and returns whether a cached page should be
+            revalidated with server.  All cached pages are revalidated
+            when it is None.
+
+        Returns
+        -------
+        texts : dict
+            Key is url and value is page text, or None when page cannot
+            be fetched.
+
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return dict()
+
+        loop = asyncio.new_event_loop()
+        try:
+            texts = loop.run_until_complete(self._fetch_all(urls, refresh))
+        finally:
+            loop.close()
+        self.cache.save()
+
+        return texts
+
+    def fetch(self, url, refresh=None):
+        return self.fetch_all([url], refresh)[url]
+
+    async def _fetch_all(self, urls, refresh):
+        loop = asyncio.get_event_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            async def bounded_fetch(url):
+                cached = self.cache.get(url)
+                if (cached is not None and refresh is not None
+                        and not refresh(url)):
+                    return cached['text']
+                async with semaphore:
+                    return await loop.run_in_executor(
+                        executor, self._fetch_page, url, cached)
+
+            texts = await asyncio.gather(*[bounded_fetch(url)
+                                           for url in urls])
+
+        return dict(zip(urls, texts))
+
+    def _fetch_page(self, url, cached):
+        headers = dict()
+        if cached is not None:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        for retry in range(self.retry_times + 1):
+            if retry:
+                time.sleep(2 ** min(retry - 1, 6))
+            try:
+                res = self.session.get(url, headers=headers,
+                                       timeout=self.timeout)
+            except requests.exceptions.RequestException as msg:
+                logger.warning(f'{msg} when crawling {url}')
+                continue
+
+            if res.status_code == 304 and cached is not None:
+                return cached['text']
+            if res.status_code == 200:
+                self.cache.put(url, res.text, res.headers.get('ETag'),
+                               res.headers.get('Last-Modified'))
+                return res.text
+            if res.status_code == 404:
+                break
+            logger.warning(f'Status {res.status_code} when crawling {url}')
+
+        logger.error(f'Fail to crawl {url}')
+        if cached is not None:
+            return cached['text']
+
+        return None
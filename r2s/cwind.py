@@ -3,6 +3,7 @@
 """
 import datetime
 import gzip
+import io
 import logging
 import math
 import pickle
@@ -292,74 +293,67 @@ class CwindManager(object):
         except EOFError as msg:
             exit(msg + ': ' + data_path)
 
-        temp_filename = data_name[0:-3]
-        with open(temp_filename, 'wb') as txt:
-            txt.write(cwind_text)
         # Specify data type of columns of unzipped gzip file
         data_type = {'names': ('year', 'month', 'day', 'hour',
                                'minute', 'wdir', 'wspd',
                                'gdr', 'gst', 'gtime'),
                      'formats': ('i4', 'i2', 'i2', 'i2', 'i2',
                                  'f4', 'f4', 'f4', 'f4', 'i4')}
-        data = np.genfromtxt(temp_filename, skip_header=1,
+        # Parse decompressed text in memory instead of writing it
+        # to a temporary file
+        data = np.genfromtxt(io.BytesIO(cwind_text), skip_header=1,
                              invalid_raise=False, dtype=data_type)
-        os.remove(temp_filename)
-
-        # Store Continuous Wind Data in an entire year into a list
-        cwind_1_year = []
+        if data.size < 4:
+            return None
 
         if data[3]['year'] < 100:
             year_base = 1900
         else:
             year_base = 0
 
-        for row in data:
-            # watch datatype of each column
-            # breakpoint()
+        # All rows are sorted in chronological order, so rows in
+        # period can be found with binary search
+        times = utils.ndbc_datetime64(data, year_base)
+        window = utils.sorted_period_slice(times, self.period)
+        data = data[window]
+        times = times[window]
+
+        valid = (data['wspd'] != 99.0) & (data['wdir'] != 999)
+        if not valid.any():
+            return None
+        data = data[valid]
+        times = times[valid]
+
+        # Query station information once for the whole file
+        anemometer_elev = self.session.query(CwindStation).\
+                filter_by(id=data_name[:-12]).\
+                first().anemometer_elev
+        wspd_10 = utils.convert_10(data['wspd'], anemometer_elev)
+
+        gst = np.where(data['gst'] == 99.0, np.nan, data['gst'])
+        gdr = np.where(data['gdr'] == 999, np.nan, data['gdr'])
+        gtime = data['gtime'] % 100
+
+        # Store Continuous Wind Data in an entire year into a list
+        cwind_1_year = []
+
+        for idx, dt in enumerate(times.astype(datetime.datetime)):
             # Every row of data is the record of 10 minutes
             cwind_10_mins = DataOfStation()
-            row['year'] = year_base + row['year']
-            cwind_10_mins.datetime = datetime.datetime(
-                int(row['year']), int(row['month']), int(row['day']),
-                int(row['hour']), int(row['minute']), 0)
-            # When row's datetime is after period, skip all rows
-            # left, because all rows are sorted in chronological
-            # order
-            if cwind_10_mins.datetime > self.period[1]:
-                break
-            elif (cwind_10_mins.datetime < self.period[0]
-                  or cwind_10_mins.datetime is None):
-                continue
-            anemometer_elev = self.session.query(CwindStation).\
-                    filter_by(id=data_name[:-12]).\
-                    first().anemometer_elev
-            if row['wspd'] == 99.0:
-                continue
-            else:
-                cwind_10_mins.wspd = float(row['wspd'])
-            if cwind_10_mins.wspd is None:
-                continue
-            cwind_10_mins.wspd_10 = utils.convert_10(float(row['wspd']),
-                                                      anemometer_elev)
-            if row['wdir'] == 999:
-                continue
-            else:
-                cwind_10_mins.wdir = float(row['wdir'])
-            if cwind_10_mins.wdir is None:
-                continue
-            cwind_10_mins.gst = (None if row['gst'] == 99.0 \
-                                 else float(row['gst']))
-            cwind_10_mins.gdr = (None if row['gdr'] == 999 \
-                                 else float(row['gdr']))
-            cwind_10_mins.gtime = (None if row['gtime']%100 == 99 \
-                                   else int(row['gtime'])%100)
+            cwind_10_mins.date_time = dt
+            cwind_10_mins.wspd = float(data['wspd'][idx])
+            cwind_10_mins.wspd_10 = float(wspd_10[idx])
+            cwind_10_mins.wdir = float(data['wdir'][idx])
+            cwind_10_mins.gst = (None if np.isnan(gst[idx])
+                                 else float(gst[idx]))
+            cwind_10_mins.gdr = (None if np.isnan(gdr[idx])
+                                 else float(gdr[idx]))
+            cwind_10_mins.gtime = (None if gtime[idx] == 99
+                                   else int(gtime[idx]))
 
             cwind_1_year.append(cwind_10_mins)
 
-        if len(cwind_1_year):
-            return cwind_1_year
-        else:
-            return None
+        return cwind_1_year
 
     def _extract_station_info(self, station_info_path):
         station = CwindStation()
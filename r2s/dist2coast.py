@@ -0,0 +1,171 @@
+"""Answer distance-to-coast queries from the NASA dist2coast raster.
+
+NASA OBPG distributes distance to the nearest coast as a text file of
+'lon\\tlat\\tdist' lines on a global 0.04 degree grid, i.e. 4500 x 9000
+points.  It used to be loaded into a SQL table and queried once per
+point.  Dist2CoastRaster converts the text file once into a float32
+``.npy`` raster and memory-maps it in later runs, so that queries of any
+number of points are answered by index arithmetic.  Longitude can be in
+either [-180, 180] or [0, 360).
+
+"""
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TXT_PATH = '../data/dist2coast/dist2coast.txt'
+DEFAULT_PATH = '../data/dist2coast/dist2coast_0.04.npy'
+
+SPA_RESOLU = 0.04
+# Coordinates of first raster point
+LAT_START = -89.98
+LON_START = -179.98
+LATS_NUM = 4500
+LONS_NUM = 9000
+
+_default_rasters = dict()
+_default_rasters_lock = threading.Lock()
+
+
+class Dist2CoastRaster(object):
+    """Distance to coast in kilometers on the global 0.04 degree grid.
+
+    Row i of raster is latitude -89.98 + 0.04 * i and column j is
+    longitude -179.98 + 0.04 * j.  Points get the distance of the
+    nearest raster point.  Positive distance is over ocean and
+    negative distance is over land.
+
+    Parameters
+    ----------
+    path : str
+        Path of ``.npy`` file of raster.  It is generated from
+        `txt_path` when it does not exist.
+    txt_path : str
+        Path of dist2coast text file of NASA.
+
+    """
+    def __init__(self, path=DEFAULT_PATH, txt_path=DEFAULT_TXT_PATH):
+        self.path = path
+        self.txt_path = txt_path
+
+        if not os.path.exists(path):
+            self.build()
+
+        self.raster = np.load(path, mmap_mode='r')
+        if self.raster.shape != (LATS_NUM, LONS_NUM):
+            raise ValueError((f"""Shape of dist2coast raster {path} is """
+                              f"""{self.raster.shape}, while """
+                              f"""({LATS_NUM}, {LONS_NUM}) is expected"""))
+
+    def build(self, chunksize=5000000):
+        """Convert text file into raster and save it.
+
+        """
+        logger.info(f'Building dist2coast raster {self.path}')
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+        tmp_path = f'{self.path}.tmp.npy'
+        raster = np.lib.format.open_memmap(
+            tmp_path, mode='w+', dtype=np.float32,
+            shape=(LATS_NUM, LONS_NUM))
+        raster[:] = np.nan
+
+        reader = pd.read_csv(self.txt_path, sep=r'\s+', header=None,
+                             names=['lon', 'lat', 'dist2coast'],
+                             dtype=np.float64, chunksize=chunksize)
+        for chunk in reader:
+            lat_idx, lon_idx = self.indices(chunk['lat'].values,
+                                            chunk['lon'].values)
+            raster[lat_idx, lon_idx] = chunk['dist2coast'].values
+        raster.flush()
+        del raster
+
+        os.replace(tmp_path, self.path)
+
+    def indices(self, lat, lon):
+        """Get indices of raster points nearest to points.  A point
+        halfway between two raster points gets the southern or western
+        one.
+
+        """
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        # Convert longitude into [-180, 180)
+        lon = np.mod(lon + 180, 360) - 180
+
+        lat_idx = np.ceil((lat - LAT_START) / SPA_RESOLU - 0.5).astype(int)
+        lat_idx = np.clip(lat_idx, 0, LATS_NUM - 1)
+        lon_idx = np.ceil((lon - LON_START) / SPA_RESOLU - 0.5).astype(int)
+        lon_idx = np.clip(lon_idx, 0, LONS_NUM - 1)
+
+        return lat_idx, lon_idx
+
+    def distance(self, lat, lon):
+        """Get distance to coast of points.
+
+        Parameters
+        ----------
+        lat : float or array_like
+            Latitude in degree.
+        lon : float or array_like
+            Longitude in degree, in either [-180, 180] or [0, 360).
+
+        Returns
+        -------
+        dist : float or numpy.ndarray
+            Distance in kilometers.  A float is returned when both
+            inputs are scalars.  It is NaN where text file has no
+            point.
+
+        """
+        lat_idx, lon_idx = self.indices(lat, lon)
+        dist = self.raster[lat_idx, lon_idx]
+
+        if np.ndim(dist) == 0:
+            return float(dist)
+
+        return np.asarray(dist)
+
+    def region(self, lon1, lon2, lat1, lat2):
+        """Get raster points in region, boundaries included.
+
+        Returns
+        -------
+        lons, lats : numpy.ndarray
+            Coordinates of raster points of region in [-180, 180).
+        dist : numpy.ndarray
+            Distance of raster points in kilometers, whose row is
+            latitude and column is longitude.
+
+        """
+        lats = LAT_START + SPA_RESOLU * np.arange(LATS_NUM)
+        lons = LON_START + SPA_RESOLU * np.arange(LONS_NUM)
+        lat_mask = (lats >= lat1) & (lats <= lat2)
+        lon_mask = (lons >= lon1) & (lons <= lon2)
+
+        return (lons[lon_mask], lats[lat_mask],
+                np.asarray(self.raster[lat_mask][:, lon_mask]))
+
+
+def get_dist2coast(CONFIG=None):
+    """Get dist2coast raster shared by the whole process.
+
+    Paths are read from CONFIG['dist2coast'] when CONFIG is given,
+    otherwise defaults are used.
+
+    """
+    path, txt_path = DEFAULT_PATH, DEFAULT_TXT_PATH
+    if CONFIG is not None and 'dist2coast' in CONFIG:
+        path = CONFIG['dist2coast'].get('path', path)
+        txt_path = CONFIG['dist2coast'].get('txt_path', txt_path)
+
+    with _default_rasters_lock:
+        if path not in _default_rasters:
+            _default_rasters[path] = Dist2CoastRaster(path, txt_path)
+
+    return _default_rasters[path]
@@ -1,14 +1,15 @@
 """Download and read ERA5 reanalysis data from ECMWF.
 
 """
+import collections
 import datetime
+import functools
 import logging
 import math
 import os
 import sys
 import time
 
-import cdsapi
 import pygrib
 import numpy as np
 from sqlalchemy.ext.declarative import declarative_base
@@ -20,9 +21,10 @@ import numpy as np
 from mpl_toolkits.basemap import Basemap
 from matplotlib import patches as mpatches
 import matplotlib.pyplot as plt
-from global_land_mask import globe
 
+import cds_queue
 import ibtracs
+import landmask
 import utils
 
 Base = declarative_base()
@@ -38,6 +40,7 @@ class ERA5Manager(object):
     def __init__(self, CONFIG, period, region, passwd, work,
                  save_disk, work_mode, vars_mode):
         self.CONFIG = CONFIG
+        self.land_mask = landmask.get_land_mask(CONFIG)
         self.period = period
         self.region = region
         self.db_root_passwd = passwd
@@ -54,7 +57,8 @@ class ERA5Manager(object):
         self.main_hours = self.CONFIG['era5']['main_hours']
         self.edge = self.CONFIG['regression']['edge_in_degree']
 
-        self.cdsapi_client = cdsapi.Client()
+        # Retrievals are shared by all ERA5Manager instances
+        self.cds_queue = cds_queue.get_queue(CONFIG)
         self.vars = self.CONFIG['era5']['vars']
         self.surface_pres_lvl = '1000'
 
@@ -231,7 +235,7 @@ class ERA5Manager(object):
     def download_single_levels_vars(self, vars_mode, target_datetime,
                                     time_mode, times, area,
                                     match_satel, filename_suffix,
-                                    show_info=False):
+                                    show_info=False, wait=True):
         era5_dirs = self.CONFIG['era5']['dirs']\
                 ['reanalysis_single_levels']
 
@@ -272,7 +276,7 @@ class ERA5Manager(object):
         else:
             return None
 
-        if os.path.exists(file_path):
+        if os.path.exists(file_path) and wait:
             return file_path
 
         if show_info:
@@ -301,21 +305,18 @@ class ERA5Manager(object):
             'time':hour_times
         }
 
-        try:
-            self.cdsapi_client.retrieve(
-                'reanalysis-era5-single-levels',
-                request,
-                file_path)
-        except Exception as msg:
-            breakpoint()
+        future = self.cds_queue.submit('reanalysis-era5-single-levels',
+                                       request, file_path)
+        if not wait:
+            return future
 
-        return file_path
+        return future.result()
 
     def download_pressure_levels_vars(self, vars_mode,
                                       target_datetime, time_mode,
                                       times, area, pressure_levels,
                                       match_satel, filename_suffix,
-                                      show_info=False):
+                                      show_info=False, wait=True):
         era5_dirs = self.CONFIG['era5']['dirs']\
                 ['reanalysis_pressure_levels']
 
@@ -338,7 +339,7 @@ class ERA5Manager(object):
         else:
             return None
 
-        if os.path.exists(file_path):
+        if os.path.exists(file_path) and wait:
             return file_path
 
         if show_info:
@@ -367,23 +368,19 @@ class ERA5Manager(object):
             'time':hour_times
         }
 
-        try:
-            self.cdsapi_client.retrieve(
-                'reanalysis-era5-pressure-levels',
-                request,
-                file_path)
-        except Exception as msg:
-            breakpoint()
+        future = self.cds_queue.submit('reanalysis-era5-pressure-levels',
+                                       request, file_path)
+        if not wait:
+            return future
 
-        return file_path
+        return future.result()
 
     def download_major(self, vars_mode, file_path, year, month):
         """Download major of ERA5 data which consists of main hour
-        (0, 6, 12, 18 h) data in one month.
+        (0, 6, 12, 18 h) data in one month.  Return Future of the
+        retrieval.
 
         """
-        if os.path.exists(file_path):
-            return
 
         request = {
             'product_type':'reanalysis',
@@ -404,18 +401,15 @@ class ERA5Manager(object):
             request['variable'] = self.all_vars
             request['pressure_level'] = self.surface_pres_lvl
 
-        self.cdsapi_client.retrieve(
-            'reanalysis-era5-pressure-levels',
-            request,
-            file_path)
+        return self.cds_queue.submit('reanalysis-era5-pressure-levels',
+                                     request, file_path)
 
     def download_minor(self, vars_mode, file_path, year, month, day_str):
         """Download minor of ERA5 data which consists of hours except
-        (0, 6, 12, 18 h) data in one day.
+        (0, 6, 12, 18 h) data in one day.  Return Future of the
+        retrieval.
 
         """
-        if os.path.exists(file_path):
-            return
 
         request = {
             'product_type':'reanalysis',
@@ -436,10 +430,8 @@ class ERA5Manager(object):
             request['variable'] = self.all_vars
             request['pressure_level'] = self.surface_pres_lvl
 
-        self.cdsapi_client.retrieve(
-            'reanalysis-era5-pressure-levels',
-            request,
-            file_path)
+        return self.cds_queue.submit('reanalysis-era5-pressure-levels',
+                                     request, file_path)
 
     def download_and_read(self, work_mode, vars_mode):
         """Download and read ERA5 data.
@@ -496,39 +488,60 @@ class ERA5Manager(object):
         os.makedirs(major_dir, exist_ok=True)
         os.makedirs(minor_dir, exist_ok=True)
 
-        # Download and read major of ERA5
+        # Retrievals are submitted ahead of reading so that several CDS
+        # jobs are in flight while files are read one by one
+        retrievals = []
         for year in self.dt_major.keys():
             for month in self.dt_major[year].keys():
                 file_path = (f'{major_dir}{year}'
                              + f'{str(month).zfill(2)}.grib')
-                self.logger.info(f'Downloading major {file_path}')
-
-                if not os.path.exists(file_path):
-                    self.download_major(vars_mode, file_path, year,
-                                        month)
-
-                self.logger.info(f'Reading major {file_path}')
-                self.read('tc', vars_mode, file_path)
-                if self.save_disk:
-                    os.remove(file_path)
+                retrievals.append(('major', file_path, functools.partial(
+                    self.download_major, vars_mode, file_path, year,
+                    month)))
 
-        # Download and read minor of ERA5
         for year in self.dt_minor.keys():
             for month in self.dt_minor[year].keys():
                 for day_str in self.dt_minor[year][month].keys():
                     file_path = (f'{minor_dir}{year}'
                                  + f'{str(month).zfill(2)}'
                                  + f'{day_str}.grib')
-                    self.logger.info(f'Downloading minor {file_path}')
-
-                    if not os.path.exists(file_path):
-                        self.download_minor(vars_mode, file_path, year, month,
-                                            day_str)
+                    retrievals.append(('minor', file_path,
+                                       functools.partial(
+                                           self.download_minor, vars_mode,
+                                           file_path, year, month,
+                                           day_str)))
+
+        # When saving disk, files are removed after reading, so only as
+        # many retrievals as queue workers are in flight to keep few
+        # downloaded files on disk at the same time
+        if self.save_disk:
+            max_in_flight = self.cds_queue.max_jobs
+        else:
+            max_in_flight = len(retrievals)
+
+        in_flight = collections.deque()
+        next_idx = 0
+        while next_idx < len(retrievals) or in_flight:
+            while (next_idx < len(retrievals)
+                   and len(in_flight) < max_in_flight):
+                part, file_path, download = retrievals[next_idx]
+                self.logger.info(f'Downloading {part} {file_path}')
+                in_flight.append((part, file_path, download()))
+                next_idx += 1
+
+            # Read major and minor of ERA5
+            part, file_path, future = in_flight.popleft()
+            try:
+                future.result()
+            except Exception as msg:
+                self.logger.exception((f"""Fail downloading {part} """
+                                       f"""{file_path}: {msg}"""))
+                continue
 
-                    self.logger.info(f'Reading minor {file_path}')
-                    self.read('tc', vars_mode, file_path)
-                    if self.save_disk:
-                        os.remove(file_path)
+            self.logger.info(f'Reading {part} {file_path}')
+            self.read('tc', vars_mode, file_path)
+            if self.save_disk:
+                os.remove(file_path)
 
     def _get_radii_from_tc_row(self, tc_row):
         r34 = dict()
@@ -890,7 +903,7 @@ class ERA5Manager(object):
 
             # Traverse through parallels then
             for lat in np.linspace(self.lat1, self.lat2, lats_num):
-                is_land = bool(globe.is_land(lat, lon))
+                is_land = self.land_mask.is_land(lat, lon)
                 if is_land:
                     continue
 
@@ -951,6 +964,15 @@ class ERA5Manager(object):
     def read_tc_oriented(self, vars_mode, file_path):
         # load grib file
         grbs = pygrib.open(file_path)
+        # Scan headers of all messages once instead of once per TC
+        # record
+        dt_messages = self._index_grib_messages(grbs)
+        if not dt_messages:
+            grbs.close()
+            return
+        # All messages of file share the same grid
+        grb_lats, grb_lons = grbs.message(1).latlons()
+        grb_lats, grb_lons = grb_lats[:, 0], grb_lons[0, :]
 
         # Get TC table and count its row number
         tc_table_name = self.CONFIG['ibtracs']['table_name']
@@ -963,26 +985,27 @@ class ERA5Manager(object):
         info = f'Reading reanalysis data of TC records'
         self.logger.info(info)
 
-        # Loop all row of TC table
+        # Group TC records by datetime, so that each message is
+        # decoded once for all TC records at its datetime
+        dt_tc_rows = dict()
         for row in self.session.query(TCTable).yield_per(
             self.CONFIG['database']['batch_size']['query']):
 
             # Get TC datetime
             tc_datetime = row.date_time
+            if tc_datetime not in dt_messages:
+                continue
 
             # Get hit result and range of ERA5 data matrix near
             # TC center
             hit, lat1, lat2, lon1, lon2 = \
                     utils.get_subset_range_of_grib(
                         row.lat, row.lon, self.lat_grid_points,
-                        self.lon_grid_points, self.edge, vars_mode='era5',
+                        self.lon_grid_points, self.edge, mode='era5',
                         spatial_resolution=self.spa_resolu)
             if not hit:
                 continue
 
-            count += 1
-            print(f'\r{info} {count}/{total}', end='')
-
             dirs = ['nw', 'sw', 'se', 'ne']
             r34 = dict()
             r34['nw'], r34['sw'], r34['se'], r34['ne'] = \
@@ -995,122 +1018,198 @@ class ERA5Manager(object):
             if skip_compare:
                 continue
 
-            # Get name, sqlalchemy Table class and python original class
-            # of ERA5 table
-            table_name, sa_table, ERA5Table = self.get_era5_table_class(
-                vars_mode, row.sid, tc_datetime)
-
-            # Create entity of ERA5 table
-            era5_table_entity = self._gen_whole_era5_table_entity(
-                vars_mode, ERA5Table, lat1, lat2, lon1, lon2)
-
-            # Record number of successfully reading data matrix of ERA5
-            # grib file near TC center
-            read_hit_count = 0
-
-            # Loop all messages of grib file which consists of
-            # all variables in all pressure levels
-            for m in range(grbs.messages):
-                grb = grbs.message(m+1)
-
-                # Generate datetime of message and compare it with TC's
-                grb_date, grb_time = str(grb.dataDate), str(grb.dataTime)
-                if grb_time == '0':
-                    grb_time = '000'
-                grb_datetime = datetime.datetime.strptime(
-                    f'{grb_date}{grb_time}', '%Y%m%d%H%M%S')
-                if tc_datetime != grb_datetime:
+            if tc_datetime not in dt_tc_rows:
+                dt_tc_rows[tc_datetime] = []
+            dt_tc_rows[tc_datetime].append((row, lat1, lat2, lon1, lon2))
+
+        for tc_datetime, tc_rows in dt_tc_rows.items():
+            cubes = []
+            for row, lat1, lat2, lon1, lon2 in tc_rows:
+                # Get name, sqlalchemy Table class and python original
+                # class of ERA5 table
+                table_name, sa_table, ERA5Table = \
+                        self.get_era5_table_class(vars_mode, row.sid,
+                                                  tc_datetime)
+                # Create arrays of ERA5 data cube
+                era5_cube = self._gen_whole_era5_cube(
+                    vars_mode, lat1, lat2, lon1, lon2)
+                cubes.append({
+                    'row': row, 'area': (lat1, lat2, lon1, lon2),
+                    'table_name': table_name, 'sa_table': sa_table,
+                    'ERA5Table': ERA5Table, 'cube': era5_cube,
+                    # Record number of successfully reading data
+                    # matrix of ERA5 grib file near TC center
+                    'read_hit_count': 0
+                })
+
+            # Loop messages at TC datetime of grib file which consists
+            # of all variables in all pressure levels
+            for m in dt_messages[tc_datetime]:
+                grb = grbs.message(m)
+                # Decode the whole field once and slice every TC cube
+                # from it
+                field = (grb.values, grb_lats, grb_lons)
+
+                for cube in cubes:
+                    lat1, lat2, lon1, lon2 = cube['area']
+                    # extract corresponding data matrix in ERA5
+                    # reanalysis
+                    read_hit = self._read_grb_matrix(
+                        vars_mode, cube['cube'], grb, lat1, lat2,
+                        lon1, lon2, field)
+                    if read_hit:
+                        cube['read_hit_count'] += 1
+
+            for cube in cubes:
+                count += 1
+                print(f'\r{info} {count}/{total}', end='')
+
+                # Skip this cube if not getting data matrix
+                if not cube['read_hit_count']:
                     continue
 
-                # extract corresponding data matrix in ERA5 reanalysis
-                read_hit = self._read_grb_matrix(vars_mode, era5_table_entity,
-                                                 grb, lat1, lat2, lon1,
-                                                 lon2)
-                if read_hit:
-                    read_hit_count += 1
+                # When ERA5 table doesn't exists, sa_table is None.
+                # So need to create it.
+                if cube['sa_table'] is not None:
+                    # Create table of ERA5 data cube
+                    cube['sa_table'].create(self.engine)
+                    self.session.commit()
 
-            # Skip this turn of loop if not getting data matrix
-            if not read_hit_count:
-                continue
-
-            # When ERA5 table doesn't exists, sa_table is None.
-            # So need to create it.
-            if sa_table is not None:
-                # Create table of ERA5 data cube
-                sa_table.create(self.engine)
-                self.session.commit()
+                # ORM rows are only materialized when inserting
+                era5_table_entity = self._materialize_era5_entity(
+                    vars_mode, cube['ERA5Table'], cube['cube'])
 
-            # Write extracted data matrix into DB
-            start = time.process_time()
-            if vars_mode == 'threeD':
-                utils.bulk_insert_avoid_duplicate_unique(
-                    era5_table_entity,
-                    int(self.CONFIG['database']['batch_size']['insert']/10),
-                    ERA5Table, ['x_y_z'], self.session,
-                    check_self=True)
-            elif vars_mode == 'surface_wind' or vars_mode == 'surface_all_vars':
+                # Write extracted data matrix into DB
+                start = time.process_time()
+                if vars_mode == 'threeD':
+                    unique_cols = ['x_y_z']
+                elif (vars_mode == 'surface_wind'
+                      or vars_mode == 'surface_all_vars'):
+                    unique_cols = ['x_y']
                 utils.bulk_insert_avoid_duplicate_unique(
                     era5_table_entity,
                     int(self.CONFIG['database']['batch_size']['insert']/10),
-                    ERA5Table, ['x_y'], self.session,
+                    cube['ERA5Table'], unique_cols, self.session,
                     check_self=True)
-            end = time.process_time()
+                end = time.process_time()
+
+                self.logger.debug((f'Bulk inserting ERA5 data into '
+                                   + f'{cube["table_name"]} in '
+                                   + f'{end-start:2f} s'))
 
-            self.logger.debug((f'Bulk inserting ERA5 data into '
-                               + f'{table_name} in {end-start:2f} s'))
+                self.compare_ibtracs_era5(vars_mode, cube['row'],
+                                          cube['ERA5Table'], draw=True,
+                                          draw_map=True, draw_bar=False)
 
-            self.compare_ibtracs_era5(vars_mode, row, ERA5Table, draw=True,
-                                      draw_map=True, draw_bar=False)
+        grbs.close()
         utils.delete_last_lines()
         print('Done')
 
-    def _gen_whole_era5_table_entity(self, vars_mode, ERA5Table,
-                                     lat1, lat2, lon1, lon2):
-        """Generate entity of ERA5 table. It represents a threeD grid of
-        which center of bottom is the closest grid point near TC
+    def _index_grib_messages(self, grbs):
+        """Index message numbers of grib file by datetime with one
+        scan of message headers.
+
+        Returns
+        -------
+        dt_messages : dict
+            Key is datetime and value is list of 1-based message
+            numbers.
+
+        """
+        dt_messages = dict()
+        for m in range(grbs.messages):
+            grb = grbs.message(m+1)
+            # dataDate is like 20190801 and dataTime is like 600,
+            # which means 06:00
+            grb_date, grb_time = int(grb.dataDate), int(grb.dataTime)
+            grb_datetime = datetime.datetime(
+                grb_date // 10000, grb_date // 100 % 100,
+                grb_date % 100, grb_time // 100, grb_time % 100)
+            if grb_datetime not in dt_messages:
+                dt_messages[grb_datetime] = []
+            dt_messages[grb_datetime].append(m+1)
+
+        return dt_messages
+
+    def _gen_whole_era5_cube(self, vars_mode, lat1, lat2, lon1, lon2):
+        """Generate arrays of ERA5 data cube. It represents a threeD grid
+        of which center of bottom is the closest grid point near TC
         center.
 
+        Coordinates are flattened in order of x, y and z, where z
+        changes fastest.  Variables read from grib messages are stored
+        into 'values' with the same shape and order.
+
         """
-        entity = []
         half_edge_indices = (self.edge / 2 / self.spa_resolu)
+        lon_axis = self.threeD_grid['lon_axis']
+        lat_axis = self.threeD_grid['lat_axis']
 
         if vars_mode == 'threeD':
-            for x in range(self.threeD_grid['lon_axis']):
-                for y in range(self.threeD_grid['lat_axis']):
-                    for z in range(self.threeD_grid['height']):
-                        pt = ERA5Table()
-                        pt.x = x - half_edge_indices
-                        pt.y = y - half_edge_indices
-                        pt.z = z
-                        pt.x_y_z = f'{pt.x}_{pt.y}_{pt.z}'
+            shape = (lon_axis, lat_axis, self.threeD_grid['height'])
+        elif vars_mode == 'surface_wind' or vars_mode == 'surface_all_vars':
+            shape = (lon_axis, lat_axis)
+
+        indices = np.indices(shape)
+        cube = dict()
+        cube['shape'] = shape
+        cube['x'] = (indices[0] - half_edge_indices).ravel()
+        cube['y'] = (indices[1] - half_edge_indices).ravel()
+        cube['lat'] = (lat1 + (indices[1] + 0.5) * self.spa_resolu).ravel()
+        cube['lon'] = ((lon1 + (indices[0] + 0.5) * self.spa_resolu)
+                       % 360).ravel()
+        if vars_mode == 'threeD':
+            cube['z'] = indices[2].ravel()
+            pres_lvls = np.array([int(x) for x in self.threeD_pres_lvl])
+            cube['pres_lvl'] = pres_lvls[cube['z']]
+        cube['values'] = dict()
 
-                        pt.lat = lat1 + (y+0.5) * self.spa_resolu
-                        pt.lon = (lon1 + (x+0.5) * self.spa_resolu) % 360
-                        pt.pres_lvl = int(self.threeD_pres_lvl[z])
+        return cube
 
-                        entity.append(pt)
+    def _materialize_era5_entity(self, vars_mode, ERA5Table, cube):
+        """Generate entity of ERA5 table from arrays of ERA5 data cube.
 
-        elif vars_mode == 'surface_wind' or vars_mode == 'surface_all_vars':
-            for x in range(self.threeD_grid['lon_axis']):
-                for y in range(self.threeD_grid['lat_axis']):
-                    pt = ERA5Table()
-                    pt.x = x - half_edge_indices
-                    pt.y = y - half_edge_indices
-                    pt.x_y = f'{pt.x}_{pt.y}'
+        """
+        entity = []
+        names = list(cube['values'].keys())
+        values = [cube['values'][name].ravel().tolist() for name in names]
 
-                    pt.lat = lat1 + (y+0.5) * self.spa_resolu
-                    pt.lon = (lon1 + (x+0.5) * self.spa_resolu) % 360
+        for i in range(len(cube['x'])):
+            pt = ERA5Table()
+            pt.x = float(cube['x'][i])
+            pt.y = float(cube['y'][i])
+            if vars_mode == 'threeD':
+                pt.z = int(cube['z'][i])
+                pt.x_y_z = f'{pt.x}_{pt.y}_{pt.z}'
+                pt.pres_lvl = int(cube['pres_lvl'][i])
+            else:
+                pt.x_y = f'{pt.x}_{pt.y}'
+            pt.lat = float(cube['lat'][i])
+            pt.lon = float(cube['lon'][i])
 
-                    entity.append(pt)
+            for name, var in zip(names, values):
+                value = var[i]
+                setattr(pt, name, None if math.isnan(value) else value)
+
+            entity.append(pt)
 
         return entity
 
-    def _read_grb_matrix(self, vars_mode, era5, grb, lat1, lat2, lon1, lon2):
+    def _read_grb_matrix(self, vars_mode, cube, grb, lat1, lat2, lon1, lon2,
+                         field=None):
         """Read data matrix of ERA5 of particular variable in particular
-        pressure level.
+        pressure level into ERA5 data cube.
+
+        field is optional tuple of (values, lats, lons) of the decoded
+        message, where lats and lons are 1-D axes.  When it is given,
+        data matrix is sliced from it instead of decoding message again.
 
         """
-        data, lats, lons = grb.data(lat1, lat2, lon1, lon2)
+        if field is None:
+            data, lats, lons = grb.data(lat1, lat2, lon1, lon2)
+        else:
+            data, lats, lons = utils.crop_grib_field(
+                field, lat1, lat2, lon1, lon2)
 
         # Shape of data is (lat_grid_num, lon_grid_num).
         # In the extracted subset of ERA5 data,
@@ -1119,68 +1218,38 @@ class ERA5Manager(object):
         # So need to flip the data matrix along latitude axis
         # to be the same of RSS satellite data matrix arrangement.
         data = np.flip(data, 0)
-        lats = np.flip(lats, 0)
-        lons = np.flip(lons, 0)
         # After fliping, data[0][0] is the data of smallest latitude
         # and smallest longitude
+        data = np.ma.filled(np.ma.asarray(data, dtype=float), np.nan)
+
+        lon_axis = self.threeD_grid['lon_axis']
+        lat_axis = self.threeD_grid['lat_axis']
+        if data.shape[0] < lat_axis + 1 or data.shape[1] < lon_axis + 1:
+            return False
 
         name = grb.name.replace(" ", "_").lower()
         if name == 'vorticity_(relative)':
             name = 'vorticity_relative'
+
+        # ERA5 grid starts from (lat=-90, lon=0),
+        # while RSS grid starts from (lat=-89.875, lon=0.125).
+        # So ERA5 grid points is the corners of RSS grid cells.
+        # Since we decide to use RSS grid,
+        # the value of a cell is the average of its 4 corners.
+        d = data[:lat_axis + 1, :lon_axis + 1]
+        avg = (d[:-1, :-1] + d[1:, :-1] + d[:-1, 1:] + d[1:, 1:]) / 4
+        # Cube is arranged in order of x (lon) then y (lat)
+        avg = avg.T
+
+        if name not in cube['values']:
+            cube['values'][name] = np.full(cube['shape'], np.nan)
         if vars_mode == 'threeD':
             z = self.threeD_pres_lvl.index(str(grb.level))
-        hit_count = 0
-
-        for x in range(self.threeD_grid['lon_axis']):
-            for y in range(self.threeD_grid['lat_axis']):
-                # ERA5 grid starts from (lat=-90, lon=0),
-                # while RSS grid starts from (lat=-89.875, lon=0.125).
-                # So ERA5 grid points is the corners of RSS grid cells.
-                # Since we decide to use RSS grid,
-                # to get the value of a cell, have to get its 4 corners
-                # first: ul=upper_left, ll=lower_left, lr=lower_right,
-                # ur=upper_right
-                """
-                value_ll = utils.convert_dtype(data[y][x])
-                value_ul = utils.convert_dtype(data[y+1][x])
-                value_lr = utils.convert_dtype(data[y][x+1])
-                value_ur = utils.convert_dtype(data[y+1][x+1])
-                values = []
-                for var in [value_ul, value_ll, value_lr, value_ur]:
-                    if var is not None:
-                        values.append(var)
-
-                if not len(values):
-                    continue
-
-                # Average four corner's data value
-                value = sum(values)/float(len(values))
-                """
-                corners = []
-                for tmp_y in [y, y+1]:
-                    for tmp_x in [x, x+1]:
-                        corners.append(data[tmp_y][tmp_x])
-
-                if not len(corners):
-                    continue
-
-                value = float( sum(corners) / len(corners) )
-
-                hit_count += 1
-                if vars_mode == 'threeD':
-                    index = ((x * self.threeD_grid['lat_axis'] * \
-                              self.threeD_grid['height'])
-                             + y * self.threeD_grid['height']
-                             + z)
-                elif vars_mode == 'surface_wind' or vars_mode == 'surface_all_vars':
-                    index = x * self.threeD_grid['lat_axis'] + y
-
-                setattr(era5[index], name, value)
+            cube['values'][name][:, :, z] = avg
+        elif vars_mode == 'surface_wind' or vars_mode == 'surface_all_vars':
+            cube['values'][name][:, :] = avg
 
-        if hit_count:
-            return True
-        else:
-            return False
+        return True
 
     def _update_major_datetime_dict(self, dt_dict, year, month, day, hour):
         """Update major datetime dictionary.
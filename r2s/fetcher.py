@@ -0,0 +1,216 @@
+"""Prefetch remote data files concurrently before they are needed.
+
+Matching stages used to download each daily file at the moment it was
+needed.  FileFetcher takes the whole list of files a run will need and
+downloads them through a bounded thread pool, so that later stages find
+them on disk.  Partial downloads are resumed with HTTP Range requests,
+completed files are validated against the expected size or MD5 checksum
+before being moved into place, and files are copied from a local mirror
+directory when the mirror has them.
+
+"""
+import hashlib
+import logging
+import os
+import shutil
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class FetchJob(object):
+    """Represents a remote file to be fetched.
+
+    Parameters
+    ----------
+    url : str
+        Complete url of file.
+    path : str
+        Saving path of file.
+    size : int, optional
+        Expected size of file in bytes.  When it is None, the
+        Content-Length reported by server is used.
+    md5 : str, optional
+        Expected MD5 hex digest of file.
+
+    """
+    def __init__(self, url, path, size=None, md5=None):
+        self.url = url
+        self.path = path
+        self.size = size
+        self.md5 = md5
+
+
+class FileFetcher(object):
+    """Fetch files concurrently with retries, resumable partial
+    downloads and optional local mirror.
+
+    A file is looked up in the mirror under the path component of its
+    url, e.g. 'http://data.remss.com/smap/a.nc' is served from
+    '{mirror_dir}/smap/a.nc'.
+
+    """
+    def __init__(self, CONFIG, workers=None, mirror_dir=None,
+                 retry_times=None, backoff=1.0, timeout=60):
+        prefetch_config = CONFIG['network'].get('prefetch', dict())
+
+        self.workers = (workers if workers is not None
+                        else prefetch_config.get('workers', 4))
+        self.mirror_dir = (mirror_dir if mirror_dir is not None
+                           else prefetch_config.get('mirror_dir', ''))
+        self.retry_times = (retry_times if retry_times is not None
+                            else CONFIG['network']['retry_times'])
+        self.backoff = backoff
+        self.timeout = timeout
+
+    def prefetch(self, jobs):
+        """Fetch all jobs through a bounded thread pool.
+
+        Returns
+        -------
+        results : dict
+            Key is saving path and value is one of 'exists', 'mirror',
+            'downloaded', 'missing' and 'failed'.
+
+        """
+        # Avoid fetching the same file twice
+        unique_jobs = dict()
+        for job in jobs:
+            unique_jobs.setdefault(job.path, job)
+        if not unique_jobs:
+            return dict()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            statuses = executor.map(self.fetch, unique_jobs.values())
+            results = dict(zip(unique_jobs.keys(), statuses))
+
+        return results
+
+    def fetch(self, job):
+        """Fetch single file.  Exceptions are logged instead of being
+        raised, so that one bad file does not stop the whole prefetch.
+
+        """
+        if os.path.exists(job.path):
+            return 'exists'
+
+        os.makedirs(os.path.dirname(job.path) or '.', exist_ok=True)
+        try:
+            if self._copy_from_mirror(job):
+                return 'mirror'
+            return self._download(job)
+        except Exception as msg:
+            logger.exception((f"""Error occured when fetching """
+                              f"""{job.path} from {job.url}: {msg}"""))
+            return 'failed'
+
+    def _mirror_path(self, url):
+        if not self.mirror_dir:
+            return None
+        url_path = urllib.parse.urlparse(url).path.lstrip('/')
+
+        return os.path.join(self.mirror_dir, url_path)
+
+    def _copy_from_mirror(self, job):
+        mirror_path = self._mirror_path(job.url)
+        if mirror_path is None or not os.path.exists(mirror_path):
+            return False
+
+        part_path = f'{job.path}.part'
+        shutil.copyfile(mirror_path, part_path)
+        if not self._valid(job, part_path, None):
+            os.remove(part_path)
+            logger.warning(f'Invalid mirror file: {mirror_path}')
+            return False
+        os.replace(part_path, job.path)
+
+        return True
+
+    def _download(self, job):
+        part_path = f'{job.path}.part'
+
+        for retry in range(self.retry_times + 1):
+            if retry:
+                logger.info(f'Retry to download file: {job.url}')
+                time.sleep(self.backoff * 2 ** min(retry - 1, 6))
+
+            done = (os.path.getsize(part_path)
+                    if os.path.exists(part_path) else 0)
+            headers = {'Range': f'bytes={done}-'} if done else dict()
+            try:
+                with requests.get(job.url, headers=headers, stream=True,
+                                  timeout=self.timeout) as res:
+                    if res.status_code == 404:
+                        return 'missing'
+                    if res.status_code == 416:
+                        # Range not satisfiable: partial file is
+                        # already complete or corrupt.  Keep it only if
+                        # its length can be checked against total size
+                        # in 'Content-Range: bytes */total', or against
+                        # size or md5 of job, otherwise download again
+                        # from byte 0
+                        total = self._total_size(res, done)
+                        if (total is None and job.size is None
+                                and job.md5 is None):
+                            os.remove(part_path)
+                            continue
+                    elif res.status_code in (200, 206):
+                        total = self._total_size(res, done)
+                        mode = 'ab' if res.status_code == 206 else 'wb'
+                        with open(part_path, mode) as f:
+                            for chunk in res.iter_content(CHUNK_SIZE):
+                                f.write(chunk)
+                    else:
+                        logger.warning((f"""Status {res.status_code} """
+                                        f"""when downloading {job.url}"""))
+                        continue
+            except requests.exceptions.RequestException as msg:
+                logger.warning(f'{msg} when downloading {job.url}')
+                continue
+
+            if self._valid(job, part_path, total):
+                os.replace(part_path, job.path)
+                return 'downloaded'
+
+            # Restart from scratch when the file is corrupt
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+        return 'failed'
+
+    def _total_size(self, res, done):
+        if res.status_code in (206, 416):
+            content_range = res.headers.get('Content-Range', '')
+            total = content_range.split('/')[-1]
+            return int(total) if total.isdigit() else None
+
+        length = res.headers.get('Content-Length')
+        return int(length) if length is not None else None
+
+    def _valid(self, job, path, total):
+        if not os.path.exists(path):
+            return False
+        size = os.path.getsize(path)
+        if job.size is not None and size != job.size:
+            return False
+        if job.size is None and total is not None and size != total:
+            return False
+        if job.md5 is not None and md5sum(path) != job.md5.lower():
+            return False
+
+        return True
+
+
+def md5sum(path):
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            md5.update(chunk)
+
+    return md5.hexdigest()
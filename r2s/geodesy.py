@@ -0,0 +1,176 @@
+"""Vectorized geodesic computations on the WGS-84 ellipsoid.
+
+geopy.distance.distance builds several objects and solves an inverse
+geodesic problem for every call, which dominates loops over many points.
+Functions here accept scalars or numpy arrays and solve all points at
+once.  Longitude can be in either [-180, 180] or [0, 360).
+
+Accuracy
+--------
+distance_km solves the inverse problem with Vincenty's iteration, whose
+error is below 0.1 mm against Karney's algorithm used by geopy.  The
+iteration does not converge for nearly antipodal points, which are
+handed to geopy instead, so results always agree with geopy to better
+than 1 mm.  east_north_shift_km is built on distance_km and has the same
+accuracy.
+
+haversine_km treats the earth as a sphere of mean radius.  It is several
+times faster, but its relative error against the ellipsoid reaches 0.6%,
+e.g. up to 0.6 km over 100 km.
+
+"""
+import numpy as np
+from geopy import distance
+
+# WGS-84 ellipsoid
+A = 6378137.0
+F = 1 / 298.257223563
+B = (1 - F) * A
+
+# Mean radius of earth in kilometers
+MEAN_RADIUS = 6371.0088
+
+MAX_ITERATIONS = 200
+TOLERANCE = 1e-12
+
+
+def _result(values):
+    if np.ndim(values) == 0:
+        return float(values)
+
+    return values
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Get geodesic distance between points in kilometers.
+
+    Parameters
+    ----------
+    lat1, lon1, lat2, lon2 : float or array_like
+        Coordinates of points in degree.  Arrays are broadcast against
+        each other.
+
+    Returns
+    -------
+    dis : float or numpy.ndarray
+        Distance in kilometers.  A float is returned when all inputs
+        are scalars.
+
+    """
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *[np.asarray(x, dtype=float) for x in (lat1, lon1, lat2, lon2)])
+    shape = lat1.shape
+    lat1, lon1, lat2, lon2 = [x.ravel() for x in (lat1, lon1, lat2, lon2)]
+
+    # Longitude difference in [-180, 180)
+    L = np.radians((lon2 - lon1 + 180) % 360 - 180)
+    U1 = np.arctan((1 - F) * np.tan(np.radians(lat1)))
+    U2 = np.arctan((1 - F) * np.tan(np.radians(lat2)))
+    sin_U1, cos_U1 = np.sin(U1), np.cos(U1)
+    sin_U2, cos_U2 = np.sin(U2), np.cos(U2)
+
+    lam = L.copy()
+    converged = np.zeros(L.shape, dtype=bool)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for _ in range(MAX_ITERATIONS):
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            sin_sigma = np.sqrt(
+                (cos_U2 * sin_lam) ** 2
+                + (cos_U1 * sin_U2 - sin_U1 * cos_U2 * cos_lam) ** 2)
+            cos_sigma = sin_U1 * sin_U2 + cos_U1 * cos_U2 * cos_lam
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            sin_alpha = np.where(sin_sigma == 0, 0.0,
+                                 cos_U1 * cos_U2 * sin_lam / sin_sigma)
+            cos_sq_alpha = 1 - sin_alpha ** 2
+            # Points on equator make cos_sq_alpha zero
+            cos_2sigma_m = np.where(
+                cos_sq_alpha == 0, 0.0,
+                cos_sigma - 2 * sin_U1 * sin_U2 / cos_sq_alpha)
+            C = F / 16 * cos_sq_alpha * (4 + F * (4 - 3 * cos_sq_alpha))
+
+            lam_prev = lam
+            lam = L + (1 - C) * F * sin_alpha * (
+                sigma + C * sin_sigma * (
+                    cos_2sigma_m + C * cos_sigma * (
+                        -1 + 2 * cos_2sigma_m ** 2)))
+            converged = np.abs(lam - lam_prev) < TOLERANCE
+            if converged.all():
+                break
+
+        u_sq = cos_sq_alpha * (A ** 2 - B ** 2) / B ** 2
+        big_a = 1 + u_sq / 16384 * (
+            4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+        big_b = u_sq / 1024 * (
+            256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+        delta_sigma = big_b * sin_sigma * (
+            cos_2sigma_m + big_b / 4 * (
+                cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+                - big_b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2)
+                * (-3 + 4 * cos_2sigma_m ** 2)))
+        dis = B * big_a * (sigma - delta_sigma) / 1000
+
+    # Nearly antipodal points
+    for idx in np.nonzero(~converged | np.isnan(dis))[0]:
+        if np.isnan([lat1[idx], lon1[idx], lat2[idx], lon2[idx]]).any():
+            continue
+        dis[idx] = distance.distance(
+            (lat1[idx], (lon1[idx] + 180) % 360 - 180),
+            (lat2[idx], (lon2[idx] + 180) % 360 - 180)).km
+
+    return _result(dis.reshape(shape))
+
+
+def haversine_km(lat1, lon1, lat2, lon2, radius=MEAN_RADIUS):
+    """Get great-circle distance between points on a sphere in
+    kilometers.  Inputs and output are like distance_km.
+
+    """
+    lat1, lon1, lat2, lon2 = [np.radians(np.asarray(x, dtype=float))
+                              for x in (lat1, lon1, lat2, lon2)]
+    h = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    dis = 2 * radius * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+
+    return _result(dis)
+
+
+def east_north_shift_km(base_lat, base_lon, tgt_lat, tgt_lon):
+    """Get eastward and northward shift from base points to target
+    points in kilometers.
+
+    Eastward shift is the geodesic distance from base point to the point
+    at latitude of base point and longitude of target point, and
+    northward shift is the distance from base point to the point at
+    longitude of base point and latitude of target point.  Shifts are
+    negative when target points are west or south of base points.  When
+    longitudes of two points differ more than 20 degrees, the line
+    between them is considered to cross the prime meridian.
+
+    Returns
+    -------
+    east, north : float or numpy.ndarray
+        Floats are returned when all inputs are scalars.
+
+    """
+    base_lat, base_lon, tgt_lat, tgt_lon = [
+        np.asarray(x, dtype=float)
+        for x in (base_lat, base_lon, tgt_lat, tgt_lon)]
+
+    east_dis = np.asarray(distance_km(base_lat, tgt_lon, base_lat,
+                                      base_lon))
+    north_dis = np.asarray(distance_km(tgt_lat, base_lon, base_lat,
+                                       base_lon))
+
+    base_lon_360 = base_lon % 360
+    tgt_lon_360 = tgt_lon % 360
+    # Set the value to check whether the line between two points
+    # across the prime meridian
+    threshold = 20
+    tgt_is_smaller = tgt_lon_360 < base_lon_360
+    across = np.abs(tgt_lon_360 - base_lon_360) > threshold
+    # E.g. target lon: 0.5, base lon: 359.5 is east
+    east_ratio = np.where(across == tgt_is_smaller, 1, -1)
+    north_ratio = np.where(tgt_lat < base_lat, -1, 1)
+
+    return (_result(east_ratio * east_dis),
+            _result(north_ratio * north_dis))
@@ -1,15 +1,17 @@
 import logging
 import os
 import pickle
+import threading
 
+import numpy as np
 from sqlalchemy import create_engine, extract
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Integer, Float, String, DateTime, Boolean
 from sqlalchemy import Table, Column, MetaData
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import mapper
-from global_land_mask import globe
 
+import landmask
 import utils
 
 Base = declarative_base()
@@ -55,58 +57,51 @@ class GridManager(object):
         Base.metadata.create_all(self.engine)
 
         lons, lats = self.gen_lons_lats()
+        save_grid_arrays(self.CONFIG['grid']['npz'], lons, lats)
 
-        xs = [x for x in range(len(lons))]
-        ys = [y for y in range(len(lats))]
-
-        save_pickle = [
-            {'name': 'lons', 'var': lons},
-            {'name': 'lats', 'var': lats},
-            {'name': 'x', 'var': xs},
-            {'name': 'y', 'var': ys}
-        ]
-
-        for name_var_pair in save_pickle:
-            name = name_var_pair['name']
-            var = name_var_pair['var']
-
-            pickle_path = self.CONFIG['grid']['pickle'][name]
-            os.makedirs(os.path.dirname(pickle_path), exist_ok=True)
-            with open(pickle_path, 'wb') as f:
-                pickle.dump(var, f)
-
-        total = len(lons)
+        self.logger.info(f'Generating grid')
+        # Traverse lon first, then lat
+        lon_mesh, lat_mesh = np.meshgrid(np.array(lons), np.array(lats),
+                                         indexing='ij')
+        x_mesh, y_mesh = np.meshgrid(np.arange(len(lons)),
+                                     np.arange(len(lats)), indexing='ij')
+        # Check whether points are ocean or not all at once
+        land = landmask.get_land_mask(self.CONFIG).is_land(lat_mesh,
+                                                           lon_mesh)
         half_edge = 0.5 * self.spa_resolu
 
-        grid_pts = []
-        self.logger.info(f'Generating grid')
-        # Traverse lon
-        for lon_idx, lon in enumerate(lons):
-            print(f'\r{lon_idx+1}/{total}', end='')
-            # Traverse lat
-            for lat_idx, lat in enumerate(lats):
-                # Cal y and x
-                pt = Grid()
-                pt.x = lon_idx
-                pt.y = lat_idx
-                pt.x_y = f'{pt.x}_{pt.y}'
-                pt.lon = lon
-                pt.lat = lat
-                pt.lon1, pt.lon2 = pt.lon - half_edge, pt.lon + half_edge
-                pt.lat1, pt.lat2 = pt.lat - half_edge, pt.lat + half_edge
-                # Check whether the point is ocean or not
-                pt.land = bool(globe.is_land(lat, lon))
-
-                grid_pts.append(pt)
+        cols = {
+            'x': x_mesh.ravel().tolist(),
+            'y': y_mesh.ravel().tolist(),
+            'lon': lon_mesh.ravel().tolist(),
+            'lat': lat_mesh.ravel().tolist(),
+            'land': land.ravel().tolist(),
+            'lon1': (lon_mesh - half_edge).ravel().tolist(),
+            'lon2': (lon_mesh + half_edge).ravel().tolist(),
+            'lat1': (lat_mesh - half_edge).ravel().tolist(),
+            'lat2': (lat_mesh + half_edge).ravel().tolist(),
+        }
+        cols['x_y'] = [f'{x}_{y}' for x, y in zip(cols['x'], cols['y'])]
+
+        # Grid points are unique by construction, so only need to skip
+        # those which are already in table
+        existing = set(x_y for x_y, in self.session.query(Grid.x_y))
+        names = list(cols.keys())
+        mappings = [dict(zip(names, values))
+                    for values in zip(*[cols[name] for name in names])
+                    if values[names.index('x_y')] not in existing]
+
+        # Bulk insert
+        batch_size = self.CONFIG['database']['batch_size']['insert']
+        total = len(mappings)
+        for start in range(0, total, batch_size):
+            print(f'\r{min(start + batch_size, total)}/{total}', end='')
+            self.session.bulk_insert_mappings(
+                Grid, mappings[start:start + batch_size])
+        self.session.commit()
 
         utils.delete_last_lines()
         print('Done')
-        # Bulk insert
-        utils.bulk_insert_avoid_duplicate_unique(
-            grid_pts, self.CONFIG['database']\
-            ['batch_size']['insert'],
-            Grid, ['x_y'], self.session,
-            check_self=True)
 
     def create_grid_table(self):
         table_name = f'grid'
@@ -157,3 +152,64 @@ class GridManager(object):
                     self.lat2 - self.lat1) / self.spa_resolu) + 1)]
 
         return lons, lats
+
+
+class SharedGrid(object):
+    """Read-only longitudes, latitudes and indices of grid.
+
+    lons, lats, x and y are read-only numpy arrays.  lons_list,
+    lats_list, x_list and y_list are tuples of the same values for code
+    which looks up grid points with index().
+
+    """
+    def __init__(self, lons, lats):
+        self.lons = np.array(lons, dtype=float)
+        self.lats = np.array(lats, dtype=float)
+        self.x = np.arange(len(self.lons))
+        self.y = np.arange(len(self.lats))
+
+        for name in ['lons', 'lats', 'x', 'y']:
+            arr = getattr(self, name)
+            arr.flags.writeable = False
+            setattr(self, f'{name}_list', tuple(arr.tolist()))
+
+
+_shared_grid = None
+_shared_grid_lock = threading.Lock()
+
+
+def save_grid_arrays(npz_path, lons, lats):
+    os.makedirs(os.path.dirname(npz_path), exist_ok=True)
+    # np.savez appends '.npz' to path which does not end with it
+    tmp_path = f'{npz_path}.tmp.npz'
+    np.savez(tmp_path, lons=np.array(lons, dtype=float),
+             lats=np.array(lats, dtype=float))
+    os.replace(tmp_path, npz_path)
+
+
+def get_shared_grid(CONFIG):
+    """Get grid shared by all managers of process.  It is loaded at
+    the first call.
+
+    Grid is loaded from npz file generated by GridManager.setup_grid,
+    or from pickle files generated by old versions when the npz file
+    does not exist.
+
+    """
+    global _shared_grid
+
+    with _shared_grid_lock:
+        if _shared_grid is None:
+            npz_path = CONFIG['grid']['npz']
+            if os.path.exists(npz_path):
+                with np.load(npz_path) as npz:
+                    lons, lats = npz['lons'], npz['lats']
+            else:
+                grid_pickles = CONFIG['grid']['pickle']
+                with open(grid_pickles['lons'], 'rb') as f:
+                    lons = pickle.load(f)
+                with open(grid_pickles['lats'], 'rb') as f:
+                    lats = pickle.load(f)
+            _shared_grid = SharedGrid(lons, lats)
+
+    return _shared_grid
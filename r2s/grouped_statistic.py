@@ -0,0 +1,180 @@
+"""Statistics of bias grouped by cells or other integer labels.
+
+Validation sets have millions of pairs of wind speed, so statistics per
+cell are computed in one pass over flat group indices with np.bincount
+instead of collecting Python lists per cell.  Pairs can be weighted, and
+StreamingGroupedStatistic accumulates chunks of pairs, e.g. chunks of a
+SQL query, without holding all of them in memory.
+
+Every function returns a dict of arrays with one element per group:
+
+- 'Count': number of pairs
+- 'Mean bias': mean of bias
+- 'MAE': mean of absolute bias
+- 'RMSE': root mean square of bias
+
+Statistics of empty groups are NaN.
+
+"""
+import numpy as np
+
+STATISTIC_NAMES = ['Count', 'Mean bias', 'MAE', 'RMSE']
+
+
+def grid_indices(vx, vy):
+    """Get flat indices of cells of points on a grid.
+
+    Parameters
+    ----------
+    vx, vy : array_like
+        Integer-valued x and y of points, e.g. x and y of validation
+        table.
+
+    Returns
+    -------
+    indices : numpy.ndarray
+        Flat index of cell of every point on grid of `shape`.
+    shape : tuple
+        (y length, x length) of grid.
+    mins : tuple
+        (min of y, min of x), i.e. y and x of the first cell.
+
+    """
+    vx = np.floor(np.asarray(vx, dtype=float)).astype(int)
+    vy = np.floor(np.asarray(vy, dtype=float)).astype(int)
+    x_min, y_min = vx.min(), vy.min()
+    shape = (vy.max() - y_min + 1, vx.max() - x_min + 1)
+    indices = np.ravel_multi_index((vy - y_min, vx - x_min), shape)
+
+    return indices, shape, (y_min, x_min)
+
+
+def _statistic_from_sums(count, weight_sum, bias_sum, abs_sum, sq_sum):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result = {
+            'Count': count,
+            'Mean bias': bias_sum / weight_sum,
+            'MAE': abs_sum / weight_sum,
+            'RMSE': np.sqrt(sq_sum / weight_sum),
+        }
+    for name in STATISTIC_NAMES[1:]:
+        result[name][count == 0] = np.nan
+
+    return result
+
+
+def _sums(indices, bias, groups_num, weights):
+    indices = np.asarray(indices, dtype=int).ravel()
+    bias = np.asarray(bias, dtype=float).ravel()
+
+    count = np.bincount(indices, minlength=groups_num)
+    if weights is None:
+        weight_sum = count.astype(float)
+        weighted_bias = bias
+    else:
+        weights = np.asarray(weights, dtype=float).ravel()
+        weight_sum = np.bincount(indices, weights, groups_num)
+        weighted_bias = weights * bias
+
+    return (count, weight_sum,
+            np.bincount(indices, weighted_bias, groups_num),
+            np.bincount(indices, np.abs(weighted_bias), groups_num),
+            np.bincount(indices, weighted_bias * bias, groups_num))
+
+
+def grouped_statistic(indices, bias, groups_num, weights=None,
+                      percentiles=None):
+    """Get statistics of bias of every group.
+
+    Parameters
+    ----------
+    indices : array_like
+        Group index of every pair, in [0, groups_num).
+    bias : array_like
+        Bias of every pair, e.g. target minus base wind speed.
+    groups_num : int
+        Number of groups.
+    weights : array_like, optional
+        Non-negative weight of every pair.  'Count' still counts pairs.
+    percentiles : list of float, optional
+        Percentiles of bias to compute for every group, which are
+        interpolated linearly like np.percentile.  They are added to
+        result with keys like 'P50'.  Weights are not applied to them.
+
+    Returns
+    -------
+    result : dict
+        Key is name of statistic and value is array of length
+        `groups_num`.
+
+    """
+    result = _statistic_from_sums(*_sums(indices, bias, groups_num,
+                                         weights))
+
+    if percentiles:
+        result.update(grouped_percentiles(indices, bias, groups_num,
+                                          percentiles))
+
+    return result
+
+
+def grouped_percentiles(indices, bias, groups_num, percentiles):
+    """Get percentiles of bias of every group by sorting pairs once.
+
+    """
+    indices = np.asarray(indices, dtype=int).ravel()
+    bias = np.asarray(bias, dtype=float).ravel()
+
+    order = np.lexsort((bias, indices))
+    sorted_bias = bias[order]
+    count = np.bincount(indices, minlength=groups_num)
+    starts = np.concatenate([[0], np.cumsum(count)[:-1]])
+    not_empty = count > 0
+
+    result = dict()
+    for q in percentiles:
+        values = np.full(groups_num, np.nan)
+        pos = starts[not_empty] + q / 100 * (count[not_empty] - 1)
+        lower = np.floor(pos).astype(int)
+        upper = np.ceil(pos).astype(int)
+        frac = pos - lower
+        values[not_empty] = (sorted_bias[lower] * (1 - frac)
+                             + sorted_bias[upper] * frac)
+        result[f'P{q:g}'] = values
+
+    return result
+
+
+class StreamingGroupedStatistic(object):
+    """Accumulate statistics of bias of groups chunk by chunk.
+
+    Percentiles are not supported, because they need all pairs.
+
+    Parameters
+    ----------
+    groups_num : int
+        Number of groups.
+
+    """
+    def __init__(self, groups_num):
+        self.groups_num = groups_num
+        self.count = np.zeros(groups_num, dtype=int)
+        self.weight_sum = np.zeros(groups_num)
+        self.bias_sum = np.zeros(groups_num)
+        self.abs_sum = np.zeros(groups_num)
+        self.sq_sum = np.zeros(groups_num)
+
+    def update(self, indices, bias, weights=None):
+        count, weight_sum, bias_sum, abs_sum, sq_sum = _sums(
+            indices, bias, self.groups_num, weights)
+        self.count += count
+        self.weight_sum += weight_sum
+        self.bias_sum += bias_sum
+        self.abs_sum += abs_sum
+        self.sq_sum += sq_sum
+
+    def result(self):
+        return _statistic_from_sums(
+            self.count.copy(), self.weight_sum.copy(),
+            self.bias_sum.copy(), self.abs_sum.copy(),
+            self.sq_sum.copy())
@@ -21,6 +21,133 @@ import utils
 
 Base = declarative_base()
 
+ISD_CSV_COLUMNS = ['STATION', 'DATE', 'LATITUDE', 'LONGITUDE',
+                   'ELEVATION', 'WND']
+WND_PARTS = ['winddir', 'winddir_quality_code', 'wind_type_code',
+             'windspd_raw', 'windspd_quality_code']
+ELEVATION_MISSING = 9999
+
+
+def read_isd_wind_csv(csv_path, grid_lats=None, grid_lons=None,
+                      chunksize=100000):
+    """Read wind observations of a ISD global-hourly csv into a
+    datetime-indexed DataFrame.
+
+    DATE and WND columns are parsed with vectorized string operations
+    chunk by chunk.  When grid_lats and grid_lons are given, the grid
+    index of the closest grid point is computed once for each
+    distinct station location.
+
+    Parameters
+    ----------
+    csv_path : str
+        Path of ISD global-hourly csv file.
+    grid_lats, grid_lons : list of float, optional
+        Latitudes and longitudes of grid.
+    chunksize : int
+        Number of rows to parse at a time.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        Sorted by its DatetimeIndex, with columns 'station_id', 'lat',
+        'lon', 'elevation', 'winddir', 'winddir_quality_code',
+        'wind_type_code', 'windspd_raw', 'windspd', 'windspd_missing',
+        'winddir_missing', 'windspd_quality_code', 'elevation_valid',
+        'windspd_10' and optional 'x', 'y'.  'windspd_10' is NaN where
+        'elevation_valid' is False, i.e. elevation is not positive or
+        missing.
+
+    """
+    chunks = []
+    for chunk in pd.read_csv(csv_path, usecols=ISD_CSV_COLUMNS,
+                             dtype={'WND': str}, chunksize=chunksize):
+        part = pd.DataFrame(index=pd.to_datetime(
+            chunk['DATE'], format='%Y-%m-%dT%H:%M:%S').values)
+        part['station_id'] = chunk['STATION'].astype(str).values
+        part['lat'] = chunk['LATITUDE'].astype(float).values
+        part['lon'] = chunk['LONGITUDE'].astype(float).values
+        part['elevation'] = chunk['ELEVATION'].astype(float).values
+
+        wind_parts = chunk['WND'].str.split(',', expand=True)
+        wind_parts.columns = WND_PARTS
+        part['winddir'] = wind_parts['winddir'].astype(int).values
+        part['winddir_quality_code'] = \
+                wind_parts['winddir_quality_code'].values
+        part['wind_type_code'] = wind_parts['wind_type_code'].values
+        part['windspd_raw'] = wind_parts['windspd_raw'].astype(int).values
+        part['windspd_quality_code'] = \
+                wind_parts['windspd_quality_code'].values
+        chunks.append(part)
+
+    if not chunks:
+        return pd.DataFrame(columns=['station_id'])
+
+    df = pd.concat(chunks)
+    # Original order is kept among rows with same datetime
+    df.sort_index(kind='mergesort', inplace=True)
+
+    df['windspd'] = 0.1 * df['windspd_raw']
+    # Missing
+    df['winddir_missing'] = df['winddir'] == 999
+    df['windspd_missing'] = df['windspd_raw'] == 9999
+    # Anemometer is assumed to be at the elevation of station, so wind
+    # speed at 10 meters is left NaN when station is not above sea
+    # level or its elevation is missing
+    df['elevation_valid'] = ((df['elevation'] > 0)
+                             & (df['elevation'] != ELEVATION_MISSING))
+    valid = df['elevation_valid'].values
+    windspd_10 = np.full(len(df), np.nan)
+    windspd_10[valid] = utils.convert_10(df['windspd'].values[valid],
+                                         df['elevation'].values[valid])
+    df['windspd_10'] = windspd_10
+
+    if grid_lats is not None and grid_lons is not None:
+        locs, loc_idx = np.unique(df[['lat', 'lon']].values, axis=0,
+                                  return_inverse=True)
+        loc_yx = np.array([
+            utils.get_latlon_index_of_closest_grib_point(
+                lat, lon, grid_lats, grid_lons)
+            for lat, lon in locs], dtype=int).reshape(-1, 2)
+        df['y'] = loc_yx[loc_idx.ravel(), 0]
+        df['x'] = loc_yx[loc_idx.ravel(), 1]
+
+    return df
+
+
+class ISDWindCache(object):
+    """Cache of datetime-indexed ISD wind DataFrames, so that each
+    station-year csv is read only once per run.
+
+    """
+    def __init__(self, grid_lats=None, grid_lons=None):
+        self.grid_lats = grid_lats
+        self.grid_lons = grid_lons
+        self.frames = dict()
+
+    def get(self, csv_path):
+        if csv_path not in self.frames:
+            self.frames[csv_path] = read_isd_wind_csv(
+                csv_path, self.grid_lats, self.grid_lons)
+
+        return self.frames[csv_path]
+
+    def first_at(self, csv_path, dt):
+        """Get the first record of csv at the specified datetime with
+        binary search.  Return None if no record exists.
+
+        """
+        df = self.get(csv_path)
+        if not len(df):
+            return None
+
+        i = df.index.searchsorted(dt, side='left')
+        if i >= len(df) or df.index[i] != dt:
+            return None
+
+        return df.iloc[i]
+
+
 class ISDManager(object):
 
     def __init__(self, CONFIG, period, region, passwd, work_mode):
@@ -185,44 +312,37 @@ class ISDManager(object):
         return year_csv_paths
 
     def read_isd_csv(self, ISDWind, csv_path, year):
-        df = pd.read_csv(csv_path)
+        df = read_isd_wind_csv(csv_path, self.grid_lats, self.grid_lons)
+        if not len(df):
+            return
+
+        df = df[(df.index >= self.period[0])
+                & (df.index <= self.period[1])
+                & ~df['winddir_missing'] & ~df['windspd_missing']]
+
         pts_to_insert = []
+        for dt, row in zip(df.index.to_pydatetime(),
+                           df.itertuples(index=False)):
+            pt = ISDWind()
 
-        row_num = len(df['STATION'])
-        for i in range(row_num):
-            try:
-                dt = datetime.datetime.strptime(df['DATE'][i],
-                                                '%Y-%m-%dT%H:%M:%S')
-                if dt < self.period[0] or dt > self.period[1]:
-                    continue
-                pt = ISDWind()
-
-                wind_parts = df['WND'][i].split(',')
-                pt.winddir = int(wind_parts[0])
-                pt.windspd = 0.1 * float(wind_parts[3])
-                # Missing
-                if pt.winddir == 999 or pt.windspd == 999.9:
-                    continue
-                pt.winddir_quality_code = wind_parts[1]
-                pt.wind_type_code = wind_parts[2]
-                pt.windspd_quality_code = wind_parts[4]
-
-                pt.station_id = str(df['STATION'][i])
-                pt.date_time = dt
-
-                pt.lon = float(df['LONGITUDE'][i])
-                pt.lat = float(df['LATITUDE'][i])
-                pt.y, pt.x = utils.get_latlon_index_of_closest_grib_point(
-                    pt.lat, pt.lon, self.grid_lats, self.grid_lons)
-                pt.elevation = float(df['ELEVATION'][i])
-
-                pt.station_id_datetime = (f"""{pt.station_id}"""
-                                          f"""_{pt.date_time}""")
-
-                pts_to_insert.append(pt)
-            except Exception as msg:
-                breakpoint()
-                exit(msg)
+            pt.winddir = int(row.winddir)
+            pt.windspd = float(row.windspd)
+            pt.winddir_quality_code = row.winddir_quality_code
+            pt.wind_type_code = row.wind_type_code
+            pt.windspd_quality_code = row.windspd_quality_code
+
+            pt.station_id = row.station_id
+            pt.date_time = dt
+
+            pt.lon = float(row.lon)
+            pt.lat = float(row.lat)
+            pt.y, pt.x = int(row.y), int(row.x)
+            pt.elevation = float(row.elevation)
+
+            pt.station_id_datetime = (f"""{pt.station_id}"""
+                                      f"""_{pt.date_time}""")
+
+            pts_to_insert.append(pt)
 
         utils.bulk_insert_avoid_duplicate_unique(
             pts_to_insert, self.CONFIG['database']\
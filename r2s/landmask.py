@@ -0,0 +1,159 @@
+"""Answer land/ocean queries from a precomputed land mask raster.
+
+global_land_mask.globe checks one point at a time against a 1 km raster
+which must be loaded into memory as a whole, and only accepts longitude
+in [-180, 180].  LandMask samples it once on a regular global raster
+whose resolution divides all grids of the project (0.05 degree grid,
+0.25 degree ERA5 and RSS grids), and saves the raster as a ``.npy``
+file.  Later runs memory-map the file, so only the pages which are
+queried are read from disk, and answer scalar and array queries with
+index arithmetic.  Longitude can be in either [-180, 180] or [0, 360).
+
+"""
+import logging
+import os
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = '../data/land_mask/land_mask_0.025.npy'
+DEFAULT_RESOLUTION = 0.025
+
+_default_masks = dict()
+_default_masks_lock = threading.Lock()
+
+
+class LandMask(object):
+    """Boolean land mask raster of the whole globe.
+
+    Row i of raster is latitude -90 + i * spa_resolu and column j is
+    longitude j * spa_resolu, so that a point on the project's grids
+    gets exactly the same answer as globe.is_land.  Other points get
+    the answer of the nearest raster point.
+
+    Parameters
+    ----------
+    path : str
+        Path of ``.npy`` file of raster.  It is generated when it does
+        not exist.
+    spa_resolu : float
+        Spatial resolution of raster in degree.
+
+    """
+    def __init__(self, path=DEFAULT_PATH, spa_resolu=DEFAULT_RESOLUTION):
+        self.path = path
+        self.spa_resolu = spa_resolu
+        self.lats_num = int(round(180 / spa_resolu)) + 1
+        self.lons_num = int(round(360 / spa_resolu))
+
+        if not os.path.exists(path):
+            self.build()
+
+        self.raster = np.load(path, mmap_mode='r')
+        if self.raster.shape != (self.lats_num, self.lons_num):
+            raise ValueError((f"""Shape of land mask {path} is """
+                              f"""{self.raster.shape}, while """
+                              f"""({self.lats_num}, {self.lons_num}) is """
+                              f"""expected for resolution {spa_resolu}"""))
+
+    def build(self, chunk_lats_num=200):
+        """Sample globe.is_land on raster and save it.
+
+        """
+        from global_land_mask import globe
+
+        logger.info(f'Building land mask raster {self.path}')
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+        lons = np.arange(self.lons_num) * self.spa_resolu
+        # globe.is_land only accepts longitude in [-180, 180]
+        lons = np.where(lons > 180, lons - 360, lons)
+
+        tmp_path = f'{self.path}.tmp.npy'
+        raster = np.lib.format.open_memmap(
+            tmp_path, mode='w+', dtype=bool,
+            shape=(self.lats_num, self.lons_num))
+        for start in range(0, self.lats_num, chunk_lats_num):
+            end = min(start + chunk_lats_num, self.lats_num)
+            lats = -90 + np.arange(start, end) * self.spa_resolu
+            lats = np.clip(lats, -90, 90)
+            lon_mesh, lat_mesh = np.meshgrid(lons, lats)
+            raster[start:end] = globe.is_land(lat_mesh, lon_mesh)
+        raster.flush()
+        del raster
+
+        os.replace(tmp_path, self.path)
+
+    def indices(self, lat, lon):
+        """Get indices of raster points nearest to points.
+
+        """
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+
+        lat_idx = np.rint((lat + 90) / self.spa_resolu).astype(int)
+        lat_idx = np.clip(lat_idx, 0, self.lats_num - 1)
+        lon_idx = (np.rint(np.mod(lon, 360) / self.spa_resolu).astype(int)
+                   % self.lons_num)
+
+        return lat_idx, lon_idx
+
+    def is_land(self, lat, lon):
+        """Check whether points are on land.
+
+        Parameters
+        ----------
+        lat : float or array_like
+            Latitude in degree.
+        lon : float or array_like
+            Longitude in degree, in either [-180, 180] or [0, 360).
+
+        Returns
+        -------
+        land : bool or numpy.ndarray
+            A bool is returned when both inputs are scalars.
+
+        """
+        lat_idx, lon_idx = self.indices(lat, lon)
+        land = self.raster[lat_idx, lon_idx]
+
+        if np.ndim(land) == 0:
+            return bool(land)
+
+        return np.asarray(land, dtype=bool)
+
+    def is_ocean(self, lat, lon):
+        land = self.is_land(lat, lon)
+        if isinstance(land, bool):
+            return not land
+
+        return ~land
+
+
+def get_land_mask(CONFIG=None):
+    """Get land mask shared by the whole process.
+
+    Path and resolution of raster are read from CONFIG['land_mask']
+    when CONFIG is given, otherwise defaults are used.
+
+    """
+    path, spa_resolu = DEFAULT_PATH, DEFAULT_RESOLUTION
+    if CONFIG is not None and 'land_mask' in CONFIG:
+        path = CONFIG['land_mask'].get('path', path)
+        spa_resolu = CONFIG['land_mask'].get('spatial_resolution',
+                                             spa_resolu)
+
+    with _default_masks_lock:
+        if path not in _default_masks:
+            _default_masks[path] = LandMask(path, spa_resolu)
+
+    return _default_masks[path]
+
+
+def is_land(lat, lon):
+    """Check whether points are on land with default land mask.
+
+    """
+    return get_land_mask().is_land(lat, lon)
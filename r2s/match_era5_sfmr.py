@@ -2,7 +2,6 @@ import datetime
 import logging
 import time
 
-from global_land_mask import globe
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Integer, Float, String, DateTime, Boolean
 from sqlalchemy import Table, Column, MetaData
@@ -13,8 +12,11 @@ import pygrib
 from scipy import interpolate
 import pandas as pd
 
+import geodesy
+import landmask
 import utils
 import satel_scs
+import tc_track
 import era5
 
 Base = declarative_base()
@@ -23,6 +25,7 @@ class matchManager(object):
 
     def __init__(self, CONFIG, period, region, basin, passwd, save_disk):
         self.CONFIG = CONFIG
+        self.land_mask = landmask.get_land_mask(CONFIG)
         self.period = period
         self.region = region
         self.db_root_passwd = passwd
@@ -66,26 +69,16 @@ class matchManager(object):
             IBTrACS.date_time >= self.period[0],
             IBTrACS.date_time <= self.period[1]
         )
-        total = tc_query.count()
         # Traverse WP TCs
-        for idx, tc in enumerate(tc_query):
+        for tc, next_tc in tc_track.iter_tc_pairs(tc_query):
             try:
-                converted_lon = utils.longitude_converter(
-                    tc.lon, '360', '-180')
-                if bool(globe.is_land(tc.lat, converted_lon)):
+                if self.land_mask.is_land(tc.lat, tc.lon):
                     continue
                 if tc.date_time.minute or tc.date_time.second:
                     continue
-                if idx < total - 1:
-                    next_tc = tc_query[idx + 1]
-                    # This TC and next TC is same TC
-                    if tc.sid == next_tc.sid:
-                        self.extract_between_two_tc_records(tc, next_tc)
-                    # This TC differents next TC
-                    else:
-                        pass
-                else:
-                    pass
+                # This TC and next TC is same TC
+                if next_tc is not None:
+                    self.extract_between_two_tc_records(tc, next_tc)
             except Exception as msg:
                 breakpoint()
                 exit(msg)
@@ -114,8 +107,9 @@ class matchManager(object):
         Match = utils.create_match_table(self, ['sfmr', 'era5'])
         hit_dt = []
         match_dt = []
+        interped_tcs = tc_track.hourly_tcs(tc, next_tc)
         for h in range(hours):
-            interped_tc = utils.interp_tc(self, h, tc, next_tc)
+            interped_tc = interped_tcs[h]
             same_sid_dt_query = self.session.query(Match).filter(
                 Match.date_time == interped_tc.date_time,
                 Match.tc_sid == interped_tc.sid)
@@ -195,8 +189,9 @@ class matchManager(object):
         self, tc, next_tc, hours, match_dt, spatial_temporal_info,
         hour_info_pt_idx):
         #
+        interped_tcs = tc_track.hourly_tcs(tc, next_tc)
         for h in range(hours):
-            interped_tc = utils.interp_tc(self, h, tc, next_tc)
+            interped_tc = interped_tcs[h]
             SFMRERA5 = self.create_sfmr_era5_table(interped_tc.date_time)
 
             if interped_tc.date_time not in match_dt:
@@ -241,8 +236,9 @@ class matchManager(object):
                                        hour_info_pt_idx):
         Match = utils.create_match_table(self, ['sfmr', 'era5'])
 
+        interped_tcs = tc_track.hourly_tcs(tc, next_tc)
         for h in range(hours):
-            interped_tc = utils.interp_tc(self, h, tc, next_tc)
+            interped_tc = interped_tcs[h]
             SFMRERA5 = self.create_sfmr_era5_table(interped_tc.date_time)
 
             if interped_tc.date_time not in hour_info_pt_idx.keys():
@@ -316,11 +312,17 @@ class matchManager(object):
             south = 90
             east = 0
 
-            interped_tc_center = (interped_tc.lat,
-                                  utils.longitude_converter(
-                                      interped_tc.lon, '360', '-180'))
             SFMRERA5 = self.create_sfmr_era5_table(interped_tc.date_time)
             tracks_num = len(sfmr_tracks)
+
+            # Shifts of all SFMR points from TC center
+            sfmr_lats = np.array([pt.lat for track in sfmr_pts
+                                  for pt in track], dtype=float)
+            sfmr_lons = np.array([pt.lon for track in sfmr_pts
+                                  for pt in track], dtype=float)
+            east_shifts, north_shifts = geodesy.east_north_shift_km(
+                interped_tc.lat, interped_tc.lon, sfmr_lats, sfmr_lons)
+            pt_idx = -1
         except Exception as msg:
             breakpoint()
             exit(msg)
@@ -328,6 +330,7 @@ class matchManager(object):
         try:
             for i in range(tracks_num):
                 for j in range(len(sfmr_pts[i])):
+                    pt_idx += 1
                     north = max(sfmr_pts[i][j].lat, north)
                     west = min(sfmr_pts[i][j].lon, west)
                     south = min(sfmr_pts[i][j].lat, south)
@@ -339,15 +342,10 @@ class matchManager(object):
                     row.lon = sfmr_pts[i][j].lon
                     row.lat = sfmr_pts[i][j].lat
 
-                    sfmr_pt = (row.lat, utils.longitude_converter(
-                        row.lon,  '360', '-180'))
-
-                    row.east_shift_from_center = \
-                            utils.east_or_north_shift(
-                                'east', interped_tc_center, sfmr_pt)
-                    row.north_shift_from_center = \
-                            utils.east_or_north_shift(
-                                'north', interped_tc_center, sfmr_pt)
+                    row.east_shift_from_center = float(
+                        east_shifts[pt_idx])
+                    row.north_shift_from_center = float(
+                        north_shifts[pt_idx])
 
                     row.sfmr_datetime_lon_lat = (
                         f"""{row.sfmr_datetime}"""
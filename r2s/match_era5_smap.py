@@ -2,7 +2,6 @@ import datetime
 import logging
 import time
 
-from global_land_mask import globe
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Integer, Float, String, DateTime, Boolean
 from sqlalchemy import Table, Column, MetaData
@@ -12,8 +11,10 @@ import numpy as np
 import pygrib
 from scipy import interpolate
 
+import landmask
 import utils
 import satel_scs
+import tc_track
 import era5
 
 Base = declarative_base()
@@ -23,6 +24,7 @@ class matchManager(object):
     def __init__(self, CONFIG, period, region, basin, passwd, save_disk,
                  work):
         self.CONFIG = CONFIG
+        self.land_mask = landmask.get_land_mask(CONFIG)
         self.period = period
         self.region = region
         self.db_root_passwd = passwd
@@ -88,26 +90,17 @@ class matchManager(object):
             IBTrACS.date_time >= self.period[0],
             IBTrACS.date_time <= self.period[1]
         )
-        total = tc_query.count()
         # Traverse WP TCs
-        for idx, tc in enumerate(tc_query):
+        for tc, next_tc in tc_track.iter_tc_pairs(tc_query):
             try:
-                converted_lon = utils.longitude_converter(
-                    tc.lon, '360', '-180')
-                if bool(globe.is_land(tc.lat, converted_lon)):
+                if self.land_mask.is_land(tc.lat, tc.lon):
                     continue
                 if tc.date_time.minute or tc.date_time.second:
                     continue
-                if idx < total - 1:
-                    next_tc = tc_query[idx + 1]
-                    # This TC and next TC is same TC
-                    if tc.sid == next_tc.sid:
-                        self.extract_between_two_tc_records(tc, next_tc)
-                    # This TC differents next TC
-                    else:
-                        success = self.extract_detail(tc)
-                        self.info_after_extracting_detail(tc, success,
-                                                          True)
+                # This TC and next TC is same TC
+                if next_tc is not None:
+                    self.extract_between_two_tc_records(tc, next_tc)
+                # This TC is the last record of its TC
                 else:
                     success = self.extract_detail(tc)
                     self.info_after_extracting_detail(tc, success,
@@ -167,8 +160,9 @@ class matchManager(object):
         Match = utils.create_match_table(self, ['smap', 'era5'])
         hit_dt = []
         match_dt = []
+        interped_tcs = tc_track.hourly_tcs(tc, next_tc)
         for h in range(hours):
-            interped_tc = utils.interp_tc(self, h, tc, next_tc)
+            interped_tc = interped_tcs[h]
             same_sid_dt_query = self.session.query(Match).filter(
                 Match.date_time == interped_tc.date_time,
                 Match.tc_sid == interped_tc.sid)
@@ -202,8 +196,9 @@ class matchManager(object):
             self.extract_with_not_all_hours_hit(tc, next_tc, hours)
 
     def extract_with_all_hours_hit(self, tc, next_tc, hours, match_dt):
+        interped_tcs = tc_track.hourly_tcs(tc, next_tc)
         for h in range(hours):
-            interped_tc = utils.interp_tc(self, h, tc, next_tc)
+            interped_tc = interped_tcs[h]
 
             if interped_tc.date_time not in match_dt:
                 print((f"""[Skip] matching SMAP and ERA5 """
@@ -216,8 +211,9 @@ class matchManager(object):
                                               False)
 
     def extract_with_not_all_hours_hit(self, tc, next_tc, hours):
+        interped_tcs = tc_track.hourly_tcs(tc, next_tc)
         for h in range(hours):
-            interped_tc = utils.interp_tc(self, h, tc, next_tc)
+            interped_tc = interped_tcs[h]
 
             success = self.extract_detail(interped_tc)
             self.info_after_extracting_detail(interped_tc, success,
@@ -0,0 +1,305 @@
+"""Resumable and parallel hyperopt search of LightGBM parameters.
+
+hyperopt fmin with in-process Trials evaluates one configuration at a
+time and loses all trials when it is interrupted.  SQLiteTrials keeps
+trial documents in a local SQLite file, like MongoTrials keeps them in
+MongoDB, so that a search continues from its finished trials when it is
+run again.  parallel_fmin evaluates several trials concurrently in
+worker processes, asking TPE for a new configuration whenever a worker
+is free, and splits CPU cores between workers and threads of LightGBM.
+
+Like fmin, only trials which did not fail count towards max_evals, and
+the search stops with the exception of a failed trial, which is kept in
+the store.  Searches are named with search_fingerprint, so that changed
+search space or training set starts a new store instead of resuming
+stale trials.
+
+Workers are forked from the calling process, so the objective and the
+datasets it reads, e.g. lgb.Dataset, are shared instead of pickled.
+The calling process must not train LightGBM before the search, because
+OpenMP does not survive fork.
+
+"""
+import datetime
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import sqlite3
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                wait)
+
+import numpy as np
+from hyperopt import (fmin, space_eval, tpe, Trials, JOB_STATE_DONE,
+                      JOB_STATE_ERROR, JOB_STATE_RUNNING, STATUS_OK)
+from hyperopt.base import Domain, spec_from_misc
+
+logger = logging.getLogger(__name__)
+
+# States of trials which are kept when store is loaded
+FINISHED_STATES = [JOB_STATE_DONE, JOB_STATE_ERROR]
+
+# Objective of search in forked workers
+_worker_objective = None
+
+
+class SQLiteTrials(Trials):
+    """Trials stored in SQLite file.
+
+    Finished trials are loaded when the file exists.  Trials which were
+    not finished when the search was interrupted are dropped, so they
+    are suggested again.  Trials are written to the file whenever they
+    change and trials are refreshed, which fmin and parallel_fmin do
+    after every evaluation.
+
+    Parameters
+    ----------
+    path : str
+        Path of SQLite file.
+
+    """
+    def __init__(self, path, exp_key=None):
+        self.path = path
+        # Key is tid and value is state of trial in file
+        self._stored_states = dict()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with sqlite3.connect(path) as conn:
+            conn.execute(('CREATE TABLE IF NOT EXISTS trials '
+                          '(tid INTEGER PRIMARY KEY, state INTEGER, '
+                          'doc BLOB)'))
+            conn.execute(('DELETE FROM trials WHERE state NOT IN '
+                          f'({", ".join(["?"] * len(FINISHED_STATES))})'),
+                          FINISHED_STATES)
+            rows = conn.execute(('SELECT tid, state, doc FROM trials '
+                                 'ORDER BY tid')).fetchall()
+        conn.close()
+
+        super(SQLiteTrials, self).__init__(exp_key=exp_key,
+                                           refresh=False)
+        docs = [pickle.loads(doc) for _, _, doc in rows]
+        self._insert_trial_docs(docs)
+        # refresh only records tids of valid trials, so tids of failed
+        # trials are recorded here to keep them from being reused
+        self._ids.update(doc['tid'] for doc in docs)
+        self._stored_states = {tid: state for tid, state, _ in rows}
+        self.refresh()
+
+        if docs:
+            logger.info(f'Resume {len(docs)} trials from {path}')
+
+    def new_trial_ids(self, n):
+        # Tids of dropped trials may be missing, so count from max tid
+        # instead of number of tids
+        start = max(self._ids, default=-1) + 1
+        tids = list(range(start, start + n))
+        self._ids.update(tids)
+
+        return tids
+
+    def refresh(self):
+        super(SQLiteTrials, self).refresh()
+        self.flush()
+
+    def flush(self):
+        """Write trials which have changed since last flush.
+
+        """
+        changed = [doc for doc in self._dynamic_trials
+                   if self._stored_states.get(doc['tid'], None)
+                   != doc['state']]
+        if not changed:
+            return
+
+        with sqlite3.connect(self.path) as conn:
+            conn.executemany(
+                ('INSERT OR REPLACE INTO trials (tid, state, doc) '
+                 'VALUES (?, ?, ?)'),
+                [(doc['tid'], doc['state'], pickle.dumps(doc))
+                 for doc in changed])
+        conn.close()
+
+        for doc in changed:
+            self._stored_states[doc['tid']] = doc['state']
+
+
+def search_fingerprint(space, X_train, period=None):
+    """Get short hash of search space and training set.
+
+    Parameters
+    ----------
+    space : dict
+        Search space of hyperopt.
+    X_train : pandas.DataFrame
+        Features of training set, whose shape and column names are
+        hashed.
+    period : list, optional
+        Period of training set.
+
+    """
+    text = json.dumps({
+        'space': {str(k): str(v) for k, v in space.items()},
+        'shape': [int(x) for x in X_train.shape],
+        'columns': [str(col) for col in X_train.columns],
+        'period': [str(dt) for dt in (period or [])],
+    }, sort_keys=True)
+
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+def _evaluate_in_worker(params, num_threads):
+    if num_threads is not None:
+        params = dict(params, num_threads=num_threads)
+
+    result = _worker_objective(params)
+    if not isinstance(result, dict):
+        result = {'loss': float(result), 'status': STATUS_OK}
+
+    return result
+
+
+def parallel_fmin(fn, space, max_evals, trials, workers,
+                  algo=tpe.suggest, lgb_threads=None, seed=None):
+    """Minimize `fn` over `space` with `workers` concurrent trials.
+
+    Parameters
+    ----------
+    fn : function
+        Objective which gets dict of parameters and returns loss or dict
+        of result like fmin.  It may be a closure, because it is not
+        pickled.
+    space : dict
+        Search space of hyperopt.
+    max_evals : int
+        Number of trials which did not fail, including finished trials
+        in `trials`, like fmin.
+    trials : Trials
+        Trials, e.g. SQLiteTrials to make search resumable.
+    workers : int
+        Number of worker processes.
+    algo : function
+        Suggest function of hyperopt.
+    lgb_threads : int, optional
+        Threads of LightGBM in every worker, which is passed to `fn` as
+        parameter 'num_threads'.  CPU cores are split evenly between
+        workers when it is None.
+    seed : int, optional
+        Seed of suggestion.
+
+    Returns
+    -------
+    best : dict
+        Best parameters in the form returned by fmin.
+
+    Raises
+    ------
+    Exception
+        Exception of the first failed trial, after running trials are
+        finished.
+
+    """
+    global _worker_objective
+
+    if lgb_threads is None:
+        lgb_threads = max(1, (os.cpu_count() or 1) // workers)
+    domain = Domain(fn, space)
+    rstate = np.random.RandomState(seed)
+
+    _worker_objective = fn
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('fork'))
+
+    # Key is Future of evaluation and value is trial document
+    running = dict()
+    failure = None
+    try:
+        while True:
+            trials.refresh()
+            # `trials.trials` holds valid trials, i.e. not failed ones
+            while (failure is None and len(running) < workers
+                   and len(trials.trials) < max_evals):
+                new_ids = trials.new_trial_ids(1)
+                new_trials = algo(new_ids, domain, trials,
+                                  rstate.randint(2 ** 31 - 1))
+                if not new_trials:
+                    break
+                trials.insert_trial_docs(new_trials)
+                trials.refresh()
+
+                doc = trials._dynamic_trials[-1]
+                doc['state'] = JOB_STATE_RUNNING
+                doc['book_time'] = datetime.datetime.utcnow()
+                params = space_eval(space, spec_from_misc(doc['misc']))
+                future = executor.submit(_evaluate_in_worker, params,
+                                         lgb_threads)
+                running[future] = doc
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                doc = running.pop(future)
+                try:
+                    doc['result'] = future.result()
+                    doc['state'] = JOB_STATE_DONE
+                except Exception as msg:
+                    logger.error(f'Trial {doc["tid"]} failed: {msg}')
+                    doc['misc']['error'] = (str(type(msg)), str(msg))
+                    doc['state'] = JOB_STATE_ERROR
+                    if failure is None:
+                        failure = msg
+                doc['refresh_time'] = datetime.datetime.utcnow()
+                logger.info((f"""Trial {doc['tid']} done, """
+                             f"""{len(trials.trials)}/"""
+                             f"""{max_evals} suggested"""))
+    finally:
+        executor.shutdown(wait=True)
+        _worker_objective = None
+        trials.refresh()
+
+    if failure is not None:
+        raise failure
+
+    return trials.argmin
+
+
+def search(fn, space, max_evals, settings, name):
+    """Minimize `fn` over `space` with trials stored in SQLite file.
+
+    Parameters
+    ----------
+    fn, space, max_evals :
+        Like fmin.
+    settings : dict
+        Settings of search, e.g. CONFIG['regression']['hyperopt'],
+        with keys 'workers', 'lgb_threads' and 'trials_dir'.  fmin runs
+        in the calling process when 'workers' is not greater than 1.
+    name : str
+        Name of search, which should include search_fingerprint.
+        Trials are stored in '{trials_dir}{name}.sqlite', so searches
+        with same name resume each other.
+
+    Returns
+    -------
+    best : dict
+        Best parameters in the form returned by fmin.
+    trials : SQLiteTrials
+        All trials of search.
+
+    """
+    trials = SQLiteTrials(f"""{settings['trials_dir']}{name}.sqlite""")
+    workers = settings.get('workers', 1)
+
+    if workers > 1:
+        best = parallel_fmin(fn, space, max_evals, trials, workers,
+                             lgb_threads=settings.get('lgb_threads',
+                                                      None))
+    else:
+        best = fmin(fn=fn, space=space, algo=tpe.suggest,
+                    max_evals=max_evals, trials=trials)
+
+    return best, trials
@@ -26,7 +26,7 @@ from sklearn.preprocessing import MinMaxScaler
 from sklearn.model_selection import cross_val_score, train_test_split
 from sklearn.metrics import mean_squared_error
 from functools import partial
-from hyperopt import fmin, hp, tpe, Trials, space_eval
+from hyperopt import fmin, hp, tpe, Trials, space_eval, STATUS_OK
 from sklearn.utils import Bunch
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import (VotingRegressor, GradientBoostingRegressor,
@@ -35,6 +35,7 @@ from joblib import dump, load
 
 import utils
 import era5
+import parallel_hyperopt
 from metrics import (focal_loss_train, focal_loss_valid,
                      custom_asymmetric_train, custom_asymmetric_valid,
                      symmetric_train, symmetric_valid)
@@ -191,20 +192,23 @@ class Regression(object):
             f""".pickle.dat"""), 'wb'))
 
     def optimize_lgb(self, maxevals=200):
-        self.early_stop_dict = {}
-
         param_space = self.hyperparameter_space()
         objective = self.get_objective(self.lgb_train)
-        objective.i = 0
-        trials = Trials()
-        best = fmin(fn=objective,
-                    space=param_space,
-                    algo=tpe.suggest,
-                    max_evals=maxevals,
-                    trials=trials)
-
-        best['num_boost_round'] = self.early_stop_dict[
-            trials.best_trial['tid']]
+        trials_name = f'{self.basin}_lgb_regressor'
+        for attr in ['with_focal_loss', 'smogn', 'smogn_final',
+                     'smogn_hyperopt', 'valid']:
+            if getattr(self, attr, False) is True:
+                trials_name += f'_{attr}'
+        # Changed search space or training set starts a new search
+        trials_name += '_' + parallel_hyperopt.search_fingerprint(
+            param_space, self.X_train, self.train_period)
+        # Trials are stored in file, so interrupted search resumes
+        best, trials = parallel_hyperopt.search(
+            objective, param_space, maxevals,
+            self.CONFIG['regression']['hyperopt'], trials_name)
+
+        best['num_boost_round'] = trials.best_trial['result'][
+            'num_boost_round']
         best['num_leaves'] = int(best['num_leaves'])
         best['verbose'] = -1
 
@@ -547,7 +551,7 @@ class Regression(object):
                     stratified=False,
                     early_stopping_rounds=20)
 
-                self.early_stop_dict[objective.i] = len(
+                num_boost_round = len(
                     cv_result['custom_asymmetric_eval-mean'])
                 score = round(cv_result['custom_asymmetric_eval-mean'][
                     -1], 4)
@@ -561,13 +565,13 @@ class Regression(object):
                     stratified=False,
                     early_stopping_rounds=20)
 
-                self.early_stop_dict[objective.i] = len(
-                    cv_result['symmetric_eval-mean'])
+                num_boost_round = len(cv_result['symmetric_eval-mean'])
                 score = round(cv_result['symmetric_eval-mean'][-1], 4)
 
-            objective.i += 1
-
-            return score
+            # Rounds of early stopping are kept in result, because
+            # trials may run in other processes or be resumed
+            return {'loss': score, 'status': STATUS_OK,
+                    'num_boost_round': num_boost_round}
 
         return objective
 
@@ -0,0 +1,309 @@
+"""Render wind speed figures with cached basemaps in worker processes.
+
+Every subplot of wind speed used to build a new Basemap, which reads
+and clips coastline data again, and figures were saved at 600 dpi in
+the main process, which blocked computation.  get_basemap keeps the
+most recently used Basemap of every region extent in the process, and
+FigureRenderer draws figures from precomputed arrays in a process pool
+with configurable DPI and format.
+
+A figure job is a picklable function ``draw(fig, *args)`` which draws
+on an empty matplotlib figure, e.g. draw_windspd_panels, together with
+its arguments.  Arguments must not hold database connections, so
+classes are passed to drawing functions of utils as PlotContext.
+
+"""
+import collections
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from mpl_toolkits.basemap import Basemap
+import numpy as np
+
+import utils
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+DEFAULT_DPI = 600
+DEFAULT_MAX_BASEMAPS = 32
+
+_basemaps = collections.OrderedDict()
+_basemaps_lock = threading.Lock()
+
+_default_renderer = None
+_default_renderer_lock = threading.Lock()
+
+
+def get_basemap(lon1, lon2, lat1, lat2, resolution='c',
+                max_basemaps=DEFAULT_MAX_BASEMAPS):
+    """Get Basemap of region shared by the process.
+
+    Basemap is not bound to any axes, so pass `ax` to its drawing
+    methods, e.g. ``map.drawcoastlines(ax=ax)``, and get it again
+    before drawing on another axes.  drawmapboundary records patch of
+    its axes in Basemap, which later drawings clip to, so the record is
+    cleared every time Basemap is got, as if it were newly built.
+
+    Parameters
+    ----------
+    lon1, lon2, lat1, lat2 : float
+        Lower left and upper right corners of region.
+    resolution : str
+        Resolution of coastline data, e.g. 'c' or 'h'.
+    max_basemaps : int
+        Max number of basemaps kept in process.
+
+    """
+    key = (round(float(lon1), 6), round(float(lon2), 6),
+           round(float(lat1), 6), round(float(lat2), 6), resolution)
+
+    with _basemaps_lock:
+        if key in _basemaps:
+            _basemaps.move_to_end(key)
+            map = _basemaps[key]
+            map._mapboundarydrawn = False
+            return map
+
+    map = Basemap(llcrnrlon=lon1, llcrnrlat=lat1, urcrnrlon=lon2,
+                  urcrnrlat=lat2, resolution=resolution)
+
+    with _basemaps_lock:
+        _basemaps[key] = map
+        _basemaps.move_to_end(key)
+        while len(_basemaps) > max_basemaps:
+            _basemaps.popitem(last=False)
+
+    return map
+
+
+def get_max_basemaps(CONFIG=None):
+    """Get max number of basemaps kept in process from
+    CONFIG['plot']['render'] when it exists.
+
+    """
+    if CONFIG is None:
+        return DEFAULT_MAX_BASEMAPS
+
+    return CONFIG['plot'].get('render', dict()).get(
+        'max_basemaps', DEFAULT_MAX_BASEMAPS)
+
+
+class PlotContext(object):
+    """Picklable attributes of class which drawing functions of utils
+    read, i.e. CONFIG, zorders and default region.
+
+    """
+    def __init__(self, the_class):
+        self.CONFIG = the_class.CONFIG
+        self.zorders = the_class.zorders
+        for attr in ['lon1', 'lon2', 'lat1', 'lat2']:
+            setattr(self, attr, getattr(the_class, attr, None))
+
+
+def fig_path_with_format(fig_path, fmt):
+    """Replace extension of `fig_path` with `fmt` if `fmt` is given.
+
+    """
+    if not fmt:
+        return fig_path
+
+    return f'{os.path.splitext(fig_path)[0]}.{fmt}'
+
+
+def render_figure(draw, fig_path, figsize, dpi, fmt, args):
+    """Draw figure with ``draw(fig, *args)`` and save it.
+
+    Figure is not managed by pyplot, so that it can be rendered in
+    any process or thread and is freed after saving.
+
+    Returns
+    -------
+    fig_path : str
+        Path of saved figure.
+
+    """
+    fig_path = fig_path_with_format(fig_path, fmt)
+    os.makedirs(os.path.dirname(fig_path) or '.', exist_ok=True)
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    draw(fig, *args)
+    fig.savefig(fig_path, dpi=dpi, format=fmt or None)
+
+    return fig_path
+
+
+class FigureRenderer(object):
+    """Render figure jobs in worker processes.
+
+    Parameters
+    ----------
+    workers : int
+        Number of worker processes.  Figures are rendered in the
+        calling process when it is 0.
+    dpi : int
+        DPI of saved figures.
+    fmt : str, optional
+        Format of saved figures, e.g. 'png' or 'eps'.  It replaces
+        extension of path of figure.  Extension of path is kept when it
+        is None.
+
+    """
+    def __init__(self, workers=DEFAULT_WORKERS, dpi=DEFAULT_DPI,
+                 fmt=None):
+        self.workers = workers
+        self.dpi = dpi
+        self.fmt = fmt
+        self.executor = None
+        self.lock = threading.Lock()
+        self.futures = []
+
+    def submit(self, draw, fig_path, args=(), figsize=None):
+        """Submit figure job and return Future whose result is path of
+        saved figure.
+
+        Parameters
+        ----------
+        draw : function
+            Module-level function called as ``draw(fig, *args)``.
+        fig_path : str
+            Path of figure.
+        args : tuple
+            Arguments of `draw`, e.g. arrays of wind speed.
+        figsize : tuple, optional
+            Size of figure in inches.
+
+        """
+        if not self.workers:
+            future = Future()
+            try:
+                future.set_result(render_figure(draw, fig_path, figsize,
+                                                self.dpi, self.fmt, args))
+            except Exception as msg:
+                future.set_exception(msg)
+            self._track(future)
+            return future
+
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers)
+            future = self.executor.submit(render_figure, draw, fig_path,
+                                          figsize, self.dpi, self.fmt,
+                                          args)
+        self._track(future)
+
+        return future
+
+    def _track(self, future):
+        def log_when_done(done_future):
+            if done_future.exception() is not None:
+                logger.error(f'Failed rendering figure: '
+                             f'{done_future.exception()}')
+
+        future.add_done_callback(log_when_done)
+        with self.lock:
+            self.futures.append(future)
+
+    def wait(self):
+        """Block until submitted figures are saved.
+
+        Returns
+        -------
+        paths : list of str
+            Paths of figures saved since last wait.
+
+        Raises
+        ------
+        Exception
+            The first exception raised by figure jobs.
+
+        """
+        with self.lock:
+            futures, self.futures = self.futures, []
+
+        return [future.result() for future in futures]
+
+    def shutdown(self):
+        self.wait()
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+
+def get_renderer(CONFIG=None):
+    """Get figure renderer shared by the whole process.
+
+    Its settings are read from CONFIG['plot']['render'] when it
+    exists.
+
+    """
+    global _default_renderer
+
+    with _default_renderer_lock:
+        if _default_renderer is None:
+            settings = dict()
+            if CONFIG is not None:
+                settings = CONFIG['plot'].get('render', dict())
+            _default_renderer = FigureRenderer(
+                settings.get('workers', DEFAULT_WORKERS),
+                settings.get('dpi', DEFAULT_DPI),
+                settings.get('format', None))
+
+    return _default_renderer
+
+
+def draw_windspd_panels(fig, context, panels, subplots_row,
+                        subplots_col, max_windspd, draw_contour=False,
+                        title_size=20, sharey=False):
+    """Draw wind speed of panels on subplots of figure, like
+    utils.draw_windspd.
+
+    Parameters
+    ----------
+    fig : matplotlib.figure.Figure
+        Empty figure.
+    context : PlotContext
+        Context of class which computes panels.
+    panels : list of dict
+        Every panel has keys 'lons', 'lats', 'windspd', 'mesh',
+        'region' and 'title', and optional key 'label', which is
+        written at upper left of subplot.
+    subplots_row, subplots_col : int
+        Shape of subplots.
+    max_windspd : float
+        Max of color bar.
+    draw_contour : bool
+        Whether to draw contour of wind speed.
+    title_size : int
+        Font size of title of subplots.
+    sharey : bool
+        Whether subplots share y axis.
+
+    """
+    axes = np.atleast_1d(fig.subplots(subplots_row, subplots_col,
+                                      sharey=sharey))
+
+    for ax, panel in zip(axes.flat, panels):
+        utils.draw_windspd(context, fig, ax, None, panel['lons'],
+                           panel['lats'], panel['windspd'], max_windspd,
+                           panel['mesh'], draw_contour=draw_contour,
+                           custom=True, region=panel['region'])
+        if panel.get('label', None):
+            ax.text(0.1, 0.95, panel['label'], transform=ax.transAxes,
+                    fontsize=20, fontweight='bold', va='top', ha='right')
+        ax.set_title(panel['title'], size=title_size)
+
+    fig.tight_layout(pad=0.1)
@@ -14,8 +14,6 @@ import time
 import sys
 import xml.etree.ElementTree as ET
 import zipfile
-from statistics import mean
-from multiprocessing import Pool
 
 from geopy import distance
 import requests
@@ -33,10 +31,10 @@ from matplotlib.patches import Polygon
 import netCDF4
 import pygrib
 import pandas as pd
-import scipy
 
 import utils
 import cwind
+import fetcher
 import sfmr
 import era5
 import grid
@@ -154,6 +152,13 @@ class SCSSatelManager(object):
 
         dt_delta = self.period[1] - self.period[0]
 
+        self.prefetch([
+            (satel_name, (self.period[0]
+                          + datetime.timedelta(days=day)).date())
+            for day in range(dt_delta.days)
+            for satel_name in self.satel_names
+        ])
+
         for day in range(dt_delta.days):
             target_datetime = (self.period[0]
                                + datetime.timedelta(days=day))
@@ -298,107 +303,72 @@ class SCSSatelManager(object):
         # Get temporal relation of grbs and rows first
         hourtime_row, next_day_indices = self._get_hourtime_row_dict(
             satel_part)
+        next_day_indices = set(next_day_indices)
+
+        # Map all rows to ERA5 corners by arithmetic once, relative to
+        # the ERA5 window which covers SCS region
+        window, corner_y, corner_x, weights = \
+                self._get_era5_corners_in_scs_window(satel_name,
+                                                     satel_part)
+        (win_y1, win_y2), (win_x1, win_x2) = window
 
         for which_day in ['today', 'tomorrow']:
             info = f'Adding ERA5 from {era5_data_path[which_day]}: '
             grbidx = pygrib.index(era5_data_path[which_day], 'dataTime')
 
+            grb_date = target_date
+            if which_day == 'tomorrow':
+                grb_date = target_date + datetime.timedelta(days=1)
+
             # For every hour, update corresponding rows with grbs
             for hourtime in range(0, 2400, 100):
-                if not len(hourtime_row[hourtime]):
+                if which_day == 'today':
+                    indices = [idx for idx in hourtime_row[hourtime]
+                               if idx not in next_day_indices]
+                else:
+                    indices = [idx for idx in hourtime_row[hourtime]
+                               if idx in next_day_indices]
+                if not len(indices):
                     continue
+                indices = np.array(indices)
+
                 grb_time = datetime.time(int(hourtime/100), 0, 0)
+                grb_datetime = datetime.datetime.combine(grb_date,
+                                                         grb_time)
+                grb_minute = int(hourtime/100) * 60
+                for idx in indices:
+                    row = satel_part[idx]
+                    row.era5_datetime = grb_datetime
+                    satel_minute = (row.satel_datetime.hour * 60
+                                     + row.satel_datetime.minute)
+                    row.satel_era5_diff_mins = satel_minute - grb_minute
 
                 selected_grbs = grbidx.select(dataTime=hourtime)
 
                 for grb in selected_grbs:
-                    # data() method of pygrib is time-consuming
-                    # So apply it to global area then update all
-                    # smap part with grb of specific hourtime,
-                    # which using data() method as less as possible
-                    data, lats, lons = grb.data(-90, 90, 0, 360)
-                    data = np.flip(data, 0)
+                    # Decode message once, then crop it to SCS window
+                    # and update all rows of this hourtime with it
+                    data = np.flip(np.ma.filled(np.ma.asarray(
+                        grb.values, dtype=float), np.nan), 0)
+                    data = data[win_y1:win_y2, win_x1:win_x2]
 
                     # Generate name which is the same with table column
                     name = grb.name.replace(" ", "_").lower()
                     if name == 'vorticity_(relative)':
                         name = 'vorticity_relative'
 
-                    # Update all rows which matching this hourtime
-                    for idx in hourtime_row[hourtime]:
-                        if (which_day == 'today'
-                            and idx in next_day_indices):
-                            continue
-                        if (which_day == 'tomorrow'
-                            and idx not in next_day_indices):
-                            continue
+                    # corners[k] is value of the k-th corner of rows,
+                    # and weights[k] is its weight in the average or
+                    # bilinear interpolation
+                    corners = data[corner_y[:, indices],
+                                   corner_x[:, indices]]
+                    values = (corners * weights[:, indices]).sum(axis=0)
 
-                        grb_datetime = datetime.datetime.combine(
-                            target_date, grb_time)
-                        if which_day == 'tomorrow':
-                            grb_datetime = (grb_datetime
-                                            + datetime.timedelta(days=1))
-
-                        count += 1
-                        print(f'\r{info} {count}/{total}', end='')
-
-                        row = satel_part[idx]
-
-                        row.era5_datetime = grb_datetime
-                        satel_minute = (row.satel_datetime.hour * 60
-                                         + row.satel_datetime.minute)
-                        grb_minute = int(hourtime/100) * 60
-                        row.satel_era5_diff_mins = \
-                                satel_minute - grb_minute
-
-                        if satel_name != 'sentinel_1':
-                            lat1, lat2, lon1, lon2 = \
-                                    utils.get_era5_corners_of_rss_cell(
-                                        row.lon, row.lat)
-                            corners = []
-                            for lat in [lat1, lat2]:
-                                for lon in [lon1, lon2]:
-                                    lat_idx = self.grid_pts['era5']\
-                                            ['lat'].index(lat)
-                                    lon_idx = self.grid_pts['era5']\
-                                            ['lon'].index(lon)
-                                    corners.append(
-                                        data[lat_idx][lon_idx])
-
-                            value = float(sum(corners) / len(corners))
-                            setattr(row, name, value)
-                        else:
-                            lat1, lat2, lon1, lon2 = \
-                                    self._get_era5_corners_of_scs_cell(
-                                        row.lon, row.lat)
-
-                            corners = []
-                            for lat in [lat1, lat2]:
-                                row_of_lat = []
-                                for lon in [lon1, lon2]:
-                                    lat_idx = self.grid_pts['era5']\
-                                            ['lat'].index(lat)
-                                    lon_idx = self.grid_pts['era5']\
-                                            ['lon'].index(lon)
-
-                                    row_of_lat.append(
-                                        data[lat_idx][lon_idx])
-                                corners.append(row_of_lat)
-
-                            f = scipy.interpolate.interp2d(
-                                [lon1, lon2], [lat1, lat2], corners)
-
-                            # From x * 0.25 to (x + 1) * 0.25,
-                            # there are 6 points at the intervel of
-                            # 0.05
-                            xnew = [x * 0.05 + lon1 for x in range(6)]
-                            ynew = [y * 0.05 + lat1 for y in range(6)]
-                            znew = f(xnew, ynew)
-
-                            x_idx = xnew.index(row.lon)
-                            y_idx = ynew.index(row.lat)
-                            value = float(znew[y_idx][x_idx])
-                            setattr(row, name, value)
+                    for idx, value in zip(indices, values.tolist()):
+                        setattr(satel_part[idx], name, value)
+
+                    count += len(indices)
+                    print(f'\r{info} {count}/{total}', end='')
 
             grbidx.close()
 
@@ -413,10 +383,91 @@ class SCSSatelManager(object):
 
         return satel_part
 
+    def _get_era5_corners_in_scs_window(self, satel_name, satel_part):
+        """Get indices and weights of 4 ERA5 corners of all rows.
+
+        ERA5 grid starts from (lat=-90, lon=0) at the interval of 0.25
+        degree.  Value of RSS cell is the average of its 4 corners,
+        while value of SCS grid point of Sentinel-1 is bilinearly
+        interpolated from corners of the ERA5 cell which contains it.
+
+        Returns
+        -------
+        window : tuple
+            ((y1, y2), (x1, x2)), slices of flipped global ERA5 field
+            which covers SCS region.
+        corner_y, corner_x : numpy.ndarray
+            Shape is (4, len(satel_part)).  Indices of corners in
+            window, in order of lower left, lower right, upper left and
+            upper right.
+        weights : numpy.ndarray
+            Shape is (4, len(satel_part)).  Weights of corners.
+
+        """
+        era5_resolu = self.CONFIG['era5']['spatial_resolution']
+        lon_pts_num = self.CONFIG['era5']['lon_grid_points_number']
+        lons = np.array([row.lon for row in satel_part], dtype=float)
+        lats = np.array([row.lat for row in satel_part], dtype=float)
+
+        if satel_name != 'sentinel_1':
+            # Corners of RSS cell are 0.5 * 0.25 degree away from its
+            # center
+            half = 0.5 * self.spa_resolu['rss']
+            y1 = np.rint((lats - half + 90) / era5_resolu).astype(int)
+            x1 = np.rint((lons - half) / era5_resolu).astype(int)
+            wy = np.zeros(len(satel_part))
+            wx = np.zeros(len(satel_part))
+            row_weights = [0.25, 0.25, 0.25, 0.25]
+        else:
+            if lons.min() < 0 or lats.min() < 0:
+                self.logger.error((f"""SCS grid point's lon or """
+                                   f"""lat is negative"""))
+            # A small epsilon keeps points on ERA5 grid lines, e.g.
+            # 20.25 represented as 20.249999, in the cell above them
+            y_float = (lats + 90) / era5_resolu
+            x_float = lons / era5_resolu
+            y1 = np.floor(y_float + 1e-6).astype(int)
+            x1 = np.floor(x_float + 1e-6).astype(int)
+            wy = np.clip(y_float - y1, 0, 1)
+            wx = np.clip(x_float - x1, 0, 1)
+            row_weights = None
+
+        win_y1 = int(y1.min())
+        win_y2 = int(y1.max()) + 2
+        win_x1 = int(x1.min())
+        win_x2 = int(x1.max()) + 2
+
+        y2 = y1 + 1
+        # Longitude of 360 is the same as 0
+        x2 = (x1 + 1) % lon_pts_num
+        if win_x2 > lon_pts_num:
+            # Window crosses prime meridian, which should not happen
+            # in SCS, so fall back to the whole longitude range
+            win_x1, win_x2 = 0, lon_pts_num
+        corner_y = np.stack([y1, y1, y2, y2]) - win_y1
+        corner_x = np.stack([x1, x2, x1, x2]) - win_x1
+
+        if row_weights is not None:
+            weights = np.repeat(np.array(row_weights)[:, np.newaxis],
+                                len(satel_part), axis=1)
+        else:
+            weights = np.stack([(1 - wy) * (1 - wx), (1 - wy) * wx,
+                                wy * (1 - wx), wy * wx])
+
+        window = ((win_y1, win_y2), (win_x1, win_x2))
+
+        return window, corner_y, corner_x, weights
+
     def cal_avg_u_v_wind_of_amsr2(self, satel_part):
-        for row in satel_part:
-            row.u_wind_avg = 0.5 * (row.u_wind_lf + row.u_wind_mf)
-            row.v_wind_avg = 0.5 * (row.v_wind_lf + row.v_wind_mf)
+        u_lf = utils.rows_attr_array(satel_part, 'u_wind_lf')
+        u_mf = utils.rows_attr_array(satel_part, 'u_wind_mf')
+        v_lf = utils.rows_attr_array(satel_part, 'v_wind_lf')
+        v_mf = utils.rows_attr_array(satel_part, 'v_wind_mf')
+
+        utils.set_rows_attr_array(satel_part, 'u_wind_avg',
+                                  0.5 * (u_lf + u_mf))
+        utils.set_rows_attr_array(satel_part, 'v_wind_avg',
+                                  0.5 * (v_lf + v_mf))
 
         return satel_part
 
@@ -432,19 +483,18 @@ class SCSSatelManager(object):
             }
         }
 
-        for row in satel_part:
-            winddir = math.degrees(
-                math.atan2(row.u_component_of_wind,
-                           row.v_component_of_wind)
-            )
-            for windspd_name in windspd_and_uv_col_name[satel_name]:
-                windspd = getattr(row, windspd_name)
-                u_wind, v_wind = utils.decompose_wind(windspd, winddir,
-                                                      'o')
-                setattr(row, windspd_and_uv_col_name[satel_name]\
-                        [windspd_name][0], u_wind)
-                setattr(row, windspd_and_uv_col_name[satel_name]\
-                        [windspd_name][1], v_wind)
+        era5_u = utils.rows_attr_array(satel_part, 'u_component_of_wind')
+        era5_v = utils.rows_attr_array(satel_part, 'v_component_of_wind')
+        # Oceanographic convention
+        winddir = np.degrees(np.arctan2(era5_u, era5_v))
+
+        for windspd_name in windspd_and_uv_col_name[satel_name]:
+            windspd = utils.rows_attr_array(satel_part, windspd_name)
+            u_wind, v_wind = utils.decompose_wind(windspd, winddir, 'o')
+            u_name, v_name = windspd_and_uv_col_name[satel_name]\
+                    [windspd_name]
+            utils.set_rows_attr_array(satel_part, u_name, u_wind)
+            utils.set_rows_attr_array(satel_part, v_name, v_wind)
 
         return satel_part
 
@@ -828,15 +878,8 @@ class SCSSatelManager(object):
         self.logger.debug((f"""Downloading {satel_name} data on """
                            f"""{satel_date}"""))
 
-        data_url = config['urls']
-        file_prefix = config['data_prefix']
-        file_suffix = config['data_suffix']
-        if satel_name != 'smap':
-            save_dir = config['dirs']['bmaps']
-        else:
-            save_dir = config['dirs']['ncs']
-        save_dir = (f"""{save_dir}Y{satel_date.year}/"""
-                    f"""M{str(satel_date.month).zfill(2)}/""")
+        file_url, file_path = self._satel_file_url_and_path(
+            config, satel_name, satel_date)
         missing_dates_file = config['files_path']['missing_dates']
 
         if os.path.exists(missing_dates_file):
@@ -846,21 +889,13 @@ class SCSSatelManager(object):
             missing_dates = set()
 
         utils.set_format_custom_text(config['data_name_length'])
-        os.makedirs(save_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
         if satel_date in missing_dates:
             return None
-        if satel_name == 'smap':
-            filename = '%s%04d_%02d_%02d%s' % (
-                file_prefix, satel_date.year, satel_date.month,
-                satel_date.day, file_suffix)
-            file_url = f'{data_url}{satel_date.year}/{filename}'
-        else:
-            filename = '%s_%04d%02d%02d%s' % (
-                file_prefix, satel_date.year, satel_date.month,
-                satel_date.day, file_suffix)
-            file_url = '%sy%04d/m%02d/%s' % (
-                data_url, satel_date.year, satel_date.month, filename)
+        # File may have been prefetched
+        if os.path.exists(file_path):
+            return file_path
 
         retry_times = 0
         connect_success = False
@@ -886,11 +921,79 @@ class SCSSatelManager(object):
 
             return None
 
-        file_path = f'{save_dir}{filename}'
         utils.download(file_url, file_path)
 
         return file_path
 
+    def _satel_file_url_and_path(self, config, satel_name, satel_date):
+        """Get url and saving path of RSS daily file of satellite on
+        specified date.
+
+        """
+        data_url = config['urls']
+        file_prefix = config['data_prefix']
+        file_suffix = config['data_suffix']
+        if satel_name != 'smap':
+            save_dir = config['dirs']['bmaps']
+        else:
+            save_dir = config['dirs']['ncs']
+        save_dir = (f"""{save_dir}Y{satel_date.year}/"""
+                    f"""M{str(satel_date.month).zfill(2)}/""")
+
+        if satel_name == 'smap':
+            filename = '%s%04d_%02d_%02d%s' % (
+                file_prefix, satel_date.year, satel_date.month,
+                satel_date.day, file_suffix)
+            file_url = f'{data_url}{satel_date.year}/{filename}'
+        else:
+            filename = '%s_%04d%02d%02d%s' % (
+                file_prefix, satel_date.year, satel_date.month,
+                satel_date.day, file_suffix)
+            file_url = '%sy%04d/m%02d/%s' % (
+                data_url, satel_date.year, satel_date.month, filename)
+
+        return file_url, f'{save_dir}{filename}'
+
+    def prefetch(self, satel_name_date_pairs):
+        """Download RSS daily files of (satellite name, date) pairs
+        concurrently before they are read.
+
+        """
+        jobs = []
+        path_name_date = dict()
+        for satel_name, satel_date in satel_name_date_pairs:
+            if satel_name not in self.CONFIG['satel_data_sources']['rss']:
+                continue
+            if not self._datetime_in_satel_lifetime(
+                    satel_name, datetime.datetime.combine(
+                        satel_date, datetime.time())):
+                continue
+            file_url, file_path = self._satel_file_url_and_path(
+                self.CONFIG[satel_name], satel_name, satel_date)
+            jobs.append(fetcher.FetchJob(file_url, file_path))
+            path_name_date[file_path] = (satel_name, satel_date)
+
+        self.logger.info(f'Prefetching {len(jobs)} satellite files')
+        results = fetcher.FileFetcher(self.CONFIG).prefetch(jobs)
+
+        # Record missing dates so that matching stages skip them
+        for file_path, status in results.items():
+            if status != 'missing':
+                continue
+            satel_name, satel_date = path_name_date[file_path]
+            missing_dates_file = self.CONFIG[satel_name]['files_path'][
+                'missing_dates']
+            if os.path.exists(missing_dates_file):
+                with open(missing_dates_file, 'rb') as fr:
+                    missing_dates = pickle.load(fr)
+            else:
+                missing_dates = set()
+            missing_dates.add(satel_date)
+            with open(missing_dates_file, 'wb') as fw:
+                pickle.dump(missing_dates, fw)
+
+        return results
+
     def create_ascat_era5_table(self, dt):
         table_name = utils.gen_satel_era5_tablename('ascat', dt)
 
@@ -1138,6 +1241,10 @@ class SCSSatelManager(object):
 
         passes_num, lats_num, lons_num = subset[var_names[0]].shape
 
+        # Decompose wind of all cells at once
+        u_wind, v_wind = utils.decompose_wind(
+            subset['windspd'], subset['winddir'], 'o')
+
         for i in range(passes_num):
             for y in range(lats_num):
                 lat_of_row, lat_match_index = \
@@ -1198,8 +1305,12 @@ class SCSSatelManager(object):
                         None if subset['winddir'][i][y][x] == missing
                         else float(subset['winddir'][i][y][x])
                     )
-                    row.u_wind, row.v_wind = utils.decompose_wind(
-                        row.windspd, row.winddir, 'o')
+                    if (row.windspd is not None
+                        and row.winddir is not None):
+                        row.u_wind = float(u_wind[i][y][x])
+                        row.v_wind = float(v_wind[i][y][x])
+                    else:
+                        row.u_wind, row.v_wind = None, None
 
                     # Strictest reading rule: None of columns is none
                     skip = False
@@ -1231,6 +1342,12 @@ class SCSSatelManager(object):
 
         passes_num, lats_num, lons_num = subset[var_names[0]].shape
 
+        # Decompose wind of all cells at once
+        uv_wind = dict()
+        for name in ['lf', 'mf', 'aw']:
+            uv_wind[name] = utils.decompose_wind(
+                subset[f'w-{name}'], subset['wdir'], 'o')
+
         for i in range(passes_num):
             for y in range(lats_num):
                 lat_of_row, lat_match_index = \
@@ -1305,12 +1422,15 @@ class SCSSatelManager(object):
                                    if subset['wdir'][i][y][x] == missing
                                    else float(subset['wdir'][i][y][x]))
 
-                    row.u_wind_lf, row.v_wind_lf = utils.decompose_wind(
-                        row.w_lf, row.winddir, 'o')
-                    row.u_wind_mf, row.v_wind_mf = utils.decompose_wind(
-                        row.w_mf, row.winddir, 'o')
-                    row.u_wind_aw, row.v_wind_aw = utils.decompose_wind(
-                        row.w_aw, row.winddir, 'o')
+                    for name in ['lf', 'mf', 'aw']:
+                        if (getattr(row, f'w_{name}') is None
+                            or row.winddir is None):
+                            u_value, v_value = None, None
+                        else:
+                            u_value = float(uv_wind[name][0][i][y][x])
+                            v_value = float(uv_wind[name][1][i][y][x])
+                        setattr(row, f'u_wind_{name}', u_value)
+                        setattr(row, f'v_wind_{name}', v_value)
 
                     # Strictest reading rule: None of columns is none
                     skip = False
@@ -1558,88 +1678,44 @@ class SCSSatelManager(object):
 
         self.ocean_grid_pts = self.get_grid_pts_in_range(
             min_lon, max_lon, min_lat, max_lat)
-        grid_pts_num = self.ocean_grid_pts.count()
-
-        self.pt_region_data_indices = []
-
-        subprocess_num = 4
-        subset_pts_num = int(grid_pts_num / subprocess_num)
-
-        parallelism_workload = []
-        for i in range(subprocess_num):
-            start = i * subset_pts_num
-            if i != subprocess_num - 1:
-                end = (i + 1) * subset_pts_num
-            else:
-                end = grid_pts_num
-
-            workload = utils.GetChildDataIndices(
-                self.ocean_grid_pts[start:end], lats, lons,
-                owi_az_size)
-            parallelism_workload.append(workload)
-
-        with Pool(subprocess_num) as p:
-            parallelism_res = p.map(
-                utils.get_data_indices_around_grid_pts,
-                parallelism_workload
-            )
-
-        for res_subset in parallelism_res:
-            for pt_res in res_subset:
-                self.pt_region_data_indices.append(pt_res)
-
-        print(f'ocean gird pts num: {grid_pts_num}')
-        print((f"""len of pt_region_data_indices: """
-               f"""{len(self.pt_region_data_indices)}"""))
 
         var_names = [
             'owiEcmwfWindSpeed', 'owiEcmwfWindDirection',
             'owiWindSpeed', 'owiWindDirection',
             'owiInversionQuality', 'owiWindQuality'
         ]
+        swath_vars = dict()
+        for var_name in var_names:
+            swath_vars[var_name] = vars[var_name][:]
 
-        total = grid_pts_num
-        for pt_idx, pt in enumerate(self.ocean_grid_pts):
-            percent = float(pt_idx + 1) / total * 100
-            print(f'\r{percent:.2f}%', end='')
-
-            ecmwf_windspd = []
-            ecmwf_winddir = []
-            windspd = []
-            winddir = []
-            # :flag_values = 0B, 1B, 2B; // byte
-            # :flag_meanings = "good medium poor"
-            inversion_quality = []
-            # :flag_values = 0B, 1B, 2B, 3B; // byte
-            # :flag_meanings = "good medium low poor"
-            wind_quality = []
-
-            for index_pair in self.pt_region_data_indices[pt_idx]:
-                i, j = index_pair[0], index_pair[1]
-                # Mask
-                if vars['owiMask'][i][j] != 0.0:
-                    continue
-
-                skip = False
-                for var_name in var_names:
-                    if vars[var_name][i][j] is MASKED:
-                        skip = True
-                        break
-                if skip:
-                    continue
-
-                ecmwf_windspd.append(vars['owiEcmwfWindSpeed'][i][j])
-                ecmwf_winddir.append(vars['owiEcmwfWindDirection'][i][j])
-                windspd.append(vars['owiWindSpeed'][i][j])
-                winddir.append(vars['owiWindDirection'][i][j])
-                inversion_quality.append(
-                    float(vars['owiInversionQuality'][i][j]))
-                wind_quality.append(
-                    float(vars['owiWindQuality'][i][j]))
-
-            if not len(windspd) or not len(winddir):
+        # Skip masked pixels and pixels whose variables are masked
+        valid = np.ma.filled(vars['owiMask'][:] == 0.0, False)
+        for var_name in var_names:
+            valid &= ~np.ma.getmaskarray(swath_vars[var_name])
+
+        count, means = utils.bin_swath_to_grid(
+            lons, lats, swath_vars, valid, self.grid_lons,
+            self.grid_lats, self.spa_resolu['grid'])
+
+        # Decompose wind of all grid cells at once.  In Sentinel-1's
+        # NetCDF file, wind directions are meteorological convention,
+        # which needed to be converted to oceangraphic convention
+        winddir = dict()
+        uv_wind = dict()
+        for prefix in ['Ecmwf', '']:
+            winddir[prefix] = (means[f'owi{prefix}WindDirection']
+                               + 180) % 360
+            uv_wind[prefix] = utils.decompose_wind(
+                means[f'owi{prefix}WindSpeed'], winddir[prefix], 'o')
+
+        for pt in self.ocean_grid_pts:
+            if not count[pt.y][pt.x]:
                 continue
 
+            cell = dict()
+            for var_name in var_names:
+                cell[var_name] = float(means[var_name][pt.y][pt.x])
+
             row = SatelERA5()
             row.satel_datetime = mean_dt
             row.x = pt.x
@@ -1648,28 +1724,23 @@ class SCSSatelManager(object):
             row.lat = pt.lat
             row.satel_datetime_lon_lat = (f"""{row.satel_datetime}"""
                                           + f"""_{row.lon}_{row.lat}""")
-            row.ecmwf_windspd = float(mean(ecmwf_windspd))
-            # In Sentinel-1's NetCDF file, owiEcmwfWindDirection is
-            # meteorological convention, which needed to be converted
-            # to oceangraphic convention
-            row.ecmwf_winddir = (float(mean(ecmwf_winddir)) + 180) % 360
-            row.ecmwf_u_wind, row.ecmwf_v_wind = utils.decompose_wind(
-                row.ecmwf_windspd, row.ecmwf_winddir, 'o')
-
-            row.windspd = float(mean(windspd))
-            # In Sentinel-1's NetCDF file, owiWindDirection is
-            # meteorological convention, which needed to be converted
-            # to oceangraphic convention
-            row.winddir = (float(mean(winddir)) + 180) % 360
-            row.u_wind, row.v_wind = utils.decompose_wind(
-                row.windspd, row.winddir, 'o')
-
-            row.inversion_quality = mean(inversion_quality)
-            row.wind_quality = mean(wind_quality)
+            row.ecmwf_windspd = cell['owiEcmwfWindSpeed']
+            row.ecmwf_winddir = float(winddir['Ecmwf'][pt.y][pt.x])
+            row.ecmwf_u_wind = float(uv_wind['Ecmwf'][0][pt.y][pt.x])
+            row.ecmwf_v_wind = float(uv_wind['Ecmwf'][1][pt.y][pt.x])
 
-            data.append(row)
+            row.windspd = cell['owiWindSpeed']
+            row.winddir = float(winddir[''][pt.y][pt.x])
+            row.u_wind = float(uv_wind[''][0][pt.y][pt.x])
+            row.v_wind = float(uv_wind[''][1][pt.y][pt.x])
 
-        utils.delete_last_lines()
-        print('Done')
+            # :flag_values = 0B, 1B, 2B; // byte
+            # :flag_meanings = "good medium poor"
+            row.inversion_quality = cell['owiInversionQuality']
+            # :flag_values = 0B, 1B, 2B, 3B; // byte
+            # :flag_meanings = "good medium low poor"
+            row.wind_quality = cell['owiWindQuality']
+
+            data.append(row)
 
         return data
@@ -26,6 +26,7 @@ import netCDF4
 import pygrib
 
 import utils
+import fetcher
 import cwind
 import sfmr
 import era5
@@ -203,10 +204,16 @@ class SatelManager(object):
         return SatelERA5
 
     def download_and_read_satel_era5(self):
-        utils.setup_signal_handler()
-
         dt_delta = self.period[1] - self.period[0]
 
+        self.prefetch([
+            ('smap', (self.period[0]
+                      + datetime.timedelta(days=day)).date())
+            for day in range(dt_delta.days)
+        ])
+
+        utils.setup_signal_handler()
+
         for day in range(dt_delta.days):
             target_datetime = (self.period[0]
                                + datetime.timedelta(days=day))
@@ -1643,10 +1650,8 @@ class SatelManager(object):
         """
         self.logger.debug(f'Downloading {satel_name} data on {satel_date}')
 
-        data_url = config['urls']
-        file_prefix = config['data_prefix']
-        file_suffix = config['data_suffix']
-        save_dir = config['dirs']['bmaps']
+        file_url, file_path = self._satel_file_url_and_path(
+            config, satel_name, satel_date)
         missing_dates_file = config['files_path']['missing_dates']
 
         if os.path.exists(missing_dates_file):
@@ -1656,10 +1661,37 @@ class SatelManager(object):
             missing_dates = set()
 
         utils.set_format_custom_text(config['data_name_length'])
-        os.makedirs(save_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
         if satel_date in missing_dates:
             return None
+        # File may have been prefetched
+        if os.path.exists(file_path):
+            return file_path
+
+        if not utils.url_exists(file_url):
+            print('Missing date of {satel_name}: {satel_date}')
+            print(file_url)
+            missing_dates.add(satel_date)
+            return None
+
+        utils.download(file_url, file_path)
+
+        with open(missing_dates_file, 'wb') as fw:
+            pickle.dump(missing_dates, fw)
+
+        return file_path
+
+    def _satel_file_url_and_path(self, config, satel_name, satel_date):
+        """Get url and saving path of RSS daily file of satellite on
+        specified date.
+
+        """
+        data_url = config['urls']
+        file_prefix = config['data_prefix']
+        file_suffix = config['data_suffix']
+        save_dir = config['dirs']['bmaps']
+
         if satel_name == 'smap':
             filename = '%s%04d_%02d_%02d%s' % (
                 file_prefix, satel_date.year, satel_date.month,
@@ -1672,17 +1704,42 @@ class SatelManager(object):
             file_url = '%sy%04d/m%02d/%s' % (
                 data_url, satel_date.year, satel_date.month, filename)
 
-        if not utils.url_exists(file_url):
-            print('Missing date of {satel_name}: {satel_date}')
-            print(file_url)
-            missing_dates.add(satel_date)
-            return None
+        return file_url, f'{save_dir}{filename}'
 
-        file_path = f'{save_dir}{filename}'
+    def prefetch(self, satel_name_date_pairs):
+        """Download RSS daily files of (satellite name, date) pairs
+        concurrently before they are read.
 
-        utils.download(file_url, file_path)
+        """
+        jobs = []
+        path_name_date = dict()
+        for satel_name, satel_date in satel_name_date_pairs:
+            if not self._datetime_in_satel_lifetime(
+                    satel_name, datetime.datetime.combine(
+                        satel_date, datetime.time())):
+                continue
+            file_url, file_path = self._satel_file_url_and_path(
+                self.CONFIG[satel_name], satel_name, satel_date)
+            jobs.append(fetcher.FetchJob(file_url, file_path))
+            path_name_date[file_path] = (satel_name, satel_date)
 
-        with open(missing_dates_file, 'wb') as fw:
-            pickle.dump(missing_dates, fw)
+        self.logger.info(f'Prefetching {len(jobs)} satellite files')
+        results = fetcher.FileFetcher(self.CONFIG).prefetch(jobs)
 
-        return file_path
+        # Record missing dates so that downloading skips them
+        for file_path, status in results.items():
+            if status != 'missing':
+                continue
+            satel_name, satel_date = path_name_date[file_path]
+            missing_dates_file = self.CONFIG[satel_name]['files_path'][
+                'missing_dates']
+            if os.path.exists(missing_dates_file):
+                with open(missing_dates_file, 'rb') as fr:
+                    missing_dates = pickle.load(fr)
+            else:
+                missing_dates = set()
+            missing_dates.add(satel_date)
+            with open(missing_dates_file, 'wb') as fw:
+                pickle.dump(missing_dates, fw)
+
+        return results
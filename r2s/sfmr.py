@@ -26,6 +26,8 @@ import netCDF4
 
 import utils
 import netcdf_util
+import crawler
+import sfmr_index
 
 MASKED = np.ma.core.masked
 Base = declarative_base()
@@ -469,6 +471,8 @@ class SfmrManager(object):
             brief_info_list,
             self.CONFIG['database']['batch_size']['insert'],
             SFMRDetail, ['filename'], self.session, check_self=True)
+        # Brief info index loaded before is out of date
+        sfmr_index.invalidate()
 
         self.brief_info = brief_info
 
@@ -640,11 +644,20 @@ class SfmrManager(object):
 
         return
 
+    def _get_crawler(self):
+        if not hasattr(self, 'crawler'):
+            crawler_config = self.SFMR_CONFIG['crawler']
+            self.crawler = crawler.AsyncPageCrawler(
+                self.SFMR_CONFIG['vars_path']['page_cache'],
+                crawler_config['concurrency'],
+                self.CONFIG['network']['retry_times'])
+
+        return self.crawler
+
     def get_sfmr_latest_year(self):
         url = self.SFMR_CONFIG["urls"]["hurricane"]
 
-        page = requests.get(url)
-        data = page.text
+        data = self._get_crawler().fetch(url)
         soup = bs4.BeautifulSoup(data, features='lxml')
         anchors = soup.find_all('b')
 
@@ -668,25 +681,47 @@ class SfmrManager(object):
         if start_year > end_year:
             return None
 
-        brief_info = dict()
+        year_url = dict()
         for year in range(start_year, end_year+1):
-            info = f'Finding hurricanes of year {year}'
-            self.logger.debug(info)
-            print(f'\r{info}', end='')
-
             if year < 1994:
                 year_str = 'prior1994'
             elif year == latest_year:
                 year_str = ''
             else:
                 year_str = f'{year}'
-            url = (f'{self.SFMR_CONFIG["urls"]["hurricane"][:-5]}'
-                   + f'{year_str}.html')
-            one_year_brief_info = self.get_one_year_sfmr_brief_info(url)
-            brief_info[year] = one_year_brief_info
+            year_url[year] = (
+                f'{self.SFMR_CONFIG["urls"]["hurricane"][:-5]}'
+                + f'{year_str}.html')
 
-        utils.delete_last_lines()
-        print('Done')
+        # Pages of past seasons no longer change, so only pages of
+        # current season are revalidated when they have been cached
+        current_season_urls = set([year_url[end_year]])
+
+        def refresh(url):
+            return url in current_season_urls
+
+        crawler_ = self._get_crawler()
+        self.logger.debug(f'Crawling {len(year_url)} year pages')
+        year_pages = crawler_.fetch_all(list(year_url.values()), refresh)
+
+        year_hurr_urls = dict()
+        for year, url in year_url.items():
+            year_hurr_urls[year] = self._parse_one_year_sfmr_urls(
+                year_pages[url])
+            if year == latest_year:
+                current_season_urls.update(year_hurr_urls[year])
+
+        all_hurr_urls = [url for year in year_hurr_urls
+                         for url in year_hurr_urls[year]]
+        self.logger.debug(f'Crawling {len(all_hurr_urls)} hurricane pages')
+        hurr_pages = crawler_.fetch_all(all_hurr_urls, refresh)
+
+        brief_info = dict()
+        for year in year_hurr_urls:
+            brief_info[year] = []
+            for url in year_hurr_urls[year]:
+                brief_info[year] += self._parse_one_hurricane_brief_info(
+                    url, hurr_pages[url])
 
         return brief_info
 
@@ -696,8 +731,24 @@ class SfmrManager(object):
         """
         one_year_brief_info = []
 
-        page = requests.get(url)
-        data = page.text
+        hurr_urls = self._parse_one_year_sfmr_urls(
+            self._get_crawler().fetch(url))
+        hurr_pages = self._get_crawler().fetch_all(hurr_urls)
+        for hurr_url in hurr_urls:
+            one_year_brief_info += self._parse_one_hurricane_brief_info(
+                hurr_url, hurr_pages[hurr_url])
+
+        return one_year_brief_info
+
+    def _parse_one_year_sfmr_urls(self, data):
+        """Parse urls of SFMR pages of ALTANTIC BASIN hurricanes from
+        page of one year.
+
+        """
+        hurr_urls = []
+        if data is None:
+            return hurr_urls
+
         soup = bs4.BeautifulSoup(data, features='lxml')
         all_bolds = soup.find_all('b')
 
@@ -721,22 +772,21 @@ class SfmrManager(object):
                             text = link.contents[0]
                             if text != 'SFMR':
                                 continue
-                            href = link.get('href')
-
-                            one_hurricane_brief_info = \
-                                    self.get_one_hurricane_brief_info(
-                                        href)
-                            one_year_brief_info += \
-                                    one_hurricane_brief_info
+                            hurr_urls.append(link.get('href'))
 
-        return one_year_brief_info
+        return hurr_urls
 
     def get_one_hurricane_brief_info(self, hurricane_sfmr_url):
+        return self._parse_one_hurricane_brief_info(
+            hurricane_sfmr_url,
+            self._get_crawler().fetch(hurricane_sfmr_url))
+
+    def _parse_one_hurricane_brief_info(self, hurricane_sfmr_url, data):
         brief_info = []
+        if data is None:
+            return brief_info
 
         try:
-            page = requests.get(hurricane_sfmr_url)
-            data = page.text
             soup = bs4.BeautifulSoup(data, features='lxml')
             anchors = soup.find_all('a')
             filename_suffix = '.nc'
@@ -0,0 +1,229 @@
+"""Parse SFMR flight files once and answer spatial-temporal queries.
+
+Matching a TC with SFMR used to reopen every candidate netCDF file for
+every pair of neighbouring IBTrACS records and convert DATE and TIME of
+samples one by one.  SFMRFlight reads a file once into arrays sorted by
+rounded hour, so that samples of an hour are found by binary search and
+filtered with a vectorized box test.  SFMRCache keeps the most recently
+used flights of the process in memory.
+
+"""
+import collections
+import logging
+import threading
+
+import netCDF4
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Variables read besides DATE and TIME
+VAR_NAMES = ['LON', 'LAT', 'FLAG', 'ATEMP', 'SALN', 'SST', 'SRR', 'SWS']
+
+DEFAULT_MAX_FLIGHTS = 64
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def flight_path(CONFIG, info):
+    """Get path of SFMR file described by a row of brief info table.
+
+    """
+    year = info.start_datetime.year
+
+    return (f"""{CONFIG['sfmr']['dirs']['hurr']}"""
+            f"""{year}/{info.hurr_name}/{info.filename}""")
+
+
+def sfmr_datetimes(dates, times):
+    """Convert DATE and TIME of SFMR samples to datetime64.
+
+    DATE is an integer like 20180910 and TIME is an integer like 93015,
+    i.e. 09:30:15, whose leading zeros are dropped.
+
+    Returns
+    -------
+    datetimes : numpy.ndarray
+        Datetime64 in seconds.  It is NaT where DATE is 0, which happens
+        near the end of SFMR data array, or where DATE or TIME is
+        invalid.
+
+    """
+    dates = np.asarray(dates).astype(np.int64)
+    times = np.asarray(times).astype(np.int64)
+
+    year, month, day = dates // 10000, dates // 100 % 100, dates % 100
+    hour, minute, second = times // 10000, times // 100 % 100, times % 100
+    valid = ((dates > 0) & (month >= 1) & (month <= 12) & (day >= 1)
+             & (day <= 31) & (times >= 0) & (hour < 24) & (minute < 60)
+             & (second < 60))
+
+    months = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+    days = months.astype('datetime64[D]') + (day - 1)
+    # Day out of its month, e.g. 20180931
+    valid &= (days.astype('datetime64[M]') == months)
+
+    datetimes = (days.astype('datetime64[s]')
+                 + (hour * 3600 + minute * 60 + second))
+    datetimes[~valid] = np.datetime64('NaT')
+
+    return datetimes
+
+
+class SFMRFlight(object):
+    """Samples of one SFMR file sorted by rounded hour.
+
+    Samples whose DATE is 0 are dropped.  ``indices`` keeps indices of
+    samples in the file, so that results of queries can be used
+    together with code which reads the file directly.
+
+    Attributes
+    ----------
+    indices : numpy.ndarray
+        Indices of samples in the file.
+    datetimes : numpy.ndarray
+        Datetime64 of samples in seconds.
+    rounded_hours : numpy.ndarray
+        Datetime64 of samples rounded to the nearest hour, like
+        utils.hour_rounder.
+    vars : dict
+        Key is name of variable in VAR_NAMES which exists in the file
+        and value is its array.  Longitude is in [0, 360).
+
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+        dataset = netCDF4.Dataset(file_path)
+        # VERY VERY IMPORTANT: netCDF4 auto mask may cause problems,
+        # so must disable auto mask
+        dataset.set_auto_mask(False)
+        nc_vars = dataset.variables
+
+        datetimes = sfmr_datetimes(nc_vars['DATE'][:], nc_vars['TIME'][:])
+        invalid = np.isnat(datetimes) & (
+            np.asarray(nc_vars['DATE'][:]) != 0)
+        if invalid.any():
+            logger.warning((f"""Skip {invalid.sum()} samples with """
+                            f"""invalid DATE or TIME in {file_path}"""))
+
+        rounded_hours = (datetimes + np.timedelta64(30, 'm')).astype(
+            'datetime64[h]')
+        indices = np.nonzero(~np.isnat(datetimes))[0]
+        indices = indices[np.argsort(rounded_hours[indices],
+                                     kind='stable')]
+
+        self.indices = indices
+        # Position of every sample of file in sorted arrays, -1 for
+        # dropped samples
+        self.file_positions = np.full(len(datetimes), -1, dtype=int)
+        self.file_positions[indices] = np.arange(len(indices))
+        self.datetimes = datetimes[indices]
+        self.rounded_hours = rounded_hours[indices]
+        self.vars = dict()
+        for name in VAR_NAMES:
+            if name in nc_vars.keys():
+                self.vars[name] = np.asarray(nc_vars[name][:])[indices]
+        if 'LON' in self.vars:
+            self.vars['LON'] = (self.vars['LON'] + 360) % 360
+
+        dataset.close()
+
+    def __len__(self):
+        return len(self.indices)
+
+    def positions(self, file_indices):
+        """Get positions in sorted arrays of samples with indices in
+        file.
+
+        """
+        positions = self.file_positions[np.asarray(file_indices,
+                                                   dtype=int)]
+        if (positions < 0).any():
+            raise ValueError((f"""Samples with DATE 0 or invalid TIME """
+                              f"""are requested from {self.file_path}"""))
+
+        return positions
+
+    def hour_slice(self, start, end=None):
+        """Get slice of samples whose rounded hour is in [start, end].
+
+        """
+        if end is None:
+            end = start
+        start = np.datetime64(start, 'h')
+        end = np.datetime64(end, 'h')
+
+        return slice(
+            np.searchsorted(self.rounded_hours, start, side='left'),
+            np.searchsorted(self.rounded_hours, end, side='right'))
+
+    def in_box(self, hour, lon1, lon2, lat1, lat2):
+        """Get indices in file of samples whose rounded hour is `hour`
+        and which are in box, boundaries included.  Indices are in
+        ascending order.
+
+        """
+        part = self.hour_slice(hour)
+        lons = self.vars['LON'][part]
+        lats = self.vars['LAT'][part]
+        inside = ((lons >= lon1) & (lons <= lon2) & (lats >= lat1)
+                  & (lats <= lat2))
+
+        return np.sort(self.indices[part][inside])
+
+
+class SFMRCache(object):
+    """Least recently used SFMR flights of process.
+
+    Parameters
+    ----------
+    max_flights : int
+        Max number of flights kept in memory.
+
+    """
+    def __init__(self, max_flights=DEFAULT_MAX_FLIGHTS):
+        self.max_flights = max_flights
+        self.flights = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, file_path):
+        with self.lock:
+            if file_path in self.flights:
+                self.flights.move_to_end(file_path)
+                return self.flights[file_path]
+
+        flight = SFMRFlight(file_path)
+
+        with self.lock:
+            self.flights[file_path] = flight
+            self.flights.move_to_end(file_path)
+            while len(self.flights) > self.max_flights:
+                self.flights.popitem(last=False)
+
+        return flight
+
+    def clear(self):
+        with self.lock:
+            self.flights.clear()
+
+
+def get_sfmr_cache(CONFIG=None):
+    """Get SFMR cache shared by the whole process.
+
+    Its size is read from CONFIG['sfmr']['cache']['max_flights'] when
+    it exists.
+
+    """
+    global _default_cache
+
+    with _default_cache_lock:
+        if _default_cache is None:
+            max_flights = DEFAULT_MAX_FLIGHTS
+            if CONFIG is not None:
+                max_flights = CONFIG['sfmr'].get('cache', dict()).get(
+                    'max_flights', max_flights)
+            _default_cache = SFMRCache(max_flights)
+
+    return _default_cache
@@ -0,0 +1,159 @@
+"""In-memory index of SFMR brief info.
+
+Checking whether SFMR exists between two IBTrACS records used to query
+the brief info table for every pair of records and test overlap of
+rectangles one by one.  The table has only thousands of rows, so
+SFMRBriefInfoIndex loads it once per process into arrays sorted by start
+datetime.  Flights which may overlap a time window are found by binary
+search on start datetime and a running maximum of end datetime, and then
+tested against the window and a box with array comparisons.  Many
+windows can be queried in one call.
+
+Rows are detached copies of the table rows, so that they can be used
+after the session which loaded them is committed or closed.
+
+"""
+import collections
+import threading
+
+import numpy as np
+import sqlalchemy as sa
+
+import utils
+
+_default_indices = dict()
+_default_indices_lock = threading.Lock()
+
+
+class SFMRBriefInfoIndex(object):
+    """Interval and bounding box index of rows of SFMR brief info table.
+
+    Parameters
+    ----------
+    rows : list
+        Rows of brief info table.  Every row must have attributes
+        start_datetime, end_datetime, min_lon, max_lon, min_lat and
+        max_lat.  Results of queries keep the order of rows.
+
+    """
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+        def column(attr, dtype):
+            return np.array([getattr(row, attr) for row in self.rows],
+                            dtype=dtype)
+
+        start = column('start_datetime', 'datetime64[us]')
+        end = column('end_datetime', 'datetime64[us]')
+        # Positions of rows sorted by start datetime
+        self.order = np.argsort(start, kind='stable')
+        self.start = start[self.order]
+        self.end = end[self.order]
+        # Max end datetime of rows whose start datetime is not later
+        self.end_cummax = np.maximum.accumulate(self.end) if len(
+            self.end) else self.end
+        self.min_lon = column('min_lon', float)[self.order]
+        self.max_lon = column('max_lon', float)[self.order]
+        self.min_lat = column('min_lat', float)[self.order]
+        self.max_lat = column('max_lat', float)[self.order]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _positions(self, part, t1, box):
+        """Get positions of rows in slice `part` of sorted rows which
+        end after t1 and overlap box, in ascending order.
+
+        """
+        hit = self.end[part] > t1
+        if box is not None and box[0] is not None:
+            lon1, lon2, lat1, lat2 = box
+            hit &= ((self.min_lon[part] <= lon2)
+                    & (self.max_lon[part] >= lon1)
+                    & (self.min_lat[part] <= lat2)
+                    & (self.max_lat[part] >= lat1))
+
+        return np.sort(self.order[part][hit])
+
+    def query(self, t1, t2, lon1=None, lon2=None, lat1=None, lat2=None):
+        """Get rows of flights which overlap time window and box.
+
+        Time window (t1, t2) excludes its ends, like the query
+        ``end_datetime > t1 and start_datetime < t2``.  Box is
+        [lon1, lon2] x [lat1, lat2] including boundaries, like
+        utils.doOverlap.  Box is not checked when lon1 is None.
+
+        """
+        return self.query_many([(t1, t2, lon1, lon2, lat1, lat2)])[0]
+
+    def query_many(self, windows):
+        """Query many windows in one call.
+
+        Parameters
+        ----------
+        windows : list of tuple
+            Every tuple is (t1, t2) or (t1, t2, lon1, lon2, lat1, lat2)
+            like arguments of query.
+
+        Returns
+        -------
+        results : list of list
+            Rows which overlap each window.
+
+        """
+        if not len(windows):
+            return []
+
+        t1 = np.array([w[0] for w in windows], dtype='datetime64[us]')
+        t2 = np.array([w[1] for w in windows], dtype='datetime64[us]')
+        # start_datetime < t2
+        his = np.searchsorted(self.start, t2, side='left')
+        # end_datetime > t1 is impossible before lo
+        los = np.minimum(np.searchsorted(self.end_cummax, t1,
+                                         side='right'), his)
+
+        results = []
+        for idx, window in enumerate(windows):
+            positions = self._positions(slice(los[idx], his[idx]),
+                                        t1[idx], window[2:] or None)
+            results.append([self.rows[i] for i in positions])
+
+        return results
+
+
+def detach_rows(rows, table_class):
+    """Copy rows of table into namedtuples of its columns.
+
+    """
+    names = [attr.key for attr in sa.inspect(table_class).column_attrs]
+    Row = collections.namedtuple('BriefInfo', names)
+
+    return [Row(*[getattr(row, name) for name in names]) for row in rows]
+
+
+def get_brief_info_index(CONFIG, engine, session):
+    """Get index of SFMR brief info table shared by the whole process.
+
+    The table is loaded at the first call.  Call invalidate after the
+    table is updated.
+
+    """
+    table_name = CONFIG['sfmr']['table_names']['brief_info']
+    key = (str(engine.url), table_name)
+
+    with _default_indices_lock:
+        if key not in _default_indices:
+            BriefInfo = utils.get_class_by_tablename(engine, table_name)
+            rows = session.query(BriefInfo).order_by(BriefInfo.key).all()
+            _default_indices[key] = SFMRBriefInfoIndex(
+                detach_rows(rows, BriefInfo))
+
+    return _default_indices[key]
+
+
+def invalidate():
+    """Drop loaded indices, so that they are reloaded at next use.
+
+    """
+    with _default_indices_lock:
+        _default_indices.clear()
@@ -2,20 +2,15 @@ import calendar
 import copy
 import datetime
 import logging
-import os
 import pickle
 import statistics
 import string
 import time
 
-import matplotlib.pyplot as plt
-from global_land_mask import globe
 from sqlalchemy.ext.declarative import declarative_base
 import pandas as pd
 import pygrib
-import numpy as np
 import numpy.ma as ma
-import matplotlib.pyplot as plt
 from scipy import interpolate
 from sklearn.preprocessing import MinMaxScaler
 from sqlalchemy import or_
@@ -23,7 +18,10 @@ import netCDF4
 
 import ccmp
 import era5
+import landmask
+import render
 import satel_scs
+import tc_track
 import utils
 import match_era5_smap
 import compare_tc
@@ -35,6 +33,7 @@ class TCSimulator(object):
     def __init__(self, CONFIG, period, region, basin, passwd,
                  save_disk, simulate_instructions):
         self.CONFIG = CONFIG
+        self.land_mask = landmask.get_land_mask(CONFIG)
         self.period = period
         self.region = region
         self.db_root_passwd = passwd
@@ -149,25 +148,23 @@ class TCSimulator(object):
                 exit(1)
 
         # Filter TCs during period
-        for idx, tc in enumerate(tc_query):
+        for tc, next_tc in tc_track.iter_tc_pairs(tc_query):
             if tc.name not in self.tc_names:
                 continue
-            converted_lon = utils.longitude_converter(tc.lon,
-                                                      '360', '-180')
-            if bool(globe.is_land(tc.lat, converted_lon)):
+            if self.land_mask.is_land(tc.lat, tc.lon):
                 continue
             success = False
 
-            if idx < total - 1:
-                next_tc = tc_query[idx + 1]
-                if tc.sid == next_tc.sid:
-                    if (tc.date_time >= self.period[1]
-                            or next_tc.date_time <= self.period[0]):
-                        continue
-                    print(f'Simulating {tc.date_time} - {next_tc.date_time}')
+            if next_tc is not None:
+                if (tc.date_time >= self.period[1]
+                        or next_tc.date_time <= self.period[0]):
+                    continue
+                print(f'Simulating {tc.date_time} - {next_tc.date_time}')
 
-                    self.simulate_between_two_tcs(tc, next_tc)
+                self.simulate_between_two_tcs(tc, next_tc)
 
+        # Wait for figures rendered in background
+        render.get_renderer(self.CONFIG).wait()
         print('Done')
 
     def simulate_between_two_tcs(self, tc, next_tc):
@@ -191,61 +188,30 @@ class TCSimulator(object):
         else:
             tight_hours = hours
 
+        interped_tcs = tc_track.hourly_tcs(tc, next_tc)
         skip_hour_indices = []
         for i, h in enumerate(range(hours)):
-            interped_tc = utils.interp_tc(self, h, tc, next_tc)
+            interped_tc = interped_tcs[h]
             if (interped_tc.date_time < self.period[0]
                     or interped_tc.date_time > self.period[1]):
                 skip_hour_indices.append(i)
 
         subplots_row, subplots_col, fig_size = \
             utils.get_subplots_row_col_and_fig_size(tight_hours)
-        fig, axes = plt.subplots(subplots_row, subplots_col,
-                                 figsize=fig_size)
 
-        hours_max_windspd = -1
-        ax_idx = 0
+        # Wind speed of every hour is computed once and drawn in
+        # renderer after max wind speed of all hours is known
+        panels = []
         for i, h in enumerate(range(hours)):
             if i in skip_hour_indices:
                 continue
-            try:
-                interped_tc = utils.interp_tc(self, h, tc, next_tc)
-                if isinstance(axes, np.ndarray):
-                    ax = axes.flat[ax_idx]
-                else:
-                    ax = axes
-            except Exception as msg:
-                breakpoint()
-                exit(msg)
-
-            success, hourly_max_windspd = self.simulate_hourly(
-                interped_tc, fig, ax)
-            if success:
-                hours_max_windspd = max(hours_max_windspd,
-                                        hourly_max_windspd)
-                ax_idx += 1
-        if hourly_max_windspd == -1:
-            return
+            interped_tc = interped_tcs[h]
 
-        ax_idx = 0
-        for i, h in enumerate(range(hours)):
-            if i in skip_hour_indices:
-                continue
-            try:
-                interped_tc = utils.interp_tc(self, h, tc, next_tc)
-                if isinstance(axes, np.ndarray):
-                    ax = axes.flat[ax_idx]
-                else:
-                    ax = axes
-            except Exception as msg:
-                breakpoint()
-                exit(msg)
-
-            success, hourly_max_windspd = self.simulate_hourly(
-                interped_tc, fig, ax, hours_max_windspd, ax_idx)
+            success, panel = self.simulate_hourly(interped_tc)
 
             if success:
-                ax_idx += 1
+                panel['label'] = f'{string.ascii_lowercase[len(panels)]})'
+                panels.append(panel)
                 print((f"""Simulating SMAP windspd """
                        f"""of TC {interped_tc.name} on """
                        f"""{interped_tc.date_time}"""))
@@ -253,21 +219,35 @@ class TCSimulator(object):
                 print((f"""Skiping simulating SMAP windspd """
                        f"""of TC {interped_tc.name} """
                        f"""on {interped_tc.date_time}"""))
+        if not panels:
+            return
 
-        fig.tight_layout(pad=0.1)
+        hours_max_windspd = max([panel['windspd'].max()
+                                 for panel in panels])
 
         dt_str = (f"""{tc.date_time.strftime('%Y_%m%d_%H%M')}"""
                   f"""_"""
                   f"""{next_tc.date_time.strftime('_%H%M')}""")
         fig_dir = self.CONFIG['result']['dirs']['fig']['simulation']
 
-        os.makedirs(fig_dir, exist_ok=True)
         fig_name = f'{dt_str}_{tc.name}.png'
-        plt.savefig(f'{fig_dir}{fig_name}', dpi=600)
-        plt.clf()
-
-    def simulate_hourly(self, tc, fig, ax, hours_max_windspd=None,
-                        hour_idx=None):
+        render.get_renderer(self.CONFIG).submit(
+            render.draw_windspd_panels, f'{fig_dir}{fig_name}',
+            (render.PlotContext(self), panels, subplots_row,
+             subplots_col, hours_max_windspd, True, 15),
+            figsize=fig_size)
+
+    def simulate_hourly(self, tc):
+        """Simulate SMAP wind speed around interpolated TC.
+
+        Returns
+        -------
+        success : bool
+            Whether wind speed is simulated.
+        panel : dict or None
+            Panel of render.draw_windspd_panels.
+
+        """
         success, smap_lons, smap_lats = utils.get_smap_lonlat(self, tc)
         if not success:
             return False, None
@@ -290,8 +270,6 @@ class TCSimulator(object):
                     smap_lats)
             if not success:
                 return False, None
-            if hours_max_windspd is None:
-                return True, windspd.max()
         except Exception as msg:
             breakpoint()
             exit(msg)
@@ -300,27 +278,15 @@ class TCSimulator(object):
         subplot_title_suffix = (
             f"""{accurate_dt.strftime('%H%M UTC %d %b %Y')} """
         )
-        # Draw windspd
-        print(tc.date_time)
-        try:
-            fontsize = 20
-            utils.draw_windspd(self, fig, ax, tc.date_time,
-                               lons, lats, windspd,
-                               hours_max_windspd,
-                               mesh, draw_contour=True,
-                               custom=True,
-                               region=draw_region)
-            ax.text(0.1, 0.95,
-                    f'{string.ascii_lowercase[hour_idx]})',
-                    transform=ax.transAxes, fontsize=20,
-                    fontweight='bold', va='top', ha='right')
-            ax.set_title((
-                          f"""Simulated SMAP Wind """
-                          f"""{subplot_title_suffix} """
-                          f"""{tc.name}"""),
-                         size=15)
-        except Exception as msg:
-            breakpoint()
-            exit(msg)
-
-        return True, 'Done'
+        panel = {
+            'lons': lons,
+            'lats': lats,
+            'windspd': windspd,
+            'mesh': mesh,
+            'region': draw_region,
+            'title': (f"""Simulated SMAP Wind """
+                      f"""{subplot_title_suffix} """
+                      f"""{tc.name}"""),
+        }
+
+        return True, panel
@@ -4,6 +4,8 @@ import logging
 from sqlalchemy.ext.declarative import declarative_base
 from netCDF4 import Dataset
 
+import sfmr_cache
+import sfmr_index
 import utils
 
 Base = declarative_base()
@@ -45,21 +47,15 @@ class SmartComparer(object):
         center_datetime = dict()
         center_lonlat = dict()
 
-        # Get table class of sfmr brief info
-        SFMRInfo = utils.get_class_by_tablename(
-            self.engine,
-            self.CONFIG['sfmr']['table_names']['brief_info'])
-
-        sfmr_info_query = self.session.query(SFMRInfo).filter(
-            SFMRInfo.start_datetime < self.period[1],
-            SFMRInfo.end_datetime > self.period[0])
+        # Get in-memory index of sfmr brief info
+        sfmr_info_index = sfmr_index.get_brief_info_index(
+            self.CONFIG, self.engine, self.session)
 
         # Traverse SFMR files
-        for sfmr_info in sfmr_info_query:
+        for sfmr_info in sfmr_info_index.query(self.period[0],
+                                               self.period[1]):
             tc_name = sfmr_info.hurr_name
-            sfmr_path = (f"""{self.CONFIG['sfmr']['dirs']['hurr']}"""
-                         f"""{sfmr_info.start_datetime.year}"""
-                         f"""/{tc_name}/{sfmr_info.filename}""")
+            sfmr_path = sfmr_cache.flight_path(self.CONFIG, sfmr_info)
 
             # SFMR track was closest to TC center
             # when SFMR SWS reached its peak
@@ -7,10 +7,10 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Column, Integer, Float, String, DateTime, Date
 from sqlalchemy import Table, Column, MetaData
 from sqlalchemy.orm import mapper
-from global_land_mask import globe
 
 import isd
 import era5
+import landmask
 import satel_scs
 import utils
 
@@ -20,6 +20,7 @@ class StatisticManager(object):
 
     def __init__(self, CONFIG, period, region, passwd, save_disk):
         self.CONFIG = CONFIG
+        self.land_mask = landmask.get_land_mask(CONFIG)
         self.period = period
         self.region = region
         self.db_root_passwd = passwd
@@ -44,6 +45,9 @@ class StatisticManager(object):
         # Load 4 variables above
         utils.load_grid_lonlat_xy(self)
 
+        # Each ISD csv is read once and looked up by TC datetime
+        self.isd_cache = isd.ISDWindCache(self.grid_lats, self.grid_lons)
+
         self.sources = ['era5', 'smap']
 
         # self.compare_with_isd()
@@ -85,7 +89,7 @@ class StatisticManager(object):
                 continue
             if tc.r34_ne is None:
                 continue
-            if bool(globe.is_land(tc.lat, tc.lon)):
+            if self.land_mask.is_land(tc.lat, tc.lon):
                 continue
             # Draw windspd from CCMP, ERA5, Interium
             # and several satellites
@@ -190,62 +194,36 @@ class StatisticManager(object):
 
         return row
 
-    def same_datetime_exists_in_col(self, col, strftime_format,
-                                    target_dt):
-        col = col.tolist()
-        target_dt_str = target_dt.strftime(strftime_format)
+    def get_comparsion_row(self, csv_path, ISDBasedComparsion, tc):
+        row = self.isd_cache.first_at(csv_path, tc.date_time)
 
-        try:
-            match_index = col.index(target_dt_str)
-        except ValueError as msg:
-            return False, None
+        if row is None:
+            return None
+        # Missing
+        if row['windspd_missing']:
+            return None
+        # Quality control of windspd
+        if row['windspd_quality_code'] != '1':
+            return None
 
-        return True, match_index
+        # Write ISD data into comparsion row
+        pt = ISDBasedComparsion()
 
-    def get_comparsion_row(self, csv_path, ISDBasedComparsion, tc):
-        # Open csv
-        try:
-            df = pd.read_csv(csv_path)
-        except Exception as msg:
-            breakpoint()
-            exit(msg)
+        pt.wind_type_code = row['wind_type_code']
+        pt.windspd_quality_code = row['windspd_quality_code']
 
-        found, match_index = self.same_datetime_exists_in_col(
-            df['DATE'], '%Y-%m-%dT%H:%M:%S', tc.date_time)
+        pt.station_id = row['station_id']
+        pt.date_time = tc.date_time
 
-        if not found:
-            return None
-        else:
-            i = match_index
-            # Write ISD data into comparsion row
-            pt = ISDBasedComparsion()
-
-            wind_parts = df['WND'][i].split(',')
-            # Missing
-            if int(wind_parts[3]) == 9999:
-                return None
-            pt.windspd = 0.1 * float(wind_parts[3])
-            pt.wind_type_code = wind_parts[2]
-            # Quality control of windspd
-            if int(wind_parts[4]) != 1:
-                return None
-            pt.windspd_quality_code = wind_parts[4]
-
-            pt.station_id = str(df['STATION'][i])
-            pt.date_time = tc.date_time
-
-            pt.lon = float(df['LONGITUDE'][i])
-            pt.lat = float(df['LATITUDE'][i])
-            pt.y, pt.x = \
-                    utils.get_latlon_index_of_closest_grib_point(
-                        pt.lat, pt.lon, self.grid_lats,
-                        self.grid_lons)
-            pt.elevation = float(df['ELEVATION'][i])
-            pt.windspd = utils.convert_10(pt.windspd, pt.elevation)
-
-            pt.station_id_datetime = (f"""{pt.station_id}"""
-                                      f"""_{pt.date_time}""")
-            return pt
+        pt.lon = float(row['lon'])
+        pt.lat = float(row['lat'])
+        pt.y, pt.x = int(row['y']), int(row['x'])
+        pt.elevation = float(row['elevation'])
+        pt.windspd = float(row['windspd_10'])
+
+        pt.station_id_datetime = (f"""{pt.station_id}"""
+                                  f"""_{pt.date_time}""")
+        return pt
 
     def visualization(self):
         table_name = self.CONFIG['statistic']['table_name']
@@ -14,6 +14,8 @@ from scipy import stats
 from sklearn.metrics import r2_score
 import numpy as np
 
+import dist2coast
+import grouped_statistic
 import utils
 
 Base = declarative_base()
@@ -114,20 +116,16 @@ class Statisticer(object):
                            if not y%4 else ''
                            for y in range(y_length)]
 
-            count_matrix = np.zeros(shape=(y_length, x_length))
-            mean_bias_matrix = np.zeros(shape=(y_length, x_length))
-            rmse_matrix = np.zeros(shape=(y_length, x_length))
-
-            for y in range(y_length):
-                for x in range(x_length):
-                    pixel_df = df.loc[(df['y'] == y_min + y)
-                                      & (df['x'] == x_min + x)]
-                    count_matrix[y][x] = len(pixel_df)
-                    mean_bias_matrix[y][x] = pixel_df[
-                        f'{src_2}_minus_{src_1}_windspd'].mean()
-                    rmse_matrix[y][x] = np.sqrt(
-                        mean_squared_error(pixel_df[f'{src_1}_windspd'],
-                                           pixel_df[f'{src_2}_windspd']))
+            indices, grid_shape, _ = grouped_statistic.grid_indices(
+                df['x'], df['y'])
+            pixel_statistic = grouped_statistic.grouped_statistic(
+                indices, df[f'{src_2}_minus_{src_1}_windspd'],
+                y_length * x_length)
+            count_matrix = pixel_statistic['Count'].reshape(
+                grid_shape).astype(float)
+            mean_bias_matrix = pixel_statistic['Mean bias'].reshape(
+                grid_shape)
+            rmse_matrix = pixel_statistic['RMSE'].reshape(grid_shape)
 
             fig, axes = plt.subplots(1, 3, figsize=(22, 4))
 
@@ -157,58 +155,21 @@ class Statisticer(object):
             breakpoint()
             sys.exit(msg)
 
-    def add_dist2coast(self):
-        lons = [round(x * 0.04 - 179.98, 2) for x in range(9000)]
-        lats = [round(y * 0.04 - 89.98, 2) for y in range(4500)]
+    def add_dist2coast(self, bias, distance_to_land_threshold):
+        """Add distance to coast of SFMR points to `bias` and drop
+        points farther than `distance_to_land_threshold` kilometers
+        from land.
 
-        dist2coast_table_name = 'dist2coast_na_sfmr'
-        Dist2Coast = utils.get_class_by_tablename(
-            self.engine, dist2coast_table_name)
-
-        validation_tablename = utils.gen_validation_tablename(
-            self, 'sfmr', 'smap_prediction')
-        Validation = utils.get_class_by_tablename(
-            self.engine, validation_tablename)
-
-        validation_query = self.session.query(Validation).filter(
-            Validation.sfmr_datetime > self.period[0],
-            Validation.sfmr_datetime < self.period[1]
-        )
-        validation_count = validation_query.count()
-
-        for validation_idx, validation_row in enumerate(validation_query):
-            print(f'\r{validation_idx+1}/{validation_count}', end='')
+        """
+        dist2coast_raster = dist2coast.get_dist2coast(self.CONFIG)
 
-        indices_to_drop = []
         for src in self.sources:
-            length = len(bias[src])
-
-            for i in range(length):
-                print(f'\r{i+1}/{length}', end='')
-
-                lookup_lon, lookup_lon_idx = \
-                    utils.get_nearest_element_and_index(
-                        lons, bias[src]['sfmr_lon'][i]-360)
-                lookup_lat, lookup_lat_idx = \
-                    utils.get_nearest_element_and_index(
-                        lats, bias[src]['sfmr_lat'][i])
-                dist_query = self.session.query(Dist2Coast).filter(
-                    Dist2Coast.lon > lookup_lon - 0.01,
-                    Dist2Coast.lon < lookup_lon + 0.01,
-                    Dist2Coast.lat > lookup_lat - 0.01,
-                    Dist2Coast.lat < lookup_lat + 0.01,
-                )
-                if dist_query.count() != 1:
-                    self.logger.error('Dist not found')
-                    breakpoint()
-                    exit(1)
-
-                if dist_query[0].dist2coast > distance_to_land_threshold:
-                    indices_to_drop.append(i)
-
-            utils.delete_last_lines()
-            print('Done')
+            bias[src]['dist2coast'] = dist2coast_raster.distance(
+                bias[src]['sfmr_lat'].values,
+                bias[src]['sfmr_lon'].values)
 
+            indices_to_drop = bias[src].index[
+                bias[src]['dist2coast'] > distance_to_land_threshold]
             bias[src].drop(indices_to_drop, inplace=True)
 
     def compare_two_sources(self):
@@ -493,6 +454,35 @@ class Statisticer(object):
             year_split = [earilest_year + x for x in range(years_num)]
             windspd_split = [15, 25, 35, 45]
 
+            if metric == 'rmse':
+                bias = (df['tgt_windspd'] - df['sfmr_windspd']).to_numpy()
+                statistic_name = 'RMSE'
+            elif metric == 'mae':
+                bias = df['windspd_bias'].to_numpy()
+                statistic_name = 'MAE'
+            elif metric == 'mean_bias':
+                bias = df['windspd_bias'].to_numpy()
+                statistic_name = 'Mean bias'
+            else:
+                self.logger.error('Invalid metric')
+                exit(1)
+
+            # Group pairs by wind speed range and year in one pass
+            windspd_idx = np.digitize(df['sfmr_windspd'].to_numpy(),
+                                      windspd_split + [999]) - 1
+            year_idx = (pd.to_datetime(df['sfmr_datetime']).dt.year
+                        .to_numpy() - earilest_year)
+            in_groups = ((windspd_idx >= 0)
+                         & (windspd_idx < len(windspd_split))
+                         & (year_idx >= 0) & (year_idx < years_num))
+            group_statistic = grouped_statistic.grouped_statistic(
+                (windspd_idx * years_num + year_idx)[in_groups],
+                bias[in_groups], len(windspd_split) * years_num)
+            counts = group_statistic['Count'].reshape(
+                len(windspd_split), years_num)
+            values = group_statistic[statistic_name].reshape(
+                len(windspd_split), years_num)
+
             csv_rows = []
             csv_index = []
 
@@ -502,50 +492,18 @@ class Statisticer(object):
                     right = windspd_split[y_i + 1]
                     interval_str = f'{left}-{right}'
                 else:
-                    right = 999
                     interval_str = f'>{left}'
 
                 csv_index.append(interval_str)
 
-                df_windspd = df.loc[
-                    (df['sfmr_windspd'] >= left)
-                    & (df['sfmr_windspd'] < right)]
-
                 one_csv_row = dict()
                 for x_i, x_v in enumerate(year_split):
-                    df_windspd_year = df_windspd.loc[
-                        (df_windspd['sfmr_datetime']
-                         >= f'{x_v}-01-01 00:00:00')
-                        & (df_windspd['sfmr_datetime']
-                           <= f'{x_v}-12-31 23:59:59')
-                    ]
-                    tmp_df = df_windspd_year
-                    windspd_bias = tmp_df['windspd_bias']
-
-                    one_csv_row[f'{x_v}_count'] = len(tmp_df)
-                    if not len(tmp_df):
+                    one_csv_row[f'{x_v}_count'] = int(counts[y_i][x_i])
+                    if not counts[y_i][x_i]:
                         one_csv_row[f'{x_v}_{metric}'] = None
-                        continue
-
-                    if metric == 'rmse':
-                        truth = tmp_df['sfmr_windspd']
-                        pred = tmp_df['tgt_windspd']
-                        mse = mean_squared_error(truth, pred)
-                        rmse = math.sqrt(mse)
-                        one_csv_row[f'{x_v}_rmse'] = rmse
-
-                    elif metric == 'mae':
-                        mae = windspd_bias.abs().mean()
-                        one_csv_row[f'{x_v}_mae'] = mae
-
-                    elif metric == 'mean_bias':
-                        mean_bias = windspd_bias.mean()
-                        one_csv_row[f'{x_v}_mean_bias'] = mean_bias
-
                     else:
-                        self.logger.error('Invalid metric')
-                        exit(1)
-
+                        one_csv_row[f'{x_v}_{metric}'] = float(
+                            values[y_i][x_i])
 
                 csv_rows.append(one_csv_row)
 
@@ -4,9 +4,10 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Integer, Float, String, DateTime, Boolean
 from sqlalchemy import Table, Column, MetaData
 from sqlalchemy.orm import mapper
-from geopy import distance
 import pandas as pd
 
+import geodesy
+import tc_track
 import utils
 
 Base = declarative_base()
@@ -172,15 +173,12 @@ class Statisticer(object):
         TCMovingSpeed = self.create_tc_moving_speed_table()
 
         table_rows = []
-        for idx, tc in enumerate(self.tc_query):
+        for idx, (tc, next_tc) in enumerate(
+                tc_track.iter_tc_pairs(self.tc_query)):
             print(f'\r{idx+1}/{self.tc_query_num}', end='')
             # find next TC
-            if idx < self.tc_query_num:
-                next_tc = self.tc_query[idx + 1]
-                if tc.sid != next_tc.sid:
-                    continue
-            else:
-                break
+            if next_tc is None:
+                continue
 
             duration, shift = self.cal_before_speed(tc, next_tc)
             speed = shift / (duration / 60)
@@ -218,11 +216,8 @@ class Statisticer(object):
         delta = next_tc.date_time - tc.date_time
         duration = delta.days * 1440 + delta.seconds // 60
 
-        start_pt = (tc.lat,
-                    utils.longitude_converter(tc.lon, '360', '-180'))
-        end_pt = (next_tc.lat,
-                  utils.longitude_converter(next_tc.lon, '360', '-180'))
-        shift = distance.distance(start_pt, end_pt).km
+        shift = geodesy.distance_km(tc.lat, tc.lon, next_tc.lat,
+                                    next_tc.lon)
 
         return duration, shift
 
@@ -3,6 +3,7 @@
 """
 import datetime
 import gzip
+import io
 import logging
 import math
 import pickle
@@ -310,12 +311,7 @@ class StdmetManager(object):
         except EOFError as msg:
             exit(msg + ': ' + data_path)
 
-        temp_filename = data_name[0:-3]
-        with open(temp_filename, 'wb') as txt:
-            txt.write(stdmet_text)
-
-        with open(temp_filename, 'rb') as txt:
-            first_line = txt.readline().decode('utf-8')
+        first_line = stdmet_text.split(b'\n', 1)[0].decode('utf-8')
 
         names = ['year', 'month', 'day', 'hour']
         formats = ['i4', 'i2', 'i2', 'i2']
@@ -336,88 +332,72 @@ class StdmetManager(object):
         # Specify data type of columns of unzipped gzip file
         data_type = {'names': tuple(names),
                      'formats': tuple(formats)}
-        data = np.genfromtxt(temp_filename, skip_header=1,
+        # Parse decompressed text in memory instead of writing it
+        # to a temporary file
+        data = np.genfromtxt(io.BytesIO(stdmet_text), skip_header=1,
                              invalid_raise=False, dtype=data_type)
-        os.remove(temp_filename)
-
-        # Store Continuous Wind Data in an entire year into a list
-        stdmet_1_year = []
+        if data.size < 4:
+            return None
 
         if data[3]['year'] < 100:
             year_base = 1900
         else:
             year_base = 0
 
-        for row in data:
-            # watch datatype of each column
-            # breakpoint()
+        # All rows are sorted in chronological order, so rows in
+        # period can be found with binary search
+        times = utils.ndbc_datetime64(data, year_base)
+        window = utils.sorted_period_slice(times, self.period)
+        data = data[window]
+        times = times[window]
+
+        valid = (data['wspd'] != 99.0) & (data['wdir'] != 999)
+        if not valid.any():
+            return None
+        data = data[valid]
+        times = times[valid]
+
+        # Query station information once for the whole file
+        anemometer_elev = self.session.query(StdmetStation).\
+                filter_by(id=data_name[:-12]).\
+                first().anemometer_elev
+        wspd_10 = utils.convert_10(data['wspd'], anemometer_elev)
+
+        # Missing value of optional columns
+        optional_missing = {'gst': 99.0, 'wvht': 99.0, 'dpd': 99.0,
+                            'apd': 99.0, 'mwd': 999, 'pres': 9999.0,
+                            'atmp': 999.0, 'wtmp': 999.0,
+                            'dewp': 999.0, 'vis': 99.0}
+        # Since field PTDY is not found in sample stdmet files,
+        # PTDY will not be read for now
+        if 'TIDE' in first_line:
+            optional_missing['tide'] = 99.0
+        optional_missed = dict()
+        for col, missing in optional_missing.items():
+            optional_missed[col] = data[col] == missing
+
+        # Store Continuous Wind Data in an entire year into a list
+        stdmet_1_year = []
+
+        for idx, dt in enumerate(times.astype(datetime.datetime)):
             # Every row of data is the record of 10 minutes
             stdmet_1_hour = DataOfStation()
-            row['year'] = year_base + row['year']
-            if 'minute' in data_type['names']:
-                minute = int(row['minute'])
-            else:
-                minute = 0
-            stdmet_1_hour.datetime = datetime.datetime(
-                int(row['year']), int(row['month']), int(row['day']),
-                int(row['hour']), minute, 0)
-            # When row's datetime is after period, skip all rows
-            # left, because all rows are sorted in chronological
-            # order
-            if stdmet_1_hour.datetime > self.period[1]:
-                break
-            elif (stdmet_1_hour.datetime < self.period[0]
-                  or stdmet_1_hour.datetime is None):
-                continue
-            anemometer_elev = self.session.query(StdmetStation).\
-                    filter_by(id=data_name[:-12]).\
-                    first().anemometer_elev
-            if row['wspd'] == 99.0:
-                continue
-            else:
-                stdmet_1_hour.wspd = float(row['wspd'])
-            if stdmet_1_hour.wspd is None:
-                continue
-            stdmet_1_hour.wspd_10 = utils.convert_10(float(row['wspd']),
-                                                     anemometer_elev)
-            if row['wdir'] == 999:
-                continue
-            else:
-                stdmet_1_hour.wdir = float(row['wdir'])
-            if stdmet_1_hour.wdir is None:
-                continue
-            stdmet_1_hour.gst = (None if row['gst'] == 99.0 \
-                                 else float(row['gst']))
-            stdmet_1_hour.wvht = (None if row['wvht'] == 99.0 \
-                                 else float(row['wvht']))
-            stdmet_1_hour.dpd = (None if row['dpd'] == 99.0 \
-                                 else float(row['dpd']))
-            stdmet_1_hour.apd = (None if row['apd'] == 99.0 \
-                                 else float(row['apd']))
-            stdmet_1_hour.mwd= (None if row['mwd'] == 999 \
-                                 else int(row['mwd']))
-            stdmet_1_hour.pres = (None if row['pres'] == 9999.0 \
-                                 else float(row['pres']))
-            stdmet_1_hour.atmp = (None if row['atmp'] == 999.0 \
-                                 else float(row['atmp']))
-            stdmet_1_hour.wtmp = (None if row['wtmp'] == 999.0 \
-                                 else float(row['wtmp']))
-            stdmet_1_hour.dewp = (None if row['dewp'] == 999.0 \
-                                 else float(row['dewp']))
-            stdmet_1_hour.vis = (None if row['vis'] == 99.0 \
-                                 else float(row['vis']))
-            # Since field PTDY is not found in sample stdmet files,
-            # PTDY will not be read for now
-            if 'TIDE' in first_line:
-                stdmet_1_hour.tide = (None if row['tide'] == 99.0 \
-                                     else float(row['tide']))
+            stdmet_1_hour.date_time = dt
+            stdmet_1_hour.wspd = float(data['wspd'][idx])
+            stdmet_1_hour.wspd_10 = float(wspd_10[idx])
+            stdmet_1_hour.wdir = float(data['wdir'][idx])
+            for col in optional_missing.keys():
+                if optional_missed[col][idx]:
+                    val = None
+                elif col == 'mwd':
+                    val = int(data[col][idx])
+                else:
+                    val = float(data[col][idx])
+                setattr(stdmet_1_hour, col, val)
 
             stdmet_1_year.append(stdmet_1_hour)
 
-        if len(stdmet_1_year):
-            return stdmet_1_year
-        else:
-            return None
+        return stdmet_1_year
 
     def _extract_station_info(self, station_info_path):
         station = StdmetStation()
@@ -0,0 +1,207 @@
+"""Walk IBTrACS records of TCs and interpolate their tracks hourly.
+
+Loops over IBTrACS used to fetch the next record with
+``tc_query[idx + 1]``, which issues a 'LIMIT 1 OFFSET idx + 1' query for
+every record, and count the query beforehand.  iter_tc_pairs runs the
+query once, ordered by sid and datetime, and yields every record with
+the next record of the same TC.
+
+Hourly positions of TC used to be interpolated by utils.interp_tc hour
+by hour, which reflected IBTrACS table and built a new mapped object on
+every call.  interp_track interpolates all hours of TCs in one call into
+a structured array, and hourly_tcs turns it into HourlyTC, a light
+immutable record which is never added to a session.
+
+"""
+import numpy as np
+
+
+def iter_tc_pairs(tc_query):
+    """Yield every IBTrACS record with the next record of the same TC.
+
+    Parameters
+    ----------
+    tc_query : sqlalchemy.orm.Query
+        Query of IBTrACS table.  Its order is replaced by sid and
+        datetime.
+
+    Yields
+    ------
+    tc : object describing a row of IBTrACS table
+        An IBTrACS record.
+    next_tc : object describing a row of IBTrACS table or None
+        The next record of the same TC, or None when `tc` is the last
+        record of TC in query.
+
+    """
+    IBTrACS = tc_query.column_descriptions[0]['entity']
+    tcs = tc_query.order_by(None).order_by(IBTrACS.sid,
+                                           IBTrACS.date_time).all()
+
+    for idx, tc in enumerate(tcs):
+        next_tc = None
+        if idx < len(tcs) - 1 and tcs[idx + 1].sid == tc.sid:
+            next_tc = tcs[idx + 1]
+
+        yield tc, next_tc
+
+
+def hourly_positions(tc, next_tc):
+    """Get datetime, longitude and latitude of TC on every hour from
+    `tc` to `next_tc`, excluding `next_tc`, like utils.interp_tc.
+
+    Returns
+    -------
+    date_times : list of datetime.datetime
+    lons, lats : numpy.ndarray
+
+    """
+    track = interp_track([tc, next_tc], include_last=False)
+
+    return (track['date_time'].tolist(), track['lon'].copy(),
+            track['lat'].copy())
+
+
+class HourlyTC(object):
+    """Interpolated position of TC on an hour.
+
+    Only `sid`, `name`, `date_time`, `lon` and `lat` are interpolated.
+    Other columns of IBTrACS table are None, like those of the mapped
+    object which utils.interp_tc used to return.  Instances cannot be
+    modified.
+
+    """
+    __slots__ = ('sid', 'name', 'date_time', 'lon', 'lat')
+
+    key = basin = pres = wind = sid_date_time = None
+    r34_ne = r34_se = r34_sw = r34_nw = None
+    r50_ne = r50_se = r50_sw = r50_nw = None
+    r64_ne = r64_se = r64_sw = r64_nw = None
+
+    def __init__(self, sid, name, date_time, lon, lat):
+        for attr, value in zip(self.__slots__,
+                               (sid, name, date_time, lon, lat)):
+            object.__setattr__(self, attr, value)
+
+    def __setattr__(self, attr, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, attr):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __eq__(self, other):
+        if not isinstance(other, HourlyTC):
+            return NotImplemented
+        return all(getattr(self, attr) == getattr(other, attr)
+                   for attr in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, attr) for attr in self.__slots__))
+
+    def __repr__(self):
+        return (f"""HourlyTC(sid={self.sid!r}, name={self.name!r}, """
+                f"""date_time={self.date_time!r}, lon={self.lon!r}, """
+                f"""lat={self.lat!r})""")
+
+
+TRACK_DTYPE = np.dtype([('sid', object), ('name', object),
+                        ('date_time', 'datetime64[us]'),
+                        ('lon', np.float64), ('lat', np.float64)])
+
+
+def interp_track(tcs, include_last=True):
+    """Interpolate hourly positions of TCs.
+
+    Every record is interpolated towards the next record of the same TC
+    on hours from it, excluding the next record.  Like utils.interp_tc,
+    the number of hours counts only the part of interval shorter than
+    one day, and longitude does not jump when the track crosses the
+    prime meridian, so that it can be out of [-180, 360).
+
+    Parameters
+    ----------
+    tcs : iterable of object describing a row of IBTrACS table
+        IBTrACS records sorted by sid and datetime, e.g. all records of
+        a TC.
+    include_last : bool, default True
+        Whether to include records which have no next record of the same
+        TC, e.g. the last record of TC.
+
+    Returns
+    -------
+    track : numpy.ndarray
+        Structured array of TRACK_DTYPE with one element per hour.
+
+    """
+    tcs = list(tcs)
+    if not tcs:
+        return np.empty(0, dtype=TRACK_DTYPE)
+
+    sids = np.array([tc.sid for tc in tcs], dtype=object)
+    names = np.array([tc.name for tc in tcs], dtype=object)
+    date_times = np.array([tc.date_time for tc in tcs],
+                          dtype='datetime64[us]')
+    lons = np.array([tc.lon for tc in tcs], dtype=np.float64)
+    lats = np.array([tc.lat for tc in tcs], dtype=np.float64)
+
+    has_next = np.zeros(len(tcs), dtype=bool)
+    has_next[:-1] = sids[:-1] == sids[1:]
+
+    hours = np.zeros(len(tcs), dtype=int)
+    # Seconds of interval shorter than one day, like
+    # `datetime.timedelta.seconds`
+    seconds = (np.diff(date_times) % np.timedelta64(1, 'D')
+               // np.timedelta64(1, 's'))
+    hours[:-1] = seconds // 3600
+    hours[~has_next] = 1 if include_last else 0
+
+    # Same as utils.get_center_shift_of_two_tcs
+    centers = np.where(lons < 0, lons + 360, lons)
+    lon_shift = np.zeros(len(tcs))
+    lat_shift = np.zeros(len(tcs))
+    starts, ends = centers[:-1].copy(), centers[1:].copy()
+    across = np.abs(starts - ends) > 20
+    # E.g. `tc` lon: 0.5, `next_tc` lon: 359.5, or the opposite
+    starts_shifted = across & (starts < ends)
+    ends_shifted = across & (starts > ends)
+    starts[starts_shifted] += 360
+    ends[ends_shifted] += 360
+    lon_shift[:-1] = ends - starts
+    lat_shift[:-1] = lats[1:] - lats[:-1]
+    lon_shift[~has_next] = 0
+    lat_shift[~has_next] = 0
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hourly_lon_shift = lon_shift / hours
+        hourly_lat_shift = lat_shift / hours
+
+    records = np.repeat(np.arange(len(tcs)), hours)
+    h = (np.arange(len(records))
+         - np.repeat(np.cumsum(hours) - hours, hours))
+
+    track = np.empty(len(records), dtype=TRACK_DTYPE)
+    track['sid'] = sids[records]
+    track['name'] = names[records]
+    track['date_time'] = (date_times[records]
+                          + h * np.timedelta64(1, 'h'))
+    track['lon'] = h * hourly_lon_shift[records] + lons[records]
+    track['lat'] = h * hourly_lat_shift[records] + lats[records]
+
+    return track
+
+
+def hourly_tcs(tc, next_tc):
+    """Get HourlyTC on every hour from `tc` to `next_tc`, excluding
+    `next_tc`.  Its element `h` equals to
+    ``utils.interp_tc(the_class, h, tc, next_tc)``.
+
+    """
+    return track_to_hourly_tcs(interp_track([tc, next_tc],
+                                            include_last=False))
+
+
+def track_to_hourly_tcs(track):
+    """Convert structured array of interp_track to list of HourlyTC.
+
+    """
+    return [HourlyTC(*fields) for fields in track.tolist()]
@@ -0,0 +1,77 @@
+# !/usr/bin/env python
+"""Check that cached basemap of a region can be drawn again on other
+axes, both in another figure and in another subplot of same figure.
+
+"""
+import os
+import tempfile
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import load_configs
+import render
+import utils
+
+
+class Plotter(object):
+    def __init__(self, CONFIG):
+        self.CONFIG = CONFIG
+        self.zorders = CONFIG['plot']['zorders']['compare']
+
+
+def check_clipped_to_own_axes(ax):
+    for artist in ax.collections + ax.patches:
+        clip = artist.get_clip_path()
+        if clip is None or not hasattr(clip, '_patch'):
+            continue
+        assert clip._patch.figure is ax.figure, \
+                'Drawing is clipped to patch of another figure'
+        assert clip._patch is ax.patch, \
+                'Drawing is clipped to patch of another axes'
+
+
+def draw_same_region_twice(fig, plotter, region):
+    axes = fig.subplots(1, 2)
+    for ax in axes:
+        map = utils.draw_SCS_basemap(plotter, ax, True, region)
+        assert map is render.get_basemap(region[2], region[3], region[0],
+                                         region[1], resolution='h')
+        check_clipped_to_own_axes(ax)
+
+    lat1, lat2, lon1, lon2 = region
+    for ax in axes:
+        utils.draw_compare_basemap(ax, lon1, lon2, lat1, lat2,
+                                   plotter.zorders, plotter.CONFIG)
+        check_clipped_to_own_axes(ax)
+
+
+def main():
+    CONFIG = load_configs.load_config()
+    plotter = Plotter(CONFIG)
+    # South, North, West, East
+    region = [15, 25, 110, 120]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Two figures of same region in one process, which share basemap
+        renderer = render.FigureRenderer(workers=0, dpi=50)
+        for i in range(2):
+            renderer.submit(draw_same_region_twice,
+                            os.path.join(tmp_dir, f'region_{i}.png'),
+                            args=(plotter, region), figsize=(10, 5))
+        paths = renderer.wait()
+
+        for path in paths:
+            assert os.path.getsize(path) > 0, f'Empty figure {path}'
+
+        # Figure drawn directly, after figures of renderer
+        fig = Figure(figsize=(10, 5))
+        FigureCanvasAgg(fig)
+        draw_same_region_twice(fig, plotter, region)
+        fig.savefig(os.path.join(tmp_dir, 'region_direct.png'), dpi=50)
+
+    print('Done')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+# !/usr/bin/env python
+"""Check that convert_10, compose_wind and decompose_wind of utils give
+same results as their scalar formulas for scalar, numpy.ndarray and
+pandas.Series inputs.
+
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+import utils
+
+
+def convert_10_scalar(wspd, height):
+    if wspd <= 7:
+        z0 = 0.0023
+    else:
+        z0 = 0.022
+    kz = math.log(10/z0) / math.log(height/z0)
+
+    return wspd * kz
+
+
+def decompose_wind_scalar(windspd, winddir, input_convention):
+    if input_convention == 'o':
+        u_wind = windspd * math.sin(math.radians(winddir))
+        v_wind = windspd * math.cos(math.radians(winddir))
+    elif input_convention == 'm':
+        u_wind = -windspd * math.sin(math.radians(winddir))
+        v_wind = -windspd * math.cos(math.radians(winddir))
+
+    return u_wind, v_wind
+
+
+def compose_wind_scalar(u_wind, v_wind, output_convention):
+    windspd = math.sqrt(u_wind ** 2 + v_wind ** 2)
+
+    if output_convention == 'o':
+        winddir = math.degrees(math.atan2(u_wind, v_wind))
+    elif output_convention == 'm':
+        winddir = math.degrees(math.atan2(-u_wind, -v_wind))
+
+    winddir = (winddir + 360) % 360
+
+    return windspd, winddir
+
+
+def check_same(name, result, expected, like):
+    """Check type of `result` by type of input `like` and its values
+    against list of scalar results `expected`.
+
+    """
+    if np.ndim(like) == 0:
+        assert isinstance(result, float), \
+                f'{name}: scalar input gives {type(result)}'
+    elif isinstance(like, pd.Series):
+        assert isinstance(result, pd.Series), \
+                f'{name}: Series input gives {type(result)}'
+        assert result.index.equals(like.index), \
+                f'{name}: index of Series is not kept'
+    else:
+        assert isinstance(result, np.ndarray), \
+                f'{name}: ndarray input gives {type(result)}'
+
+    assert np.allclose(np.atleast_1d(np.asarray(result, dtype=float)),
+                       expected, rtol=1e-12, atol=1e-12), \
+            f'{name}: {result} differs from {expected}'
+
+
+def as_inputs(values, index):
+    """Inputs of scalar, numpy.ndarray and pandas.Series forms.
+
+    """
+    return [
+        float(values[0]),
+        values,
+        pd.Series(values, index=index),
+    ]
+
+
+def main():
+    rng = np.random.RandomState(0)
+    num = 50
+    # Index is not default, so that keeping of index is checked
+    index = np.arange(num)[::-1] + 100
+
+    windspd = rng.uniform(0, 30, num)
+    # Wind speed of 7 exactly switches roughness of convert_10
+    windspd[:2] = [7, 7.0001]
+    height = rng.uniform(1, 100, num)
+    winddir = rng.uniform(0, 360, num)
+    winddir[:4] = [0, 90, 180, 270]
+    u_wind = rng.uniform(-30, 30, num)
+    v_wind = rng.uniform(-30, 30, num)
+    u_wind[:3] = [0, 5, -5]
+    v_wind[:3] = [5, 0, 0]
+
+    for spd, hgt in zip(as_inputs(windspd, index),
+                        as_inputs(height, index)):
+        n = np.size(spd)
+        expected = [convert_10_scalar(windspd[i], height[i])
+                    for i in range(n)]
+        check_same('convert_10', utils.convert_10(spd, hgt), expected,
+                   spd)
+
+    for convention in ['o', 'm']:
+        for spd, dir in zip(as_inputs(windspd, index),
+                            as_inputs(winddir, index)):
+            n = np.size(spd)
+            expected = [decompose_wind_scalar(windspd[i], winddir[i],
+                                              convention)
+                        for i in range(n)]
+            u, v = utils.decompose_wind(spd, dir, convention)
+            check_same(f'decompose_wind {convention} u', u,
+                       [e[0] for e in expected], spd)
+            check_same(f'decompose_wind {convention} v', v,
+                       [e[1] for e in expected], spd)
+
+        for u, v in zip(as_inputs(u_wind, index),
+                        as_inputs(v_wind, index)):
+            n = np.size(u)
+            expected = [compose_wind_scalar(u_wind[i], v_wind[i],
+                                            convention)
+                        for i in range(n)]
+            spd, dir = utils.compose_wind(u, v, convention)
+            check_same(f'compose_wind {convention} windspd', spd,
+                       [e[0] for e in expected], u)
+            check_same(f'compose_wind {convention} winddir', dir,
+                       [e[1] for e in expected], u)
+
+    assert utils.decompose_wind(None, 90, 'o') == (None, None)
+
+    print('Done')
+
+
+if __name__ == '__main__':
+    main()
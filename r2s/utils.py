@@ -21,15 +21,14 @@ from sqlalchemy import Integer, Float, String, DateTime, Boolean
 from sqlalchemy import Table, Column, MetaData
 from sqlalchemy.orm import mapper
 from sqlalchemy import tuple_
-from mpl_toolkits.basemap import Basemap
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 import matplotlib.pyplot as plt
 from matplotlib import patches as mpatches
 import pygrib
-from global_land_mask import globe
 from scipy import interpolate
+from scipy import ndimage
+from scipy.spatial import cKDTree
 import pandas as pd
-from geopy import distance
 import seaborn as sns
 import smogn
 from sklearn.model_selection import train_test_split
@@ -50,6 +49,15 @@ from quikscat_daily_v4 import QuikScatDaily
 from windsat_daily_v7 import WindSatDaily
 import era5
 import compare_tc
+import dist2coast
+import geodesy
+import grid
+import grouped_statistic
+import landmask
+import render
+import sfmr_cache
+import sfmr_index
+import tc_track
 
 # Global variables
 logger = logging.getLogger(__name__)
@@ -729,6 +737,25 @@ def convert_dtype(nparray):
         return bool(nparray)
 
 
+def rows_attr_array(rows, attr):
+    """Gather attribute of rows into float array, where None is
+    replaced with NaN.
+
+    """
+    return np.array([np.nan if getattr(row, attr) is None
+                     else getattr(row, attr) for row in rows],
+                    dtype=float)
+
+
+def set_rows_attr_array(rows, attr, values):
+    """Scatter float array into attribute of rows, where NaN is
+    replaced with None.
+
+    """
+    for row, value in zip(rows, np.asarray(values, dtype=float).tolist()):
+        setattr(row, attr, None if math.isnan(value) else value)
+
+
 def create_table_from_netcdf(engine, nc_file, table_name, session,
                              skip_vars=None, notnull_vars=None,
                              unique_vars=None, custom_cols=None):
@@ -1398,15 +1425,16 @@ def convert_10(wspd, height):
 
     Parameters
     ----------
-    wspd : float
+    wspd : float, numpy.ndarray or pandas.Series
         Wind speed at the height of anemometer.
-    height : float
+    height : float, numpy.ndarray or pandas.Series
         The height of anemometer.
 
     Returns
     -------
-    con_wspd : float
-        Wind speed at the height of 10 meters.
+    con_wspd : float, numpy.ndarray or pandas.Series
+        Wind speed at the height of 10 meters.  A float is returned
+        when both inputs are scalars.
 
     References
     ----------
@@ -1415,14 +1443,56 @@ def convert_10(wspd, height):
     Meteorological Science 25 (2014), no. 4, 445–453.
 
     """
-    if wspd <= 7:
-        z0 = 0.0023
-    else:
-        z0 = 0.022
-    kz = math.log(10/z0) / math.log(height/z0)
-    con_wspd = wspd * kz
+    wspd_arr = np.asarray(wspd, dtype=float)
+    z0 = np.where(wspd_arr <= 7, 0.0023, 0.022)
+    kz = np.log(10 / z0) / np.log(np.asarray(height, dtype=float) / z0)
+    con_wspd = wspd_arr * kz
+
+    return _wind_result(con_wspd, wspd)
+
+
+def ndbc_datetime64(data, year_base=0):
+    """Build the minute-resolution datetime64 array of the rows of a
+    NDBC record array.
+
+    Parameters
+    ----------
+    data : numpy.ndarray
+        Structured array read from NDBC text file, which has fields
+        'year', 'month', 'day', 'hour' and optional 'minute'.
+    year_base : int
+        Added to 'year' field when the file uses two-digit years.
+
+    Returns
+    -------
+    times : numpy.ndarray
+        Array of numpy.datetime64 with unit of minute.
+
+    """
+    years = data['year'].astype('i8') + year_base
+    times = ((years - 1970).astype('datetime64[Y]')
+             + (data['month'].astype('i8') - 1).astype('timedelta64[M]'))
+    times = (times.astype('datetime64[D]')
+             + (data['day'].astype('i8') - 1).astype('timedelta64[D]'))
+    times = (times.astype('datetime64[m]')
+             + data['hour'].astype('i8').astype('timedelta64[h]'))
+    if 'minute' in data.dtype.names:
+        times += data['minute'].astype('i8').astype('timedelta64[m]')
+
+    return times
 
-    return con_wspd
+
+def sorted_period_slice(times, period):
+    """Get the slice of chronologically sorted times which falls into
+    period with binary search.
+
+    """
+    start = np.datetime64(period[0])
+    end = np.datetime64(period[1])
+    left = np.searchsorted(times, start, side='left')
+    right = np.searchsorted(times, end, side='right')
+
+    return slice(left, right)
 
 
 def get_subset_range_of_grib_point(lat, lon, lat_grid_points,
@@ -1489,6 +1559,40 @@ def get_subset_range_of_grib(lat, lon, lat_grid_points,
     return True, lat1, lat2, lon1, lon2
 
 
+def crop_grib_field(field, lat1, lat2, lon1, lon2):
+    """Crop decoded global field of grib message like
+    pygrib.gribmessage.data(lat1, lat2, lon1, lon2).
+
+    Parameters
+    ----------
+    field : tuple
+        (values, lats, lons) where values is 2-D array of message and
+        lats and lons are its 1-D axes.
+    lat1, lat2, lon1, lon2 : float
+        Inclusive bounds of region, which must not cross the prime
+        meridian.
+
+    Returns
+    -------
+    data, lats, lons : numpy.ndarray
+        2-D arrays of cropped region, arranged as in message.
+
+    """
+    values, lat_axis, lon_axis = field
+    eps = 1e-6
+
+    lat_indices = np.where((lat_axis >= lat1 - eps)
+                           & (lat_axis <= lat2 + eps))[0]
+    lon_indices = np.where((lon_axis >= lon1 - eps)
+                           & (lon_axis <= lon2 + eps))[0]
+
+    data = values[np.ix_(lat_indices, lon_indices)]
+    lons, lats = np.meshgrid(lon_axis[lon_indices],
+                             lat_axis[lat_indices])
+
+    return data, lats, lons
+
+
 def area_of_contour(vs):
     """Use Green's theorem to compute the area enclosed by the given
     contour.
@@ -1526,20 +1630,24 @@ def hour_rounder(t):
             + datetime.timedelta(hours=t.minute//30))
 
 
-def draw_compare_basemap(ax, lon1, lon2, lat1, lat2, zorders):
-    map = Basemap(llcrnrlon=lon1, llcrnrlat=lat1, urcrnrlon=lon2,
-                  urcrnrlat=lat2, ax=ax)
+def draw_compare_basemap(ax, lon1, lon2, lat1, lat2, zorders,
+                         CONFIG=None):
+    # Basemap of region is cached, so it is not bound to `ax`
+    map = render.get_basemap(lon1, lon2, lat1, lat2,
+                             max_basemaps=render.get_max_basemaps(CONFIG))
     map.drawcoastlines(linewidth=3.0,
-                       zorder=zorders['coastlines'])
-    map.drawmapboundary(zorder=zorders['mapboundary'])
+                       zorder=zorders['coastlines'], ax=ax)
+    map.drawmapboundary(zorder=zorders['mapboundary'], ax=ax)
     # draw parallels and meridians.
     # label parallels on right and top
     # meridians on bottom and left
     parallels = np.arange(int(lat1), int(lat2), 2.)
     # labels = [left,right,top,bottom]
-    map.drawparallels(parallels, labels=[False, True, True, False])
+    map.drawparallels(parallels, labels=[False, True, True, False],
+                      ax=ax)
     meridians = np.arange(int(lon1), int(lon2), 2.)
-    map.drawmeridians(meridians, labels=[True, False, False, True])
+    map.drawmeridians(meridians, labels=[True, False, False, True],
+                      ax=ax)
 
 
 def set_basemap_title(ax, tc_row, data_name):
@@ -1770,51 +1878,62 @@ def get_basic_sfmr_era5_columns(tc_info=False):
     return cols
 
 
-class GetChildDataIndices(object):
-
-    def __init__(self, grid_pts, lats, lons, owi_az_size):
-        self.grid_pts = grid_pts
-        self.lats = lats
-        self.lons = lons
-        self.owi_az_size = owi_az_size
+def bin_swath_to_grid(lons, lats, vars, valid, grid_lons, grid_lats,
+                      spa_resolu):
+    """Average swath pixels into cells of regular grid in one pass.
 
+    Every valid pixel is assigned to the cell of its nearest grid
+    point by index arithmetic, then per-cell sums are reduced with
+    numpy.bincount.
 
-def get_data_indices_around_grid_pts(workload):
-    grid_pts = workload.grid_pts
-    lats = workload.lats
-    lons = workload.lons
-    owi_az_size = workload.owi_az_size
-
-    total = len(grid_pts) * owi_az_size
-    count = 0
-    pt_region_data_indices = []
+    Parameters
+    ----------
+    lons, lats : numpy.ndarray
+        Longitudes and latitudes of swath pixels.
+    vars : dict
+        Key is variable name and value is numpy.ndarray with same
+        shape as lons.
+    valid : numpy.ndarray
+        Boolean array with same shape as lons.  Only pixels where it
+        is True are aggregated.
+    grid_lons, grid_lats : list of float
+        Ascending longitudes and latitudes of regular grid.
+    spa_resolu : float
+        Spatial resolution of grid.
 
-    for pt_idx, pt in enumerate(grid_pts):
-        pt_region_data_indices.append(list())
+    Returns
+    -------
+    count : numpy.ndarray
+        Number of pixels in each cell, with shape of
+        (len(grid_lats), len(grid_lons)).
+    means : dict
+        Key is variable name and value is numpy.ndarray of per-cell
+        mean with same shape as count.  Cells without pixel are NaN.
 
-        for i in range(owi_az_size):
-            count += 1
-            percent = float(count) / total * 100
-            print((f"""\rTask ({os.getpid()} """
-                   f"""is getting data indices around ocean """
-                   f"""grid points {percent:.2f}%"""),
-                  end='')
+    """
+    x_num, y_num = len(grid_lons), len(grid_lats)
 
-            lat_row, lon_row = lats[i], lons[i]
-            lat_match_indices = [i for i, v in enumerate(
-                abs(lat_row - pt.lat) < 0.025) if v]
-            lon_match_indices = [i for i, v in enumerate(
-                abs(lon_row - pt.lon) < 0.025) if v]
+    lons = np.ma.filled(np.ma.asarray(lons, dtype=float), np.nan)
+    lats = np.ma.filled(np.ma.asarray(lats, dtype=float), np.nan)
+    valid = np.ma.filled(valid, False) & np.isfinite(lons) & np.isfinite(
+        lats)
 
-            match_indices = np.intersect1d(lat_match_indices,
-                                           lon_match_indices)
-            for j in match_indices:
-                pt_region_data_indices[pt_idx].append((i, j))
+    x = np.rint((lons[valid] - grid_lons[0]) / spa_resolu).astype(int)
+    y = np.rint((lats[valid] - grid_lats[0]) / spa_resolu).astype(int)
+    inside = (x >= 0) & (x < x_num) & (y >= 0) & (y < y_num)
+    flat_idx = y[inside] * x_num + x[inside]
 
-    delete_last_lines()
-    print('Done')
+    count = np.bincount(flat_idx, minlength=x_num * y_num)
+    means = dict()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for name, var in vars.items():
+            values = np.ma.filled(np.ma.asarray(var, dtype=float),
+                                  np.nan)[valid][inside]
+            total = np.bincount(flat_idx, weights=values,
+                                minlength=x_num * y_num)
+            means[name] = (total / count).reshape(y_num, x_num)
 
-    return pt_region_data_indices
+    return count.reshape(y_num, x_num), means
 
 
 def gen_satel_era5_tablename(satel_name, dt):
@@ -1848,17 +1967,36 @@ def forwardtime_to_next_entire_hour(dt):
 
 
 def load_grid_lonlat_xy(the_class):
-    grid_pickles = the_class.CONFIG['grid']['pickle']
+    """Set grid_lons, grid_lats, grid_x and grid_y of the_class to
+    tuples of grid shared by the whole process.
+
+    """
+    shared_grid = grid.get_shared_grid(the_class.CONFIG)
+
+    for key in ['lons', 'lats', 'x', 'y']:
+        setattr(the_class, f'grid_{key}',
+                getattr(shared_grid, f'{key}_list'))
+
+
+def _wind_array(values):
+    """Convert scalar, list, numpy.ndarray, masked array or
+    pandas.Series into float array, where masked elements are NaN.
+
+    """
+    return np.ma.filled(np.ma.asarray(values, dtype=float), np.nan)
+
 
-    for key in grid_pickles.keys():
-        # if (hasattr(the_class, f'grid_{key}')
-        #     and getattr(the_class, f'gird_{key}') is not None):
-        #     continue
+def _wind_result(values, like):
+    """Return float when result is scalar, pandas.Series when input
+    is pandas.Series and numpy.ndarray otherwise.
 
-        with open(grid_pickles[key], 'rb') as f:
-            var = pickle.load(f)
+    """
+    if np.ndim(values) == 0:
+        return float(values)
+    if isinstance(like, pd.Series):
+        return pd.Series(values, index=like.index)
 
-        setattr(the_class, f'grid_{key}', var)
+    return values
 
 
 def decompose_wind(windspd, winddir, input_convention):
@@ -1866,9 +2004,9 @@ def decompose_wind(windspd, winddir, input_convention):
 
     Parameters
     ----------
-    windspd: float
+    windspd: float, numpy.ndarray or pandas.Series
         Wind speed.
-    winddir: float
+    winddir: float, numpy.ndarray or pandas.Series
         Wind direction in degree.  It increases clockwise from North
         when viewed from above.
     input_convention: str
@@ -1878,25 +2016,32 @@ def decompose_wind(windspd, winddir, input_convention):
 
     Returns
     -------
-    u_wind: float
-        U component of wind.  None if input is invalid.
-    v_wind: float
-        V component of wind.  None if input is invalid.
+    u_wind: float, numpy.ndarray or pandas.Series
+        U component of wind.  None if input is None and NaN where
+        array input is NaN or masked.
+    v_wind: float, numpy.ndarray or pandas.Series
+        V component of wind.  None if input is None and NaN where
+        array input is NaN or masked.
 
     """
     if windspd is None or winddir is None:
         return None, None
 
+    spd = _wind_array(windspd)
+    rad = np.radians(_wind_array(winddir))
+
     # Oceanographic convention
     if input_convention == 'o':
-        u_wind = windspd * math.sin(math.radians(winddir))
-        v_wind = windspd * math.cos(math.radians(winddir))
+        u_wind = spd * np.sin(rad)
+        v_wind = spd * np.cos(rad)
     # Meteorological convention
     elif input_convention == 'm':
-        u_wind = -windspd * math.sin(math.radians(winddir))
-        v_wind = -windspd * math.cos(math.radians(winddir))
+        u_wind = -spd * np.sin(rad)
+        v_wind = -spd * np.cos(rad)
+
+    like = windspd if isinstance(windspd, pd.Series) else winddir
 
-    return u_wind, v_wind
+    return _wind_result(u_wind, like), _wind_result(v_wind, like)
 
 
 def compose_wind(u_wind, v_wind, output_convention):
@@ -1904,9 +2049,9 @@ def compose_wind(u_wind, v_wind, output_convention):
 
     Parameters
     ----------
-    u_wind: float
+    u_wind: float, numpy.ndarray or pandas.Series
         U component of wind.
-    v_wind: float
+    v_wind: float, numpy.ndarray or pandas.Series
         V component of wind.
     output_convention: str
         Convention of output wind direction.  'o' means oceanographic
@@ -1914,25 +2059,29 @@ def compose_wind(u_wind, v_wind, output_convention):
 
     Returns
     -------
-    windspd: float
+    windspd: float, numpy.ndarray or pandas.Series
         Wind speed.
-    winddir: float
+    winddir: float, numpy.ndarray or pandas.Series
         Wind direction in degree.  It increases clockwise from North
         when viewed from above.
 
     """
-    windspd = math.sqrt(u_wind ** 2 + v_wind ** 2)
+    u = _wind_array(u_wind)
+    v = _wind_array(v_wind)
+    windspd = np.sqrt(u ** 2 + v ** 2)
 
     # Oceanographic convention
     if output_convention == 'o':
-        winddir = math.degrees(math.atan2(u_wind, v_wind))
+        winddir = np.degrees(np.arctan2(u, v))
     # Meteorological convention
     elif output_convention == 'm':
-        winddir = math.degrees(math.atan2(-u_wind, -v_wind))
+        winddir = np.degrees(np.arctan2(-u, -v))
 
     winddir = (winddir + 360) % 360
 
-    return windspd, winddir
+    like = u_wind if isinstance(u_wind, pd.Series) else v_wind
+
+    return _wind_result(windspd, like), _wind_result(winddir, like)
 
 
 def get_dataframe_cols_with_no_nans(df, col_type):
@@ -2078,26 +2227,28 @@ def draw_SCS_basemap(the_class, ax, custom, region, fontsize=13):
         lat1, lat2, lon1, lon2 = region
 
     adjust = 0.0
-    map = Basemap(llcrnrlon=lon1-adjust, llcrnrlat=lat1-adjust,
-                  urcrnrlon=lon2+adjust, urcrnrlat=lat2+adjust,
-                  ax=ax, resolution='h')
+    # Basemap of region is cached, so it is not bound to `ax`
+    map = render.get_basemap(
+        lon1-adjust, lon2+adjust, lat1-adjust, lat2+adjust,
+        resolution='h',
+        max_basemaps=render.get_max_basemaps(the_class.CONFIG))
 
-    map.drawcoastlines(zorder=the_class.zorders['coastlines'])
+    map.drawcoastlines(zorder=the_class.zorders['coastlines'], ax=ax)
     map.drawmapboundary(fill_color='white', linewidth=1,
-                        zorder=the_class.zorders['mapboundary'])
+                        zorder=the_class.zorders['mapboundary'], ax=ax)
     map.fillcontinents(color='grey', lake_color='white',
-                       zorder=the_class.zorders['continents'])
+                       zorder=the_class.zorders['continents'], ax=ax)
 
     meridians_interval = (lon2 - lon1) / 4
     parallels_interval = (lat2 - lat1) / 4
     map.drawmeridians(np.arange(lon1, lon2+0.01, meridians_interval),
                       labels=[1, 0, 0, 1],  fmt='%.1f',
                       zorder=the_class.zorders['grid'],
-                      fontsize=fontsize, dashes=[1,4])
+                      fontsize=fontsize, dashes=[1,4], ax=ax)
     map.drawparallels(np.arange(lat1, lat2+0.01, parallels_interval),
                       labels=[1, 0, 0, 1], fmt='%.1f',
                       zorder=the_class.zorders['grid'],
-                      fontsize=fontsize, dashes=[1,4])
+                      fontsize=fontsize, dashes=[1,4], ax=ax)
 
     return map
 
@@ -2215,6 +2366,50 @@ def get_xyz_matrix_of_smap_windspd_or_diff_mins(target,
                                                 tc_dt, region):
     """Temporal window is one hour.
 
+    smap_file_path can also be an opened netCDF4.Dataset, see
+    read_smap_windspd_and_diff_mins.
+
+    """
+    lons, lats, windspd, diff_mins = read_smap_windspd_and_diff_mins(
+        smap_file_path, tc_dt, region)
+
+    if target == 'windspd':
+        return lons, lats, windspd
+    elif target == 'diff_mins':
+        return lons, lats, diff_mins
+
+
+def read_smap_windspd_and_diff_mins(smap_file, tc_dt, region):
+    """Read SMAP windspd and its temporal shift in minutes from TC
+    within one hour temporal window.
+
+    For each cell, a pass is chosen when it is not missing, the two
+    passes have different minutes, and the pass is within 30 minutes
+    of tc_dt.  When both passes are chosen, the second one is used.
+
+    Parameters
+    ----------
+    smap_file : str or netCDF4.Dataset
+        Path of SMAP daily file, or its opened dataset whose auto mask
+        has been disabled.  Passing dataset avoids reopening the same
+        file for several hours of one day.
+    tc_dt : datetime.datetime
+        Datetime of TC.
+    region : list of float
+        [lat1, lat2, lon1, lon2] of area.
+
+    Returns
+    -------
+    lons, lats : list of float
+        Longitudes and latitudes of area.
+    windspd : numpy.ndarray
+        SMAP windspd, where -999 means no chosen pass.
+    diff_mins : numpy.ndarray
+        Signed minutes from tc_dt to chosen pass, where -999 means no
+        chosen pass.
+
+    All of them are None when no cell has chosen pass.
+
     """
     spa_resolu = 0.25
     windspd_masked_value = -999
@@ -2241,67 +2436,58 @@ def get_xyz_matrix_of_smap_windspd_or_diff_mins(target,
     diff_mins = np.full(shape=(len(lats), len(lons)),
                         fill_value=diff_mins_masked_value, dtype=int)
 
-    dataset = netCDF4.Dataset(smap_file_path)
-    # VERY VERY IMPORTANT: netCDF4 auto mask all windspd which
-    # faster than 1 m/s, so must disable auto mask
-    dataset.set_auto_mask(False)
+    if isinstance(smap_file, netCDF4.Dataset):
+        dataset = smap_file
+    else:
+        dataset = netCDF4.Dataset(smap_file)
+        # VERY VERY IMPORTANT: netCDF4 auto mask all windspd which
+        # faster than 1 m/s, so must disable auto mask
+        dataset.set_auto_mask(False)
     vars = dataset.variables
-    minute = vars['minute'][lat1_idx:lat2_idx+1,
-                            lon1_idx:lon2_idx+1, :]
-    wind = vars['wind'][lat1_idx:lat2_idx+1, lon1_idx:lon2_idx+1, :]
+    minute = np.asarray(vars['minute'][lat1_idx:lat2_idx+1,
+                                       lon1_idx:lon2_idx+1, :])
+    wind = np.asarray(vars['wind'][lat1_idx:lat2_idx+1,
+                                   lon1_idx:lon2_idx+1, :])
+    if dataset is not smap_file:
+        dataset.close()
 
-    rows, cols = minute.shape[:2]
-    passes_num = 2
     minute_missing = -9999
     wind_missing = -99.99
-    for y in range(len(lats)):
-        for x in range(len(lons)):
-            for i in range(passes_num):
-                try:
-                    if (minute[y][x][i] == minute_missing
-                            or wind[y][x][i] == wind_missing):
-                        continue
-                    if minute[y][x][0] == minute[y][x][1]:
-                        continue
-                    if minute[y][x][i] == 1440:
-                        continue
-                    pt_time = datetime.time(
-                        *divmod(int(minute[y][x][i]), 60), 0)
-                    pt_dt = datetime.datetime.combine(tc_dt.date(),
-                                                      pt_time)
-                    delta = abs(pt_dt - tc_dt)
-                    # Temporal window is one hour
-                    # XXX: if write as `delta.seconds > 1800`,
-                    # datetime.datetime(year, month, day, hour, 30)
-                    # will be rounded into next hour, making a little
-                    # repetition because that datetime will be used
-                    # when iterate next hour too.
-                    # FIXME: But if change following line to
-                    # `delta.seconds > 1800`, something wrong will
-                    # happen, e.g. SFMR, SMAP and SMAP prediction do
-                    # not match any more even they do match
-                    if delta.seconds > 1800:
-                        continue
-
-                    # SMAP originally has land mask, so it's not
-                    # necessary to check whether each pixel is land
-                    # or ocean
-                    windspd[y][x] = float(wind[y][x][i])
-                    if pt_dt < tc_dt:
-                        diff_mins[y][x] = -int(delta.seconds / 60)
-                    else:
-                        diff_mins[y][x] = int(delta.seconds / 60)
-                except Exception as msg:
-                    breakpoint()
-                    exit(msg)
+    valid = ((minute != minute_missing) & (wind != wind_missing)
+             & (minute[:, :, [0]] != minute[:, :, [1]])
+             & (minute != 1440))
+
+    # Seconds since the beginning of the day of TC
+    pt_secs = np.where(valid, minute, 0).astype(int) * 60
+    tc_secs = (tc_dt.hour * 3600 + tc_dt.minute * 60 + tc_dt.second
+               + tc_dt.microsecond / 1e6)
+    # Same as timedelta.seconds of abs(pt_dt - tc_dt)
+    delta_secs = np.floor(np.abs(pt_secs - tc_secs)).astype(int)
+    # Temporal window is one hour
+    # XXX: if write as `delta.seconds > 1800`,
+    # datetime.datetime(year, month, day, hour, 30)
+    # will be rounded into next hour, making a little
+    # repetition because that datetime will be used
+    # when iterate next hour too.
+    # FIXME: But if change following line to
+    # `delta.seconds > 1800`, something wrong will
+    # happen, e.g. SFMR, SMAP and SMAP prediction do
+    # not match any more even they do match
+    chosen = valid & (delta_secs <= 1800)
+    signed_mins = np.where(pt_secs < tc_secs, -(delta_secs // 60),
+                           delta_secs // 60)
+
+    # SMAP originally has land mask, so it's not necessary to check
+    # whether each pixel is land or ocean.  The later pass overwrites
+    # the earlier one.
+    for i in range(minute.shape[2]):
+        windspd[chosen[:, :, i]] = wind[:, :, i][chosen[:, :, i]]
+        diff_mins[chosen[:, :, i]] = signed_mins[:, :, i][chosen[:, :, i]]
+
+    if not chosen.any():
+        return None, None, None, None
 
-    if target == 'windspd' and windspd.max() > windspd_masked_value:
-        return lons, lats, windspd
-    elif (target == 'diff_mins'
-          and diff_mins.max() > diff_mins_masked_value):
-        return lons, lats, diff_mins
-    else:
-        return None, None, None
+    return lons, lats, windspd, diff_mins
 
 
 def satel_data_cover_tc_center(lons, lats, windspd, tc):
@@ -2318,7 +2504,8 @@ def satel_data_cover_tc_center(lons, lats, windspd, tc):
         return False
 
 
-def get_xyz_matrix_of_ccmp_windspd(ccmp_file_path, dt, region):
+def get_xyz_matrix_of_ccmp_windspd(ccmp_file_path, dt, region,
+                                   CONFIG=None):
     ccmp_hours = [0, 6, 12, 18]
     if dt.hour not in ccmp_hours:
         return None, None, None
@@ -2351,20 +2538,12 @@ def get_xyz_matrix_of_ccmp_windspd(ccmp_file_path, dt, region):
     v_wind = vars['vwnd'][hour_idx][lat1_idx:lat2_idx+1,
                                     lon1_idx:lon2_idx+1]
 
-    for y in range(len(lats)):
-        for x in range(len(lons)):
-            try:
-                if not bool(globe.is_land(lats[y], lons[x])):
-                    # For safe, maybe should check whether wind
-                    # component is masked
-                    windspd[y][x] = math.sqrt(u_wind[y][x] ** 2
-                                              + v_wind[y][x] ** 2)
-                else:
-                    # There may be problem
-                    windspd[y][x] = 0
-            except Exception as msg:
-                breakpoint()
-                exit(msg)
+    lon_mesh, lat_mesh = np.meshgrid(lons, lats)
+    land = landmask.get_land_mask(CONFIG).is_land(lat_mesh, lon_mesh)
+    # For safe, maybe should check whether wind component is masked
+    windspd[:] = np.sqrt(u_wind ** 2 + v_wind ** 2)
+    # There may be problem
+    windspd[land] = 0
 
     return lons, lats, windspd
 
@@ -2417,7 +2596,7 @@ def get_pixel_of_era5_windspd(era5_file_path, product_type, dt,
 
 
 def get_xyz_matrix_of_era5_windspd(era5_file_path, product_type,
-                                   dt, region):
+                                   dt, region, CONFIG=None):
     grbidx = pygrib.index(era5_file_path, 'dataTime')
     hourtime = dt.hour * 100
     selected_grbs = grbidx.select(dataTime=hourtime)
@@ -2446,22 +2625,11 @@ def get_xyz_matrix_of_era5_windspd(era5_file_path, product_type,
         elif name == v_wind_var_name:
             v_wind = data
 
-    lats_num, lons_num = u_wind.shape
     windspd = np.ndarray(shape=u_wind.shape, dtype=float)
-    for y in range(lats_num):
-        for x in range(lons_num):
-            try:
-                lon_180_mode = longitude_converter(lons[y][x], '360',
-                                                   '-180')
-                if not bool(globe.is_land(lats[y][x], lon_180_mode)):
-                    windspd[y][x] = math.sqrt(u_wind[y][x] ** 2
-                                              + v_wind[y][x] ** 2)
-                else:
-                    # There may be problem
-                    windspd[y][x] = 0
-            except Exception as msg:
-                breakpoint()
-                exit(msg)
+    land = landmask.get_land_mask(CONFIG).is_land(lats, lons)
+    windspd[:] = np.sqrt(u_wind ** 2 + v_wind ** 2)
+    # There may be problem
+    windspd[land] = 0
 
     return lons, lats, windspd
 
@@ -3040,186 +3208,139 @@ def sfmr_nc_time_converter(time_str):
 
 
 def get_sfmr_track_and_windspd(nc_file_path, data_indices):
+    """Get coordinates along SFMR track and points averaged in squares
+    along track.
+
+    Samples are read from arrays of sfmr_cache, so the file is parsed
+    only once for all hours.  Result is the same as reading samples
+    one by one: variables are summed in the order of samples and in
+    their own dtype.
+
+    Returns
+    -------
+    track_lonlats : list of tuple
+        (lon, lat) of all samples of `data_indices`.
+    avg_pts : list of SFMRPoint
+        Averaged points of squares along track.
+
+    """
     try:
-        dataset = netCDF4.Dataset(nc_file_path)
-        # VERY VERY IMPORTANT: netCDF4 auto mask all windspd which
-        # faster than 1 m/s, so must disable auto mask
-        dataset.set_auto_mask(False)
-        vars = dataset.variables
+        flight = sfmr_cache.get_sfmr_cache().get(nc_file_path)
 
-        for var_name in ['LON', 'LAT', 'FLAG', 'DATE', 'TIME', 'ATEMP',
-                         'SALN', 'SST', 'SRR', 'SWS']:
-            if var_name not in vars.keys():
+        for var_name in ['LON', 'LAT', 'FLAG', 'ATEMP', 'SALN', 'SST',
+                         'SRR', 'SWS']:
+            if var_name not in flight.vars:
                 return None, None
 
-        track_lonlats = []
-        track_pts = []
-        avg_pts = []
-
+        positions = flight.positions(data_indices)
+        lons = flight.vars['LON'][positions]
+        lats = flight.vars['LAT'][positions]
         # Get track
-        for idx in data_indices:
-            lon = (vars['LON'][idx] + 360) % 360
-            lat = vars['LAT'][idx]
-            track_lonlats.append((lon, lat))
-            # Filter out SFMR points that is not valid after recording
-            # the track
-            if int(vars['FLAG'][idx]):
-                continue
-            pt = SFMRPoint(datetime.datetime.combine(
-                sfmr_nc_converter('DATE', vars['DATE'][idx]),
-                sfmr_nc_converter('TIME', vars['TIME'][idx])),
-                lon, lat, vars['ATEMP'][idx], vars['SALN'][idx],
-                vars['SST'][idx], vars['SRR'][idx], vars['SWS'][idx])
-            track_pts.append(pt)
-
-        if not len(track_pts):
-            return None, None
+        track_lonlats = list(zip(lons, lats))
 
-        earliest_dt_of_track = track_pts[0].date_time
+        # Filter out SFMR points that is not valid after recording
+        # the track
+        positions = positions[
+            flight.vars['FLAG'][positions].astype(int) == 0]
+        if not len(positions):
+            return None, None
+        lons = flight.vars['LON'][positions]
+        lats = flight.vars['LAT'][positions]
+        pts_num = len(positions)
 
         square_edge = 0.25
         half_square_edge = square_edge / 2
         # Split track with `square_edge` * `square_edge` degree squares
-        # around SFMR points
-        # For each point along track, there are two possibilities:
-        # 1. center of square
-        # 2. not center of square
-
-        # First find all centers of square:
-        # [index of center 0, index of center 1, ...]
-        # each element is the index of center points in `track_pts`
-        square_center_indices = []
-        for idx, pt in enumerate(track_pts):
-            # Set start terminal along track as first square center
-            if not idx:
-                one_avg_pt = SFMRPoint()
-                one_avg_pt.lon = pt.lon
-                one_avg_pt.lat = pt.lat
-                avg_pts.append(one_avg_pt)
-                square_center_indices.append(idx)
-            # Then search for next square center
-            # If the difference between longitude or latitude is not smaller
-            # than square edge, we encounter the center point of next square
-            if (abs(pt.lon - avg_pts[-1].lon) >= square_edge
-                    or abs(pt.lat - avg_pts[-1].lat) >= square_edge):
-                # Record the new square center
-                one_avg_pt = SFMRPoint()
-                one_avg_pt.lon = pt.lon
-                one_avg_pt.lat = pt.lat
-                avg_pts.append(one_avg_pt)
-                square_center_indices.append(idx)
-
-        # There may be some points left near the end terminal of track.
-        # from which cannot select the square center using method above.
-        # But they are out of the range of last square.
-        # So we need to set the end terminal of track to be the last square
-        # center.
-        end_is_center = False
-        for idx, pt in enumerate(track_pts):
-            if idx <= square_center_indices[-1]:
-                continue
-            if (abs(pt.lon - avg_pts[-1].lon) >= half_square_edge
-                    or abs(pt.lat - avg_pts[-1].lat) >= half_square_edge):
-                # Make sure of the necessity of setting the end terminal as
-                # the last square center
-                end_is_center = True
+        # around SFMR points.  Set start terminal along track as first
+        # square center, then the next center is the first point whose
+        # difference of longitude or latitude to last center is not
+        # smaller than square edge.
+        square_center_indices = [0]
+        while True:
+            center = square_center_indices[-1]
+            far = ((np.abs(lons[center + 1:] - lons[center])
+                    >= square_edge)
+                   | (np.abs(lats[center + 1:] - lats[center])
+                      >= square_edge))
+            if not far.any():
                 break
+            square_center_indices.append(center + 1 + int(far.argmax()))
+
+        # There may be some points left near the end terminal of track
+        # which are out of the range of last square.  So we need to set
+        # the end terminal of track to be the last square center.
+        center = square_center_indices[-1]
+        if ((np.abs(lons[center + 1:] - lons[center]) >= half_square_edge)
+                | (np.abs(lats[center + 1:] - lats[center])
+                   >= half_square_edge)).any():
+            square_center_indices.append(pts_num - 1)
+        square_center_indices = np.array(square_center_indices)
+
+        # Group every point into the square of nearest center which
+        # covers it.  Centers are few, so compare all points with all
+        # centers at once.
+        lon_diff = np.abs(lons[:, np.newaxis]
+                          - lons[square_center_indices])
+        lat_diff = np.abs(lats[:, np.newaxis]
+                          - lats[square_center_indices])
+        in_square = ((lon_diff <= half_square_edge)
+                     & (lat_diff <= half_square_edge))
+        dis = np.sqrt(lon_diff.astype(float) ** 2
+                      + lat_diff.astype(float) ** 2)
+        dis[~in_square] = np.inf
+        grouped = in_square.any(axis=1)
+        groups = dis[grouped].argmin(axis=1)
+        grouped_positions = positions[grouped]
+
+        centers_num = len(square_center_indices)
+        group_sizes = np.bincount(groups, minlength=centers_num)
+
+        # Calculated the average datetime of each group
+        datetimes = flight.datetimes[positions]
+        earliest_dt_of_track = datetimes[0].astype(datetime.datetime)
+        seconds_shift = (flight.datetimes[grouped_positions]
+                         - datetimes[0]).astype(np.int64)
+        seconds_shift_sum = np.zeros(centers_num, dtype=np.int64)
+        np.add.at(seconds_shift_sum, groups, seconds_shift)
+
+        # Calculated the sum of other variables of each group
+        # Masked wind is smaller than 0
+        attr_sums = dict()
+        attr_positive = dict()
+        for attr, var_name in [('air_temp', 'ATEMP'), ('salinity', 'SALN'),
+                               ('sst', 'SST'), ('rain_rate', 'SRR'),
+                               ('windspd', 'SWS')]:
+            values = flight.vars[var_name][grouped_positions]
+            positive = values > 0
+            sums = np.zeros(centers_num, dtype=values.dtype)
+            np.add.at(sums, groups[positive], values[positive])
+            attr_sums[attr] = sums
+            attr_positive[attr] = np.bincount(groups[positive],
+                                              minlength=centers_num)
+
+        # Average wind speed in square to the center point and skip
+        # empty groups
+        avg_pts = []
+        for index_of_center_indices, center in enumerate(
+                square_center_indices):
+            group_size = int(group_sizes[index_of_center_indices])
+            if not group_size:
+                continue
 
-        if end_is_center:
             one_avg_pt = SFMRPoint()
-            one_avg_pt.lon = track_pts[-1].lon
-            one_avg_pt.lat = track_pts[-1].lat
-            avg_pts.append(one_avg_pt)
-            square_center_indices.append(len(track_pts) - 1)
-
-        # Save result of spliting into a list of list:
-        # [[square_0_pt_0, square_0_pt_1, ...], [square_1_pt_0,
-        # square_1_pt_1, ...], ...]
-        square_groups = []
-        for center in square_center_indices:
-            square_groups.append([])
-
-        for idx, pt in enumerate(track_pts):
-            try:
-                min_dis = 999
-                idx_of_nearest_center_idx = None
-
-                for index_of_center_indices in range(
-                        len(square_center_indices)):
-                    center_index = square_center_indices[
-                        index_of_center_indices]
-                    tmp_center = track_pts[center_index]
-                    lon_diff = abs(pt.lon - tmp_center.lon)
-                    lat_diff = abs(pt.lat - tmp_center.lat)
-
-                    if (lon_diff <= half_square_edge
-                            and lat_diff <= half_square_edge):
-                        # This point along track is in the square
-                        dis = math.sqrt(math.pow(lon_diff, 2)
-                                        + math.pow(lat_diff, 2))
-                        if dis < min_dis:
-                            min_dis = dis
-                            idx_of_nearest_center_idx = \
-                                index_of_center_indices
-
-                if idx_of_nearest_center_idx is not None:
-                    square_groups[idx_of_nearest_center_idx].append(idx)
+            one_avg_pt.lon = lons[center]
+            one_avg_pt.lat = lats[center]
+            avg_seconds_shift = int(
+                seconds_shift_sum[index_of_center_indices]) / group_size
+            one_avg_pt.date_time = earliest_dt_of_track + \
+                datetime.timedelta(seconds=avg_seconds_shift)
+            for attr in attr_sums:
+                if attr_positive[attr][index_of_center_indices]:
+                    sum = attr_sums[attr][index_of_center_indices]
                 else:
-                    continue
-            except Exception as msg:
-                breakpoint()
-                exit(msg)
-
-        if len(square_groups) != len(square_center_indices):
-            logger.error(f"""Number of groups does not equal to """
-                         f"""number of centers""")
-            breakpoint()
-
-        to_delete_empty_groups_indices = []
-        # Average wind speed in square to the center point
-        for index_of_center_indices in range(len(square_center_indices)):
-            try:
-                group_size = len(square_groups[index_of_center_indices])
-                if not group_size:
-                    to_delete_empty_groups_indices.append(
-                        index_of_center_indices)
-                    continue
-
-                # Calculated the average datetime of each group
-                seconds_shift_sum = 0
-                for pt_index in square_groups[index_of_center_indices]:
-                    temporal_shift = (track_pts[pt_index].date_time
-                                      - earliest_dt_of_track)
-                    seconds_shift_sum += (temporal_shift.days * 24 * 3600
-                                          + temporal_shift.seconds)
-                avg_seconds_shift = seconds_shift_sum / group_size
-                avg_pts[index_of_center_indices].date_time = \
-                    earliest_dt_of_track + datetime.timedelta(
-                        seconds=avg_seconds_shift)
-
-                # Calculated the average of other variables of each group
-                for attr in ['air_temp', 'salinity', 'sst', 'rain_rate',
-                             'windspd']:
                     sum = 0
-                    for pt_index in square_groups[index_of_center_indices]:
-                        # Masked wind is smaller than 0
-                        value = getattr(track_pts[pt_index], attr)
-                        if value > 0:
-                            sum += value
-                    setattr(avg_pts[index_of_center_indices], attr,
-                            sum / group_size)
-            except Exception as msg:
-                breakpoint()
-                exit(msg)
-
-        if len(to_delete_empty_groups_indices):
-            new_avg_pts = []
-            for i in range(len(avg_pts)):
-                if i not in to_delete_empty_groups_indices:
-                    new_avg_pts.append(avg_pts[i])
-
-            del avg_pts
-            avg_pts = new_avg_pts
+                setattr(one_avg_pt, attr, sum / group_size)
+            avg_pts.append(one_avg_pt)
     except Exception as msg:
         breakpoint()
         exit(msg)
@@ -3474,53 +3595,52 @@ def draw_sfmr_windspd_and_track(the_class, fig, ax, tc_datetime,
         exit(msg)
 
 
-def interp_satel_era5_diff_mins_matrix(diff_mins):
-    rows_num, cols_num = diff_mins.shape
-    # Fill row by row
-    for i in range(rows_num):
-        row_valid_sum = 0
-        row_valid_count = 0
-        for j in range(cols_num):
-            # In one-hour window
-            if abs(diff_mins[i][j]) <= 30:
-                row_valid_sum += diff_mins[i][j]
-                row_valid_count += 1
-        if not row_valid_count:
-            continue
-        row_valid_avg = int(row_valid_sum / row_valid_count)
-
-        for j in range(cols_num):
-            if abs(diff_mins[i][j]) > 30:
-                diff_mins[i][j] = row_valid_avg
-
-    # Fill column by column
-    for j in range(cols_num):
-        col_valid_sum = 0
-        col_valid_count = 0
-        for i in range(rows_num):
-            # In one-hour window
-            if abs(diff_mins[i][j]) <= 30:
-                col_valid_sum += diff_mins[i][j]
-                col_valid_count += 1
-        if not col_valid_count:
-            continue
-        col_valid_avg = int(col_valid_sum / col_valid_count)
+def interp_satel_era5_diff_mins_matrix(diff_mins, method='mean'):
+    """Fill diff_mins out of one-hour window in place.
 
-        for i in range(rows_num):
-            if abs(diff_mins[i][j]) > 30:
-                diff_mins[i][j] = col_valid_avg
+    Parameters
+    ----------
+    diff_mins : numpy.ndarray
+        Minutes between satellite and ERA5.  Elements whose absolute
+        value is larger than 30 are out of window and need filling.
+    method : str
+        'mean' fills row by row with the truncated integer average of
+        valid elements of row, then fills the remaining column by
+        column in the same way.  'nearest' fills with the nearest
+        valid element.
+
+    """
+    window = 30
+
+    if method == 'nearest':
+        invalid = np.abs(diff_mins) > window
+        if invalid.all() or not invalid.any():
+            return diff_mins
+        nearest_indices = ndimage.distance_transform_edt(
+            invalid, return_distances=False, return_indices=True)
+        diff_mins[invalid] = diff_mins[tuple(nearest_indices)][invalid]
+
+        return diff_mins
+
+    # Fill row by row (axis=1), then column by column (axis=0)
+    for axis in [1, 0]:
+        # In one-hour window
+        valid = np.abs(diff_mins) <= window
+        valid_count = valid.sum(axis=axis, keepdims=True)
+        valid_sum = np.where(valid, diff_mins, 0).sum(axis=axis,
+                                                     keepdims=True)
+        valid_avg = np.trunc(
+            valid_sum / np.maximum(valid_count, 1)).astype(int)
+
+        to_fill = (np.abs(diff_mins) > window) & (valid_count > 0)
+        diff_mins[to_fill] = np.broadcast_to(valid_avg,
+                                             diff_mins.shape)[to_fill]
 
     return diff_mins
 
 def validate_smap_prediction_with_sfmr(the_class, tc, sfmr_pts,
                                        tgt_name):
     Validation = create_sfmr_validation_table(the_class, tgt_name)
-    dist2coast_table_name = the_class.CONFIG['dist2coast'][
-        'table_name']['na_sfmr']
-    Dist2Coast = get_class_by_tablename(
-        the_class.engine, dist2coast_table_name)
-    dist2coast_lons = [round(x * 0.04 - 179.98, 2) for x in range(9000)]
-    dist2coast_lats = [round(y * 0.04 - 89.98, 2) for y in range(4500)]
 
     # Traverse each SFMR point
     num_sfmr_tracks = len(sfmr_pts)
@@ -3568,28 +3688,20 @@ def validate_smap_prediction_with_sfmr(the_class, tc, sfmr_pts,
             row.tc_sid_sfmr_datetime = (f"""{row.tc_sid}_"""
                                         f"""{row.sfmr_datetime}""")
 
-            lookup_lon, lookup_lon_idx = \
-                get_nearest_element_and_index(
-                    dist2coast_lons, longitude_converter(
-                        row.sfmr_lon, '360', '-180'))
-            lookup_lat, lookup_lat_idx = \
-                get_nearest_element_and_index(
-                    dist2coast_lats, row.sfmr_lat)
-
-            dist_query = the_class.session.query(Dist2Coast).filter(
-                Dist2Coast.lon > lookup_lon - 0.01,
-                Dist2Coast.lon < lookup_lon + 0.01,
-                Dist2Coast.lat > lookup_lat - 0.01,
-                Dist2Coast.lat < lookup_lat + 0.01,
-            )
-            if dist_query.count() != 1:
-                the_class.logger.error('Dist not found')
-                breakpoint()
-                exit(1)
-            row.dist2coast = dist_query[0].dist2coast
-
             validation_list.append(row)
 
+    # Look up distance to coast of all SFMR points at once
+    if len(validation_list):
+        dists = dist2coast.get_dist2coast(the_class.CONFIG).distance(
+            [row.sfmr_lat for row in validation_list],
+            [row.sfmr_lon for row in validation_list])
+        if np.isnan(dists).any():
+            the_class.logger.error('Dist not found')
+            breakpoint()
+            exit(1)
+        for row, dist in zip(validation_list, dists):
+            row.dist2coast = float(dist)
+
     # Write into database
     if len(validation_list):
         bulk_insert_avoid_duplicate_unique(
@@ -3825,6 +3937,89 @@ def cal_precise_tc(the_class, tc, tc_before, tc_after,
 
 
 
+def match_nearest_valid_cells(base_lons, base_lats, tgt_lons, tgt_lats,
+                              tgt_windspd, tgt_mesh, max_dis):
+    """Match points to their nearest target cells which have valid wind
+    speed, in the sense of euclidean distance of lon/lat in degree.
+
+    A KD-tree is built once on valid cells and queried with all points
+    at once.  When several cells are equally near, the first one in
+    row-major order is chosen, like a scan over the target grid.
+
+    Parameters
+    ----------
+    base_lons, base_lats : numpy.ndarray
+        Coordinates of points to be matched.
+    tgt_lons, tgt_lats : list or numpy.ndarray
+        1-D axes of target grid, or 2-D meshes when tgt_mesh is True.
+    tgt_windspd : numpy.ndarray
+        Wind speed of target grid.  Masked, None and non-positive
+        values are invalid.
+    tgt_mesh : bool
+        Whether tgt_lons and tgt_lats are meshes.
+    max_dis : float
+        Points whose nearest valid cell is farther than it are not
+        matched.
+
+    Returns
+    -------
+    matched : numpy.ndarray
+        Bool array of whether points are matched.
+    lat_indices, lon_indices : numpy.ndarray
+        Indices of matched cells in target grid.  Undefined where
+        points are not matched.
+
+    """
+    points_num = len(base_lons)
+    matched = np.zeros(points_num, dtype=bool)
+    lat_indices = np.zeros(points_num, dtype=int)
+    lon_indices = np.zeros(points_num, dtype=int)
+
+    windspd = np.ma.asarray(tgt_windspd)
+    if windspd.dtype == object:
+        windspd = np.ma.masked_invalid(np.ma.masked_equal(
+            windspd, None).filled(np.nan).astype(float))
+    valid = (~np.ma.getmaskarray(windspd)
+             & (np.ma.filled(windspd.astype(float), 0) > 0))
+    valid_j, valid_k = np.nonzero(valid)
+    if not len(valid_j) or not points_num:
+        return matched, lat_indices, lon_indices
+
+    if tgt_mesh:
+        cell_lats = np.asarray(tgt_lats, dtype=float)[valid_j, valid_k]
+        cell_lons = np.asarray(tgt_lons, dtype=float)[valid_j, valid_k]
+    else:
+        cell_lats = np.asarray(tgt_lats, dtype=float)[valid_j]
+        cell_lons = np.asarray(tgt_lons, dtype=float)[valid_k]
+
+    tree = cKDTree(np.column_stack([cell_lons, cell_lats]))
+    neighbors_num = min(8, len(valid_j))
+    _, candidates = tree.query(
+        np.column_stack([base_lons, base_lats]), k=neighbors_num,
+        distance_upper_bound=max_dis * (1 + 1e-9))
+    candidates = candidates.reshape(points_num, neighbors_num)
+
+    # Recompute distances of candidates in the same way as a scan, so
+    # that ties are broken by row-major order
+    found = candidates < len(valid_j)
+    safe = np.where(found, candidates, 0)
+    dis = np.sqrt((base_lons[:, np.newaxis] - cell_lons[safe]) ** 2
+                  + (base_lats[:, np.newaxis] - cell_lats[safe]) ** 2)
+    dis[~found] = np.inf
+    # Valid cells are in row-major order, so smaller candidate index
+    # means earlier cell
+    best_dis = dis.min(axis=1)
+    is_best = (dis == best_dis[:, np.newaxis]) & found
+    best = np.where(is_best, safe, len(valid_j)).min(axis=1)
+
+    matched = np.isfinite(best_dis) & (best_dis <= max_dis)
+    best = np.where(matched, best, 0)
+    lat_indices = valid_j[best]
+    lon_indices = valid_k[best]
+
+    return matched, lat_indices, lon_indices
+
+
 def validate_with_sfmr(the_class, tgt_name, tc, sfmr_pts, tgt_lons,
                        tgt_lats, tgt_windspd, tgt_mesh, tgt_diff_mins,
                        tag=None):
@@ -3837,116 +4032,87 @@ def validate_with_sfmr(the_class, tgt_name, tc, sfmr_pts, tgt_lons,
                                                   tgt_name)
     # TODO: imporve matchup of smap / era5 with SFMR like SMAP pred
     Validation = create_sfmr_validation_table(the_class, tgt_name, tag)
-    num_sfmr_tracks = len(sfmr_pts)
-    num_tgt_lats, num_tgt_lons = tgt_windspd.shape
 
     grid_edge = the_class.CONFIG['spatial_resolution'][tgt_name]
     half_grid_edge = grid_edge / 2
     max_min_dis = math.sqrt(half_grid_edge ** 2 + half_grid_edge ** 2)
 
     validation_list = []
-    # Traverse SFMR data points
-    for t in range(num_sfmr_tracks):
-        for i in range(len(sfmr_pts[t])):
-            base_lon = sfmr_pts[t][i].lon
-            base_lat = sfmr_pts[t][i].lat
-            # Traverse tgt data points which have valid wind speed to
-            # find the one closest to the SFMR data point
-            min_dis = 999999.9
-            min_dis_lat_idx = None
-            min_dis_lon_idx = None
-            min_dis_lat = None
-            min_dis_lon = None
-            try:
-                for j in range(num_tgt_lats):
-                    if not tgt_mesh:
-                        tmp_lat = tgt_lats[j]
-                    for k in range(num_tgt_lons):
-                        # Skip if the data point from target source is
-                        # invalid
-                        if (tgt_windspd[j][k] is None
-                                or tgt_windspd[j][k] <= 0
-                                or tgt_windspd[j][k] is MASKED):
-                            continue
-                        if not tgt_mesh:
-                            tmp_lon = tgt_lons[k]
-                        else:
-                            tmp_lat = tgt_lats[j][k]
-                            tmp_lon = tgt_lons[j][k]
-                        # Calculate the distance between SFMR data
-                        # point and data point from target source
-                        dis = math.sqrt(
-                            math.pow(base_lon - tmp_lon, 2)
-                            + math.pow(base_lat - tmp_lat, 2))
-                        if dis < min_dis:
-                            min_dis = dis
-                            min_dis_lat_idx = j
-                            min_dis_lon_idx = k
-            except Exception as msg:
-                breakpoint()
-                exit(msg)
+    flat_sfmr_pts = [pt for track in sfmr_pts for pt in track]
+    if not flat_sfmr_pts:
+        return sfmr_pts
+    base_lons = np.array([pt.lon for pt in flat_sfmr_pts], dtype=float)
+    base_lats = np.array([pt.lat for pt in flat_sfmr_pts], dtype=float)
+
+    # Find tgt data points which have valid wind speed and are
+    # closest to SFMR data points
+    matched, lat_indices, lon_indices = match_nearest_valid_cells(
+        base_lons, base_lats, tgt_lons, tgt_lats, tgt_windspd, tgt_mesh,
+        max_min_dis)
+    # Skip if there are no data point from target source
+    # in the spatial window around SFMR data point
+    matched_pts = [pt for pt, ok in zip(flat_sfmr_pts, matched) if ok]
+    lat_indices = lat_indices[matched]
+    lon_indices = lon_indices[matched]
+    base_lons = base_lons[matched]
+    base_lats = base_lats[matched]
+
+    if tgt_mesh:
+        min_dis_lats = np.asarray(tgt_lats)[lat_indices, lon_indices]
+        min_dis_lons = np.asarray(tgt_lons)[lat_indices, lon_indices]
+    else:
+        min_dis_lats = np.asarray(tgt_lats)[lat_indices]
+        min_dis_lons = np.asarray(tgt_lons)[lon_indices]
+    # Spatial distance in kilo meters
+    dis_kms = geodesy.distance_km(min_dis_lats, min_dis_lons,
+                                  base_lats, base_lons)
+
+    for m, pt in enumerate(matched_pts):
+        min_dis_lat_idx = int(lat_indices[m])
+        min_dis_lon_idx = int(lon_indices[m])
+        min_dis_lat = float(min_dis_lats[m])
+        min_dis_lon = float(min_dis_lons[m])
+        min_dis_windspd = tgt_windspd[min_dis_lat_idx][min_dis_lon_idx]
+
+        if tgt_name != 'smap':
+            min_dis_dt = tc.date_time
+        else:
+            min_dis_dt = tc.date_time + datetime.timedelta(
+                seconds=60*int(tgt_diff_mins[min_dis_lat_idx][
+                    min_dis_lon_idx])
+            )
 
-            # Skip if there are no data point from target source
-            # in the spatial window around SFMR data point
-            if min_dis > max_min_dis:
-                continue
+        row = Validation()
+        row.tc_sid = tc.sid
 
-            if tgt_mesh:
-                min_dis_lat = tgt_lats[min_dis_lat_idx][
-                    min_dis_lon_idx]
-                min_dis_lon = tgt_lons[min_dis_lat_idx][
-                    min_dis_lon_idx]
-            else:
-                min_dis_lat = tgt_lats[min_dis_lat_idx]
-                min_dis_lon = tgt_lons[min_dis_lon_idx]
-            min_dis_windspd = tgt_windspd[min_dis_lat_idx][
-                min_dis_lon_idx]
+        row.sfmr_datetime = pt.date_time
+        row.sfmr_lon = pt.lon
+        row.sfmr_lat = pt.lat
 
-            if tgt_name != 'smap':
-                min_dis_dt = tc.date_time
-            else:
-                min_dis_dt = tc.date_time + datetime.timedelta(
-                    seconds=60*int(tgt_diff_mins[min_dis_lat_idx][
-                        min_dis_lon_idx])
-                )
+        for attr in ['air_temp', 'salinity', 'sst', 'rain_rate',
+                     'windspd']:
+            value = getattr(pt, attr)
+            setattr(row, f'sfmr_{attr}', value)
 
-            row = Validation()
-            row.tc_sid = tc.sid
+        row.x = int((min_dis_lon - tc.lon) / grid_edge)
+        row.y = int((min_dis_lat - tc.lat) / grid_edge)
 
-            row.sfmr_datetime = sfmr_pts[t][i].date_time
-            row.sfmr_lon = base_lon
-            row.sfmr_lat = base_lat
+        setattr(row, f'{tgt_name}_datetime', min_dis_dt)
+        setattr(row, f'{tgt_name}_lon', min_dis_lon)
+        setattr(row, f'{tgt_name}_lat', min_dis_lat)
+        setattr(row, f'{tgt_name}_windspd', min_dis_windspd)
 
-            for attr in ['air_temp', 'salinity', 'sst', 'rain_rate',
-                         'windspd']:
-                value = getattr(sfmr_pts[t][i], attr)
-                setattr(row, f'sfmr_{attr}', value)
+        # Temporal distance in minutes
+        temporal_dis = min_dis_dt - pt.date_time
+        row.dis_minutes = (temporal_dis.days * 24 * 60
+                           + temporal_dis.seconds / 60)
+        row.dis_kms = float(dis_kms[m])
+        # Bias of wind speed
+        row.windspd_bias = min_dis_windspd - row.sfmr_windspd
 
-            row.x = int((min_dis_lon - tc.lon) / grid_edge)
-            row.y = int((min_dis_lat - tc.lat) / grid_edge)
-
-            setattr(row, f'{tgt_name}_datetime', min_dis_dt)
-            setattr(row, f'{tgt_name}_lon', min_dis_lon)
-            setattr(row, f'{tgt_name}_lat', min_dis_lat)
-            setattr(row, f'{tgt_name}_windspd', min_dis_windspd)
-
-            # Temporal distance in minutes
-            temporal_dis = min_dis_dt - sfmr_pts[t][i].date_time
-            row.dis_minutes = (temporal_dis.days * 24 * 60
-                               + temporal_dis.seconds / 60)
-            # Spatial distance in kilo meters
-            one_sfmr_pt = (base_lat, longitude_converter(
-                base_lon, '360', '-180'))
-            one_tgt_pt = (min_dis_lat, longitude_converter(
-                min_dis_lon, '360', '-180'))
-            row.dis_kms = distance.distance(one_tgt_pt,
-                                            one_sfmr_pt).km
-            # Bias of wind speed
-            row.windspd_bias = min_dis_windspd - row.sfmr_windspd
-
-            row.tc_sid_sfmr_datetime = (f"""{row.tc_sid}_"""
-                                        f"""{row.sfmr_datetime}""")
-            validation_list.append(row)
+        row.tc_sid_sfmr_datetime = (f"""{row.tc_sid}_"""
+                                    f"""{row.sfmr_datetime}""")
+        validation_list.append(row)
 
     bulk_insert_avoid_duplicate_unique(
         validation_list,
@@ -3988,7 +4154,7 @@ def const_line(x_min, x_max, ratio, bias, color, linewidth, linestyle):
     plt.plot(y, x, C=color, linewidth=linewidth, linestyle=linestyle)
 
 
-def sfmr_exists(the_class, tc, next_tc):
+def sfmr_exists(the_class, tc, next_tc, half_reg_edge=None):
     """Check the existence of SFMR data between two
     temporally neighbouring IBTrACS records of a same TC
     and get the brief info of these SFMR data.
@@ -3999,6 +4165,9 @@ def sfmr_exists(the_class, tc, next_tc):
         An IBTrACS TC record eariler.
     next_tc : object describing a row of IBTrACS table
         Another IBTrACS record of the same TC later.
+    half_reg_edge : float, optional
+        Half of edge of regression area around TC in degree.  It is
+        read from CONFIG when not given.
 
     Returns
     -------
@@ -4010,93 +4179,72 @@ def sfmr_exists(the_class, tc, next_tc):
                 between two IBTrACS records.
 
     """
+    return sfmr_exists_many(the_class, [(tc, next_tc)], half_reg_edge)[0]
 
-    # Rough temporally check
-    temporal_existence, temporal_sfmr_info = sfmr_temporally_exists(
-        the_class, tc, next_tc)
-    if not temporal_existence:
-        return False, None
 
-    # Rough spaitally check
-    spatial_existence, spatial_temporal_sfmr_info = \
-        sfmr_spatially_exists(the_class, tc, next_tc,
-                              temporal_sfmr_info)
-    if not spatial_existence:
-        return False, None
-
-    # Detailed check
-    # ???
-
-    return True, spatial_temporal_sfmr_info
+def sfmr_exists_many(the_class, tc_pairs, half_reg_edge=None):
+    """Check the existence of SFMR data between many pairs of
+    temporally neighbouring IBTrACS records with one query of the
+    in-memory index of SFMR brief info.
 
+    Returns
+    -------
+    results : list of tuple
+        (existence, spatial_temporal_sfmr_info) of every pair, like
+        the result of sfmr_exists.
 
-def sfmr_temporally_exists(the_class, tc, next_tc):
-    existence = False
-    temporal_info = []
+    """
+    if half_reg_edge is None:
+        half_reg_edge = the_class.CONFIG['regression'][
+            'edge_in_degree'] / 2
+    index = sfmr_index.get_brief_info_index(
+        the_class.CONFIG, the_class.engine, the_class.session)
+
+    # Rough temporally and spatially check
+    windows = []
+    for tc, next_tc in tc_pairs:
+        windows.append((tc.date_time, next_tc.date_time)
+                       + regression_box_between_tcs(tc, next_tc,
+                                                    half_reg_edge))
+
+    results = []
+    for spatial_temporal_sfmr_info in index.query_many(windows):
+        if not len(spatial_temporal_sfmr_info):
+            results.append((False, None))
+        else:
+            results.append((True, spatial_temporal_sfmr_info))
 
-    table_name = the_class.CONFIG['sfmr']['table_names']['brief_info']
-    BriefInfo = get_class_by_tablename(the_class.engine, table_name)
+    # Detailed check
+    # ???
 
-    direct_query = the_class.session.query(BriefInfo).filter(
-        BriefInfo.end_datetime > tc.date_time,
-        BriefInfo.start_datetime < next_tc.date_time)
-    count_sum = direct_query.count()
+    return results
 
-    if count_sum:
-        existence = True
-        for row in direct_query:
-            temporal_info.append(row)
 
-    return existence, temporal_info
+def regression_box_between_tcs(tc, next_tc, half_reg_edge):
+    """Get circumscribed rectangle of all area of regression on every
+    hour between two neighbouring TCs.
 
+    Returns
+    -------
+    box : tuple
+        (lon1, lon2, lat1, lat2) of rectangle.
 
-def sfmr_spatially_exists(the_class, tc, next_tc, temporal_info):
+    """
     # It seems that need to compare rectangle of SFMR range with
     # regression range of area around TC in a specified hour, not
     # the period between two neighbouring TCs
-    existence = False
-    spatial_temporal_info = []
-
-    delta = next_tc.date_time - tc.date_time
-
-    # Calculate the circumscribed rectangle of all area of regression
-    # on every hour between two neighbouring TCs
-    hours = int(delta.seconds / 3600)
-    # Spatial shift
+    # Extract from the interval between two TC records
     try:
-        lon_shift, lat_shift = get_center_shift_of_two_tcs(
-            next_tc, tc)
-        hourly_lon_shift = lon_shift / hours
-        hourly_lat_shift = lat_shift / hours
+        _, interped_tc_lons, interped_tc_lats = \
+            tc_track.hourly_positions(tc, next_tc)
     except Exception as msg:
         breakpoint()
         exit(msg)
-    half_reg_edge = the_class.CONFIG['regression'][
-        'edge_in_degree'] / 2
-    corners = {'left': [], 'top': [], 'right': [], 'bottom': []}
-    # Extract from the interval between two TC records
-    for h in range(hours):
-        interped_tc_lon = (h * hourly_lon_shift + tc.lon)
-        interped_tc_lat = (h * hourly_lat_shift + tc.lat)
-        corners['left'].append(interped_tc_lon - half_reg_edge)
-        corners['top'].append(interped_tc_lat + half_reg_edge)
-        corners['right'].append(interped_tc_lon + half_reg_edge)
-        corners['bottom'].append(interped_tc_lat - half_reg_edge)
-    # Describe rectangle of regression area between two TCs
-    left_top_tc = Point(min(corners['left']),
-                        max(corners['top']))
-    right_bottom_tc = Point(max(corners['right']),
-                            min(corners['bottom']))
-
-    for info in temporal_info:
-        left_top_sfmr = Point(info.min_lon, info.max_lat)
-        right_bottom_sfmr = Point(info.max_lon, info.min_lat)
-        if doOverlap(left_top_tc, right_bottom_tc,
-                     left_top_sfmr, right_bottom_sfmr):
-            existence = True
-            spatial_temporal_info.append(info)
-
-    return existence, spatial_temporal_info
+
+    return (float(interped_tc_lons.min()) - half_reg_edge,
+            float(interped_tc_lons.max()) + half_reg_edge,
+            float(interped_tc_lats.min()) - half_reg_edge,
+            float(interped_tc_lats.max()) + half_reg_edge)
 
 
 def load_match_data_sources(the_class):
@@ -4130,8 +4278,9 @@ def update_no_match_between_tcs(the_class, Match, hours, tc, next_tc):
     """
     match_list = []
 
+    interped_tcs = tc_track.hourly_tcs(tc, next_tc)
     for h in range(hours):
-        interped_tc = interp_tc(the_class, h, tc, next_tc)
+        interped_tc = interped_tcs[h]
         row = Match()
         row.tc_sid = interped_tc.sid
         row.date_time = interped_tc.date_time
@@ -4164,149 +4313,87 @@ def interp_tc(the_class, h, tc, next_tc):
     """Get sid, interpolated datetime, longitude and latitude of
     two neighbouring TC records.
 
+    Use tc_track.hourly_tcs to interpolate all hours between two
+    records at once.
+
+    Returns
+    -------
+    interped_tc : tc_track.HourlyTC
+        Immutable record of interpolated TC.
+
     """
-    try:
-        # Temporal shift
-        delta = next_tc.date_time - tc.date_time
-        hours = int(delta.seconds / 3600)
-        # Spatial shift
-        lon_shift, lat_shift = get_center_shift_of_two_tcs(
-            next_tc, tc)
-        hourly_lon_shift = lon_shift / hours
-        hourly_lat_shift = lat_shift / hours
-
-        # Get IBTrACS table
-        table_name = the_class.CONFIG['ibtracs']['table_name'][
-            the_class.basin]
-        IBTrACS = get_class_by_tablename(the_class.engine, table_name)
-        # ATTENTIONL: DO NOT direct use `interped_tc = tc`
-        # Because it makes a link between two variables
-        # any modification will simultaneously change two variables
-        interped_tc = IBTrACS()
-        interped_tc.sid = tc.sid
-        interped_tc.name = tc.name
-        # interped_tc.basin = tc.basin
-        # interped_tc.pres = tc.pres
-        # interped_tc.wind = tc.wind
-        # interped_tc.r34_ne = tc.r34_ne
-        # interped_tc.r34_se = tc.r34_se
-        # interped_tc.r34_sw = tc.r34_sw
-        # interped_tc.r34_nw = tc.r34_nw
-        # interped_tc.r50_ne = tc.r50_ne
-        # interped_tc.r50_ne = tc.r50_ne
-        # interped_tc.r50_se = tc.r50_se
-        # interped_tc.r50_sw = tc.r50_sw
-        # interped_tc.r64_nw = tc.r64_nw
-        # interped_tc.r64_se = tc.r64_se
-        # interped_tc.r64_sw = tc.r64_sw
-        # interped_tc.r64_nw = tc.r64_nw
-        # Only interpolate `date_time`, `lon`, `lat` variables
-        # Other variables stays same with `tc`
-        interped_tc.date_time = tc.date_time + datetime.timedelta(
-            seconds=h*3600)
-        interped_tc.lon = (h * hourly_lon_shift + tc.lon)
-        interped_tc.lat = (h * hourly_lat_shift + tc.lat)
-    except Exception as msg:
-        breakpoint()
-        exit(msg)
+    # Temporal shift
+    delta = next_tc.date_time - tc.date_time
+    hours = int(delta.seconds / 3600)
+    # Spatial shift
+    lon_shift, lat_shift = get_center_shift_of_two_tcs(next_tc, tc)
+    hourly_lon_shift = lon_shift / hours
+    hourly_lat_shift = lat_shift / hours
+
+    # Only interpolate `date_time`, `lon`, `lat` variables
+    return tc_track.HourlyTC(
+        tc.sid, tc.name,
+        tc.date_time + datetime.timedelta(seconds=h*3600),
+        h * hourly_lon_shift + tc.lon,
+        h * hourly_lat_shift + tc.lat)
 
-    return interped_tc
 
+def sfmr_rounded_hours(the_class, tc, next_tc, spatial_temporal_info,
+                       half_reg_edge=None):
+    """Round SFMR data points between two neighbouring TC records to
+    hours and select those around interpolated TC at rounded hour.
 
-def sfmr_rounded_hours(the_class, tc, next_tc, spatial_temporal_info):
+    Every SFMR file is parsed once by sfmr_cache and shared by all
+    pairs of TC records.
+
+    Returns
+    -------
+    hour_info_pt_idx : dict
+        {rounded_hour: {info_idx: [pt_idx_1, pt_idx_2, ...]}}, where
+        pt_idx is index of data point in SFMR file.
+
+    """
     # Include start hour, but not end hour
     # To let all intervals same
-    hours_between_two_tcs = []
     datetime_area = dict()
     hour_info_pt_idx = dict()
 
     delta = next_tc.date_time - tc.date_time
     hours = int(delta.seconds / 3600)
 
-    # if (next_tc.date_time == datetime.datetime(2018, 7, 10, 18, 0)
-    #     or tc.date_time == datetime.datetime(2018, 7, 10, 18, 0)):
-    #     breakpoint()
+    if half_reg_edge is None:
+        half_reg_edge = \
+            the_class.CONFIG['regression']['edge_in_degree'] / 2
 
+    interped_tcs = tc_track.hourly_tcs(tc, next_tc)
     for h in range(hours):
         interp_dt = tc.date_time + datetime.timedelta(
             seconds=h*3600)
-        hours_between_two_tcs.append(interp_dt)
-
-        datetime_area[interp_dt] = dict()
 
-        interped_tc = interp_tc(the_class, h, tc, next_tc)
+        interped_tc = interped_tcs[h]
         if tc.date_time == next_tc.date_time:
             breakpoint()
 
-        half_reg_edge = \
-            the_class.CONFIG['regression']['edge_in_degree'] / 2
-        datetime_area[interp_dt]['lon1'] = (interped_tc.lon
-                                            - half_reg_edge)
-        datetime_area[interp_dt]['lon2'] = (interped_tc.lon
-                                            + half_reg_edge)
-        datetime_area[interp_dt]['lat1'] = (interped_tc.lat
-                                            - half_reg_edge)
-        datetime_area[interp_dt]['lat2'] = (interped_tc.lat
-                                            + half_reg_edge)
+        datetime_area[interp_dt] = (
+            interped_tc.lon - half_reg_edge,
+            interped_tc.lon + half_reg_edge,
+            interped_tc.lat - half_reg_edge,
+            interped_tc.lat + half_reg_edge)
 
+    cache = sfmr_cache.get_sfmr_cache(the_class.CONFIG)
     # traverse all brief info of SFMR file
     for info_idx, info in enumerate(spatial_temporal_info):
-        year = info.start_datetime.year
-        file_path = (
-            f"""{the_class.CONFIG['sfmr']['dirs']['hurr']}"""
-            f"""{year}/{info.hurr_name}/{info.filename}"""
-        )
-        dataset = netCDF4.Dataset(file_path)
-
-        # VERY VERY IMPORTANT: netCDF4 auto mask may cause problems,
-        # so must disable auto mask
-        dataset.set_auto_mask(False)
-        vars = dataset.variables
-        length = len(vars['TIME'])
+        flight = cache.get(sfmr_cache.flight_path(the_class.CONFIG, info))
 
-        # Traverse all data points of selected SFMR file
-        for i in range(length):
-            # Round SFMR data point's datetime to hours
-            try:
-                pt_date = vars['DATE'][i]
-                pt_time = vars['TIME'][i]
-                # It seems that near the end of SFMR data array,
-                # DATE will be 0
-                if pt_date == 0:
-                    continue
-
-                pt_datetime = datetime.datetime.combine(
-                    sfmr_nc_converter('DATE', pt_date),
-                    sfmr_nc_converter('TIME', pt_time)
-                )
-                rounded_hour = hour_rounder(pt_datetime)
-            except Exception as msg:
-                breakpoint()
-                exit(msg)
-
-            # Check whether rounded hours are in hours between
-            # two TCs
-            if rounded_hour not in hours_between_two_tcs:
-                continue
-
-            lon = (vars['LON'][i] + 360) % 360
-            lat = vars['LAT'][i]
-
-            # Check whether SFMR data points are in area around
-            # TC at rounded hour
-            if (lon < datetime_area[rounded_hour]['lon1']
-                    or lon > datetime_area[rounded_hour]['lon2']
-                    or lat < datetime_area[rounded_hour]['lat1']
-                    or lat > datetime_area[rounded_hour]['lat2']):
+        for rounded_hour, area in datetime_area.items():
+            pt_indices = flight.in_box(rounded_hour, *area)
+            if not len(pt_indices):
                 continue
 
             # Add SFMR data point index into `hour_info_pt_idx`
             if rounded_hour not in hour_info_pt_idx:
                 hour_info_pt_idx[rounded_hour] = dict()
-            if info_idx not in hour_info_pt_idx[rounded_hour]:
-                hour_info_pt_idx[rounded_hour][info_idx] = []
-
-            hour_info_pt_idx[rounded_hour][info_idx].append(i)
+            hour_info_pt_idx[rounded_hour][info_idx] = pt_indices.tolist()
 
     return hour_info_pt_idx
 
@@ -4385,40 +4472,17 @@ def average_sfmr_along_track(the_class, tc, sfmr_brief_info,
 
 
 def east_or_north_shift(direction, base_pt, tgt_pt):
-    if direction == 'east':
-        dis = distance.distance((base_pt[0], tgt_pt[1]), base_pt).km
-
-        base_pt = (base_pt[0],
-                   longitude_converter(base_pt[1], '-180', '360'))
-        tgt_pt = (tgt_pt[0],
-                  longitude_converter(tgt_pt[1], '-180', '360'))
-        # Set the value to check whether the line between two TC center
-        # across the prime meridian
-        threshold = 20
-        if abs(tgt_pt[1] - base_pt[1]) > threshold:
-            if tgt_pt[1] < base_pt[1]:
-                # E.g. `tgt_pt` lon: 0.5, `base_pt` lon: 359.5
-                ratio = 1
-            else:
-                # E.g. `tgt_dt` lon: 359.5, `base_pt` lon: 0.5
-                ratio = -1
-        else:
-            if tgt_pt[1] < base_pt[1]:
-                # E.g. `tgt_pt` lon: 288.5, `base_pt` lon: 290.5
-                ratio = -1
-            else:
-                # E.g. `tgt_dt` lon: 292.5, `base_pt` lon: 290.5
-                ratio = 1
+    """Get eastward or northward shift in kilometers from base_pt to
+    tgt_pt, which are (lat, lon) tuples.  See
+    geodesy.east_north_shift_km.
 
+    """
+    east, north = geodesy.east_north_shift_km(base_pt[0], base_pt[1],
+                                              tgt_pt[0], tgt_pt[1])
+    if direction == 'east':
+        return east
     elif direction == 'north':
-        dis = distance.distance((tgt_pt[0], base_pt[1]), base_pt).km
-
-        if tgt_pt[0] < base_pt[0]:
-            ratio = -1
-        else:
-            ratio = 1
-
-    return ratio * dis
+        return north
 
 
 def create_smap_era5_table(the_class, dt, suffix=''):
@@ -4706,23 +4770,36 @@ def add_era5_single_levels(the_class, era5_file_path, tc_dt, tgt_name,
         pres_lvls = []
         pres_lvls_candidates = the_class.CONFIG['era5']['pres_lvls']
 
+        # Compose and decompose wind of all rows at once
+        windspd, winddir = compose_wind(
+            rows_attr_array(new_tgt_part,
+                            'neutral_wind_at_10_m_u_component'),
+            rows_attr_array(new_tgt_part,
+                            'neutral_wind_at_10_m_v_component'),
+            'o')
+        set_rows_attr_array(new_tgt_part,
+                            'era5_10m_neutral_equivalent_windspd', windspd)
+        set_rows_attr_array(new_tgt_part,
+                            'era5_10m_neutral_equivalent_winddir', winddir)
+        if tgt_name == 'smap':
+            smap_windspd = rows_attr_array(new_tgt_part, 'smap_windspd')
+            smap_u_wind, smap_v_wind = decompose_wind(smap_windspd,
+                                                      winddir, 'o')
+            smap_rows = [row for row, spd in zip(new_tgt_part,
+                                                 smap_windspd)
+                         if not np.isnan(spd)]
+            has_smap = ~np.isnan(smap_windspd)
+            set_rows_attr_array(smap_rows, 'smap_u_wind',
+                                smap_u_wind[has_smap])
+            set_rows_attr_array(smap_rows, 'smap_v_wind',
+                                smap_v_wind[has_smap])
+
         for row in new_tgt_part:
             nearest_pres_lvl, nearest_pres_lvl_idx = \
                     get_nearest_element_and_index(
                         pres_lvls_candidates,
                         row.mean_sea_level_pressure / 100)
 
-            windspd, winddir = compose_wind(
-                row.neutral_wind_at_10_m_u_component,
-                row.neutral_wind_at_10_m_v_component,
-                'o')
-            row.era5_10m_neutral_equivalent_windspd = windspd
-            row.era5_10m_neutral_equivalent_winddir = winddir
-
-            if tgt_name == 'smap' and row.smap_windspd is not None:
-                row.smap_u_wind, row.smap_v_wind = decompose_wind(
-                    row.smap_windspd, winddir, 'o')
-
             pres_lvls.append(nearest_pres_lvl)
     except Exception as msg:
         breakpoint()
@@ -6251,8 +6328,9 @@ def match_exists_during_tc_interval(the_class, hours, tc, next_tc,
 
     hit_dt = []
     match_dt = []
+    interped_tcs = tc_track.hourly_tcs(tc, next_tc)
     for h in range(hours):
-        interped_tc = interp_tc(the_class, h, tc, next_tc)
+        interped_tc = interped_tcs[h]
 
         # Check whether the match record of sources near
         # this TC exists
@@ -6662,79 +6740,27 @@ def like_high_pred(pred, clf_num, pred_length, res):
 def grid_rmse_and_bias(spatial_grid, fig_dir, vx, vy,
                        tgt, base, fontsize=13):
     try:
-        vx.reset_index(inplace=True, drop=True)
-        vy.reset_index(inplace=True, drop=True)
-        tgt.reset_index(inplace=True, drop=True)
-        base.reset_index(inplace=True, drop=True)
-
         masked_value = -999
-        length = dict()
-        mins = dict()
-        if isinstance(vx.min(), np.int64):
-            length_adjust = 1
-        else:
-            length_adjust = 0
-
-        for name, val in zip(['x', 'y'], [vx, vy]):
-            mins[name] = int(math.floor(val.min()))
-            length[name] = (int(math.ceil(val.max()) - mins[name])
-                            + length_adjust)
-
-        grid_shape = (length['y'], length['x'])
-        array_length = len(tgt)
-
-        statistic_grid = {
-            'Count': np.full(shape=grid_shape,
-                            fill_value=masked_value,
-                            dtype=int),
-            'Mean bias': np.full(shape=grid_shape,
-                            fill_value=masked_value,
-                            dtype=float),
-            'RMSE': np.full(shape=grid_shape,
-                            fill_value=masked_value,
-                            dtype=float),
-        }
-        tgt_grid = np.empty(shape=grid_shape, dtype=object)
-        base_grid = np.empty(shape=grid_shape, dtype=object)
-
-        for i in range(array_length):
-            x_idx = int(vx[i] - mins['x'])
-            y_idx = int(vy[i] - mins['y'])
+        indices, grid_shape, mins = grouped_statistic.grid_indices(vx, vy)
+        cells_statistic = grouped_statistic.grouped_statistic(
+            indices, tgt.to_numpy() - base.to_numpy(),
+            grid_shape[0] * grid_shape[1])
+        empty = (cells_statistic['Count'] == 0).reshape(grid_shape)
+
+        statistic_grid = dict()
+        for name in ['Count', 'Mean bias', 'RMSE']:
+            statistic_grid[name] = cells_statistic[name].reshape(
+                grid_shape)
+            statistic_grid[name][empty] = masked_value
 
-            if tgt_grid[y_idx][x_idx] is None:
-                tgt_grid[y_idx][x_idx] = []
-            tgt_grid[y_idx][x_idx].append(tgt[i])
-
-            if base_grid[y_idx][x_idx] is None:
-                base_grid[y_idx][x_idx] = []
-            base_grid[y_idx][x_idx].append(base[i])
-
-        x_grid = np.zeros(shape=grid_shape, dtype=float)
-        y_grid = np.zeros(shape=grid_shape, dtype=float)
         if spatial_grid:
             spa_resolu = 0.25
         else:
             spa_resolu = 1
 
-        for y_idx in range(length['y']):
-            for x_idx in range(length['x']):
-
-                y_grid[y_idx][x_idx] = (mins['y'] + y_idx) * spa_resolu
-                x_grid[y_idx][x_idx] = (mins['x'] + x_idx) * spa_resolu
-
-                if tgt_grid[y_idx][x_idx] is None:
-                    continue
-
-                statistic_grid['Count'][y_idx][x_idx] = len(
-                    base_grid[y_idx][x_idx])
-
-                diff = (np.array(tgt_grid[y_idx][x_idx])
-                        - np.array(base_grid[y_idx][x_idx]))
-                statistic_grid['Mean bias'][y_idx][x_idx] = diff.mean()
-
-                statistic_grid['RMSE'][y_idx][x_idx] = math.sqrt(
-                    mean_squared_error(base_grid[y_idx][x_idx],
-                                       tgt_grid[y_idx][x_idx]))
+        x_grid, y_grid = np.meshgrid(
+            (mins[1] + np.arange(grid_shape[1])) * spa_resolu,
+            (mins[0] + np.arange(grid_shape[0])) * spa_resolu)
 
         # for name in ['rmse', 'bias']:
         #     max_idx = statistic_grid[name].argmax()